@@ -22,16 +22,20 @@ PREREQUISITES:
     - Internet connection
 
 EXPECTED OUTPUT:
-    - Full JSON response from the API
+    - Full JSON response from the API (only with AI101_VERBOSE=1)
     - AI's answer to your question
     - Token usage statistics (prompt, completion, total)
 
 Run with: python3 01_basic_chat.py
 """
 
+import atexit       # For running clean-up code when the program exits
 import http.client  # For making HTTP/HTTPS requests
 import json         # For encoding/decoding JSON data
 import os           # For accessing environment variables
+import ssl          # For sharing one TLS configuration between connections
+import sys          # For reading command-line flags like --no-cache
+import time         # For waiting between retries
 
 # ==============================================================================
 # Step 1: Load and validate API credentials
@@ -43,9 +47,9 @@ api_key = os.environ.get('DEMETERICS_API_KEY')
 
 # Validate that the API key exists before proceeding
 if not api_key:
-    print("Error: DEMETERICS_API_KEY environment variable not set")
-    print("Run: export DEMETERICS_API_KEY='your_key_here'")
-    exit(1)
+    print("Error: DEMETERICS_API_KEY environment variable not set", file=sys.stderr)
+    print("Run: export DEMETERICS_API_KEY='your_key_here'", file=sys.stderr)
+    sys.exit(1)
 
 # ==============================================================================
 # Step 2: Build the request payload
@@ -57,30 +61,54 @@ if not api_key:
 # - temperature: Creativity level (0.0 = deterministic, 2.0 = very random)
 # - max_tokens: Maximum length of response
 
-# Create the request payload (the data we're sending to the API)
-payload = {
+# The model and settings are the same for every question we might ask, so
+# we build them ONCE here. The messages (the actual question) are added to a
+# copy of this dictionary in ask() below, each time we send a question.
+BASE_PAYLOAD = {
     "model": "meta-llama/llama-4-scout-17b-16e-instruct",
-    "messages": [
-        {
-            "role": "user",  # This message is from the user
-            "content": "What is the capital of Switzerland?"
-        }
-    ],
     "temperature": 0.7,  # Balanced creativity (good for factual questions)
     "max_tokens": 100    # Limit response to ~100 tokens (~75 words)
 }
 
-# Before sending, we need to convert Python dictionary to JSON string
-# APIs expect JSON format, not Python objects
-payload_json = json.dumps(payload)
-
 # ==============================================================================
-# Step 3: Establish HTTPS connection to the API
+# Step 3: Get a reusable HTTPS connection to the API
 # ==============================================================================
 
-# Create HTTPS connection to Demeterics Groq proxy server
-# HTTPS ensures encrypted communication for security
-conn = http.client.HTTPSConnection("api.demeterics.com")
+# Opening an HTTPS connection is expensive: a TCP handshake plus a TLS
+# handshake (certificate checks, key exchange) happen before a single byte of
+# our question is sent. If a program makes several requests, it can keep ONE
+# connection open and reuse it ("keep-alive") instead of paying that cost
+# every time. We store open connections in a dictionary keyed by host name.
+_CONNECTIONS = {}
+
+# Every HTTPS connection needs an SSL context: the TLS settings plus the list
+# of certificate authorities we trust. If we don't pass one, http.client
+# builds a fresh context for EACH connection, re-reading the system's
+# certificate store every time. Building it once and sharing it is cheaper.
+SSL_CONTEXT = ssl.create_default_context()
+
+
+def get_shared_connection(host):
+    """Return the cached HTTPS connection for host, creating it on first use."""
+    conn = _CONNECTIONS.get(host)
+    if conn is None:
+        # timeout=30 stops us from waiting forever if the network hangs
+        conn = http.client.HTTPSConnection(host, timeout=30,
+                                           context=SSL_CONTEXT)
+        _CONNECTIONS[host] = conn
+    return conn
+
+
+def close_shared_connections():
+    """Close every cached connection (called automatically at exit)."""
+    for conn in _CONNECTIONS.values():
+        conn.close()
+    _CONNECTIONS.clear()
+
+
+# atexit runs our clean-up function when Python exits, so we never forget
+# to close the connections even though we no longer close after each request
+atexit.register(close_shared_connections)
 
 # ==============================================================================
 # Step 4: Prepare HTTP headers for authentication and content type
@@ -89,55 +117,208 @@ conn = http.client.HTTPSConnection("api.demeterics.com")
 # Set up headers that the API requires:
 # - Content-Type tells the server we're sending JSON
 # - Authorization provides our API key for authentication
-headers = {
+# - Connection: keep-alive asks the server to leave the connection open
+# The API key never changes while the script runs, so the headers are also
+# built only once and reused for every request.
+HEADERS = {
     'Content-Type': 'application/json',
-    'Authorization': f'Bearer {api_key}'  # Bearer token authentication
+    'Authorization': f'Bearer {api_key}',  # Bearer token authentication
+    'Connection': 'keep-alive'
 }
 
 # ==============================================================================
 # Step 5: Send the HTTP POST request to the API
 # ==============================================================================
 
-# Make the POST request to create a chat completion
-# - Method: POST (we're creating something, not just reading)
-# - Path: OpenAI-compatible endpoint
-# - Body: Our JSON payload with the question
-# - Headers: Authentication and content type
-conn.request("POST", "/groq/v1/chat/completions", payload_json, headers)
+# Temporary failures are worth retrying: 429 means "too many requests, slow
+# down" and 5xx codes mean the server had a hiccup. We retry those a couple of
+# times, waiting longer before each new attempt ("exponential backoff").
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 2
+BACKOFF_FACTOR = 0.3  # Waits 0.3s, then 0.6s, ...
+
+
+def send_request(host, path, body, headers):
+    """POST body to host+path over the shared connection and return the response.
+
+    If the server dropped our idle kept-alive connection, throw the stale
+    connection away and retry once on a fresh one. Depending on timing, a
+    dropped connection shows up as an empty answer (RemoteDisconnected,
+    BadStatusLine) or as an error while sending (ConnectionResetError,
+    BrokenPipeError). Responses with a status in RETRY_STATUSES are retried
+    up to MAX_RETRIES times with backoff.
+    """
+    reconnected = False
+    attempt = 0
+    while True:
+        conn = get_shared_connection(host)
+        try:
+            conn.request("POST", path, body, headers)
+            response = conn.getresponse()
+        except (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                ConnectionResetError, BrokenPipeError):
+            conn.close()
+            _CONNECTIONS.pop(host, None)
+            if reconnected:
+                raise
+            reconnected = True
+            continue
+
+        if response.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            return response
+
+        # Read (and ignore) the error body so the connection can be reused
+        response.read()
+
+        # Respect the server's Retry-After hint if it is longer than ours
+        delay = BACKOFF_FACTOR * (2 ** attempt)
+        retry_after = response.getheader('Retry-After', '')
+        if retry_after.isdigit():
+            delay = max(delay, int(retry_after))
+        time.sleep(delay)
+        attempt += 1
+
 
 # ==============================================================================
-# Step 6: Receive and read the HTTP response
+# Step 6: Remember answers in a local cache
 # ==============================================================================
 
-# Get the response object from the server
-response = conn.getresponse()
+# Asking the exact same question with the exact same settings twice costs
+# tokens and a second of waiting. For DETERMINISTIC requests (temperature 0)
+# the answer does not change, so we save it on disk and reuse it next time.
+# With temperature > 0 answers are random on purpose, so they are only cached
+# if you opt in with: export AI101_CACHE=1
+# Run with --no-cache to always call the API.
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'ai101')
+
+
+def cache_enabled(payload):
+    """Return True if this request's answer may be read from / saved to disk."""
+    if '--no-cache' in sys.argv:
+        return False
+    return payload.get('temperature') == 0 or os.environ.get('AI101_CACHE') == '1'
+
+
+def get_cache_path(host, path, payload):
+    """Return the cache file name for this exact request.
+
+    The name is the SHA-256 hash of the host, path and payload (with sorted
+    keys), so identical requests always map to the same file. The API key is
+    never part of the hash.
+    """
+    # Imported here rather than at the top: hashlib is only needed when the
+    # cache is switched on, so normal runs skip its ~2ms import
+    import hashlib
+
+    key_source = json.dumps([host, path, payload], sort_keys=True)
+    key = hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+    return os.path.join(CACHE_DIR, key + '.json')
+
+
+def cached_chat(host, path, payload, body, headers):
+    """Return the API's answer as a dictionary, from the cache when possible."""
+    use_cache = cache_enabled(payload)
+    if use_cache:
+        cache_file = get_cache_path(host, path, payload)
+        if os.path.exists(cache_file):
+            # Say so: a saved answer looks just like a new one
+            print(f'(Answer loaded from {cache_file}; '
+                  'run with --no-cache to call the API)\n')
+            with open(cache_file, 'rb') as f:
+                return json.loads(f.read())
+
+    response = send_request(host, path, body, headers)
+
+    # Before parsing, we need to read the raw response data
+    # The response comes as bytes. json.loads() accepts bytes directly and
+    # detects UTF-8 itself, so we skip .decode('utf-8'): that would make a
+    # second full-size copy of the body as a string just to throw it away.
+    # (Reading the whole body also frees the connection for the next request)
+    response_data = response.read()
+
+    # Convert the JSON bytes into a Python dictionary for easy access
+    response_json = json.loads(response_data)
+
+    # Only successful answers are worth remembering. We write to a temporary
+    # file first and then rename it, so a crash can never leave half a file.
+    if use_cache and response.status == 200:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(response_json, f)
+        os.replace(tmp_file, cache_file)
+
+    return response_json
 
-# Before parsing, we need to read the raw response data
-# The response comes as bytes, so we decode it to a UTF-8 string
-response_data = response.read().decode('utf-8')
 
 # ==============================================================================
-# Step 7: Parse the JSON response into a Python dictionary
+# Step 7: Ask the question (or reuse the cached answer)
 # ==============================================================================
 
-# Convert JSON string back to Python dictionary for easy access
-response_json = json.loads(response_data)
+
+def ask(question):
+    """Send one question to the API and return the parsed JSON response."""
+    # Copy the shared settings and add this question as a user message
+    payload = {
+        **BASE_PAYLOAD,
+        "messages": [
+            {
+                "role": "user",  # This message is from the user
+                "content": question
+            }
+        ]
+    }
+
+    # Before sending, we need to convert Python dictionary to JSON
+    # APIs expect JSON format, not Python objects
+    # - separators=(',', ':') drops the spaces json.dumps adds by default,
+    #   so fewer bytes travel over the network
+    # - .encode('utf-8') turns the text into bytes once, here, which is what
+    #   the socket sends anyway (http.client would otherwise encode it for us)
+    # Because the body is bytes with a known size, http.client adds the
+    # Content-Length header itself (no "chunked" transfer encoding) and sends
+    # headers + body in a single write. It also turns off Nagle's algorithm
+    # (TCP_NODELAY) on the socket, so this small request leaves immediately
+    # instead of waiting to be bundled with more data.
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+    # Make the POST request to create a chat completion
+    # - Method: POST (we're creating something, not just reading)
+    # - Path: OpenAI-compatible endpoint
+    # - Body: Our JSON payload with the question
+    # - Headers: Authentication, content type and keep-alive
+    return cached_chat("api.demeterics.com", "/groq/v1/chat/completions",
+                       payload, body, HEADERS)
+
+
+response_json = ask("What is the capital of Switzerland?")
 
 # ==============================================================================
-# Step 8: Clean up the connection
+# Step 8: Connection clean-up happens automatically
 # ==============================================================================
 
-# Close the connection to free up resources
-# Good practice: always close connections when done
-conn.close()
+# We do NOT call conn.close() here: the connection stays open so any later
+# request to the same host can reuse it. close_shared_connections() (that we
+# registered with atexit in Step 3) closes it when the program finishes.
 
 # ==============================================================================
 # Step 9: Display the results to the user
 # ==============================================================================
 
 # Display the full response (useful for debugging and understanding the API)
-print("Full Response:")
-print(json.dumps(response_json, indent=2))
+# Turning the dictionary back into indented text costs time and memory, and
+# most runs only need the answer, so this only happens when you ask for it:
+#   export AI101_VERBOSE=1
+if os.environ.get('AI101_VERBOSE') == '1':
+    print("Full Response:")
+    print(json.dumps(response_json, indent=2))
+
+# A bad API key or a rate limit gives an "error" object instead of
+# "choices": show it (even without AI101_VERBOSE) and stop here
+if 'error' in response_json:
+    print("API Error:", file=sys.stderr)
+    print(json.dumps(response_json['error'], indent=2), file=sys.stderr)
+    sys.exit(1)
 
 # Extract and display just the AI's answer
 # The answer is nested in: choices[0] -> message -> content
@@ -152,6 +333,11 @@ print(f"  Prompt: {response_json['usage']['prompt_tokens']}")
 print(f"  Response: {response_json['usage']['completion_tokens']}")
 print(f"  Total: {response_json['usage']['total_tokens']}")
 
+# Response cache:
+#   export AI101_CACHE=1   # Also cache answers when temperature > 0
+#   python3 01_basic_chat.py --no-cache   # Skip the cache for this run
+#   rm -rf ~/.cache/ai101  # Forget every cached answer
+#
 # Python concepts explained:
 #
 # import http.client
@@ -163,16 +349,42 @@ print(f"  Total: {response_json['usage']['total_tokens']}")
 # import os
 #   Built-in module for OS operations (like environment variables)
 #
+# import inside a function (see get_cache_path)
+#   The module is loaded the first time the function runs, not at startup.
+#   Useful for modules only some runs need. os and json stay at the top
+#   because every run uses them (and Python has already loaded os anyway).
+#
+# hashlib.sha256(bytes).hexdigest()
+#   Turns any data into a fixed 64-character "fingerprint"
+#   Same input always gives the same fingerprint
+#
+# os.replace(src, dst)
+#   Renames a file in one step (readers never see a half-written file)
+#
 # os.environ.get('VAR_NAME')
 #   Gets environment variable (like $DEMETERICS_API_KEY in bash)
 #   Returns None if not set
 #
+# print(..., file=sys.stderr) and sys.exit(1)
+#   Errors go to "standard error", so they still show up when the normal
+#   output is redirected to a file. sys.exit(1) stops the script with exit
+#   code 1 ("failed"). Use it instead of the bare exit(), which is meant for
+#   the interactive prompt and is missing when Python runs with -S.
+#
 # json.dumps(dict)
 #   Converts Python dictionary to JSON string
 #   indent=2 means pretty-print with 2-space indentation
+#   separators=(',', ':') means compact output with no extra spaces
 #
-# json.loads(string)
-#   Converts JSON string to Python dictionary
+# string.encode('utf-8')
+#   Converts a string to bytes (what actually goes over the network)
+#
+# json.loads(string_or_bytes)
+#   Converts JSON (text or UTF-8 bytes) to Python dictionary
+#
+# {**BASE_PAYLOAD, "messages": [...]}
+#   Builds a NEW dictionary: all keys of BASE_PAYLOAD plus "messages".
+#   BASE_PAYLOAD itself is left unchanged for the next question.
 #
 # f'Bearer {api_key}'
 #   F-string (formatted string literal)
@@ -182,16 +394,29 @@ print(f"  Total: {response_json['usage']['total_tokens']}")
 #   Creates HTTPS connection (secure HTTP)
 #   Use HTTPConnection() for plain HTTP (not recommended)
 #
+# ssl.create_default_context()
+#   Secure TLS settings: checks certificates and the server's host name.
+#   Never turn those checks off to "fix" an error!
+#
+# atexit.register(function)
+#   Runs function automatically when the program exits
+#   Handy for clean-up like closing network connections
+#
+# Keep-alive connections
+#   One connection can carry many requests one after another.
+#   Reusing it skips the TCP + TLS handshake (often 100ms or more).
+#
 # conn.request(method, path, body, headers)
 #   Sends HTTP request
 #   method = "GET", "POST", "PUT", etc.
 #   path = "/api/endpoint"
-#   body = request data (JSON string)
+#   body = request data (JSON string or bytes)
 #   headers = dict of HTTP headers
 #
 # response.read()
 #   Returns bytes (binary data)
-#   Need to .decode('utf-8') to get string
+#   .decode('utf-8') turns it into a string when you need text
+#   (json.loads() is happy with the bytes as they are)
 #
 # Dictionary access:
 #   response_json['key']           # Crashes if key missing
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Example 1: Basic Chat - Many Questions, One Request
+
+WHAT THIS DEMONSTRATES:
+    - Packing several independent questions into ONE chat request
+    - Splitting the single answer back into one answer per question
+    - (Optional) OpenAI's Batch API: submit a file of requests, collect later
+
+WHAT YOU'LL LEARN:
+    - Why every request has a fixed cost (connection, network round trip)
+    - Trading a bit of prompt engineering for fewer round trips
+    - Parsing structured text with regular expressions
+    - How asynchronous "batch jobs" work (submit, poll, download)
+
+PREREQUISITES:
+    - Python 3.6 or higher
+    - DEMETERICS_API_KEY environment variable set
+    - OPENAI_API_KEY as well if you use --openai-batch
+    - Internet connection
+
+EXPECTED OUTPUT:
+    - Each question followed by its answer
+    - Token usage for the whole batch (one request instead of N)
+
+Run with: python3 01_basic_chat_BATCH.py
+     or:  python3 01_basic_chat_BATCH.py --openai-batch   (50% cheaper, slow)
+"""
+
+import http.client  # For making HTTP/HTTPS requests
+import json         # For encoding/decoding JSON data
+import os           # For accessing environment variables
+import re           # For splitting the packed answer back apart
+import ssl          # For sharing one TLS configuration between connections
+import sys          # For reading the --openai-batch flag
+import time         # For waiting between batch status checks
+import uuid         # For generating a multipart boundary
+
+# Polling a batch job opens many short connections. Each one needs an SSL
+# context (TLS settings + trusted certificates); building it once and
+# sharing it avoids re-reading the certificate store every time.
+SSL_CONTEXT = ssl.create_default_context()
+
+# ==============================================================================
+# Step 1: The questions we want answered
+# ==============================================================================
+
+# These are independent: no question needs another question's answer.
+# That is what makes them safe to pack into a single request.
+questions = [
+    "What is the capital of Switzerland?",
+    "How many legs does a spider have?",
+    "What gas do plants absorb from the air?",
+    "Who wrote Romeo and Juliet?",
+]
+
+# ==============================================================================
+# Step 2: Pack all questions into one prompt
+# ==============================================================================
+
+
+def build_packed_messages(questions):
+    """Return chat messages asking for one answer per numbered question.
+
+    The system prompt fixes the output format ("Q1: ...", "Q2: ...") so we
+    can reliably split the reply afterwards.
+    """
+    numbered = "\n".join(f"Q{i}: {q}" for i, q in enumerate(questions, start=1))
+    return [
+        {
+            "role": "system",
+            "content": ("Answer each question below on its own line, "
+                        "prefixed by its label, for example 'Q1: <answer>'. "
+                        "Keep every answer to one short sentence.")
+        },
+        {"role": "user", "content": numbered}
+    ]
+
+
+def split_packed_answer(text, count):
+    """Split 'Q1: ... Q2: ...' text into a list of `count` answers.
+
+    re.split with a capturing group returns the labels too:
+    ['', '1', 'Bern.', '2', 'Eight.'] -> {1: 'Bern.', 2: 'Eight.'}
+    A question the model skipped gets "(no answer)".
+    """
+    parts = re.split(r'^\s*Q(\d+):\s*', text, flags=re.MULTILINE)
+    answers = {}
+    for i in range(1, len(parts) - 1, 2):
+        answers[int(parts[i])] = parts[i + 1].strip()
+    return [answers.get(n, "(no answer)") for n in range(1, count + 1)]
+
+
+# ==============================================================================
+# Step 3: Send one request to Groq (via Demeterics)
+# ==============================================================================
+
+
+def ask_packed(questions):
+    """Ask every question in a single chat completion call."""
+    api_key = os.environ.get('DEMETERICS_API_KEY')
+    if not api_key:
+        print("Error: DEMETERICS_API_KEY environment variable not set", file=sys.stderr)
+        print("Run: export DEMETERICS_API_KEY='your_key_here'", file=sys.stderr)
+        sys.exit(1)
+
+    payload = {
+        "model": "meta-llama/llama-4-scout-17b-16e-instruct",
+        "messages": build_packed_messages(questions),
+        "temperature": 0,                      # Factual answers, no creativity
+        "max_tokens": 100 * len(questions)     # Room for every answer
+    }
+    headers = {
+        'Content-Type': 'application/json',
+        'Authorization': f'Bearer {api_key}'
+    }
+
+    conn = http.client.HTTPSConnection("api.demeterics.com", timeout=30,
+                                       context=SSL_CONTEXT)
+    try:
+        conn.request("POST", "/groq/v1/chat/completions",
+                     json.dumps(payload, separators=(',', ':')).encode('utf-8'),
+                     headers)
+        response_json = json.loads(conn.getresponse().read())
+    finally:
+        conn.close()
+
+    if 'error' in response_json:
+        print("API Error:", file=sys.stderr)
+        print(json.dumps(response_json['error'], indent=2), file=sys.stderr)
+        sys.exit(1)
+
+    text = response_json['choices'][0]['message']['content']
+    return split_packed_answer(text, len(questions)), response_json.get('usage', {})
+
+
+# ==============================================================================
+# Step 4 (optional): OpenAI Batch API - submit now, collect later
+# ==============================================================================
+
+# The Batch API is a different kind of batching: instead of one big prompt,
+# you upload a file with one normal request per line (JSONL). OpenAI runs
+# them whenever it has spare capacity (within 24 hours) and charges about
+# 50% less. Great for large offline jobs, too slow for interactive use.
+
+BATCH_POLL_SECONDS = 30
+BATCH_DONE_STATES = ("completed", "failed", "expired", "cancelled")
+
+
+def openai_request(api_key, method, path, body=None, content_type='application/json'):
+    """Send one request to api.openai.com and return (status, raw bytes)."""
+    headers = {'Authorization': f'Bearer {api_key}'}
+    if body is not None:
+        headers['Content-Type'] = content_type
+    conn = http.client.HTTPSConnection("api.openai.com", timeout=60,
+                                       context=SSL_CONTEXT)
+    try:
+        conn.request(method, path, body, headers)
+        response = conn.getresponse()
+        return response.status, response.read()
+    finally:
+        conn.close()
+
+
+def stop_on_api_error(status, data):
+    """Print the API error and exit if a request failed, as in ask_packed()."""
+    if status == 200:
+        return
+    try:
+        error = json.loads(data).get('error', data.decode('utf-8', 'replace'))
+    except ValueError:
+        error = data.decode('utf-8', 'replace')
+    print(f"API Error (HTTP {status}):", file=sys.stderr)
+    print(json.dumps(error, indent=2), file=sys.stderr)
+    sys.exit(1)
+
+
+def openai_json(api_key, method, path, body=None, content_type='application/json'):
+    """Send one request to api.openai.com and return its parsed JSON answer.
+
+    Stops the script with the API error if the request failed, so a failed
+    upload never turns into a confusing KeyError further down.
+    """
+    status, data = openai_request(api_key, method, path, body, content_type)
+    stop_on_api_error(status, data)
+    return json.loads(data)
+
+
+def ask_openai_batch(questions):
+    """Run every question through the OpenAI Batch API and return answers."""
+    api_key = os.environ.get('OPENAI_API_KEY')
+    if not api_key:
+        print("Error: OPENAI_API_KEY environment variable not set", file=sys.stderr)
+        print("Run: export OPENAI_API_KEY='sk-...'", file=sys.stderr)
+        sys.exit(1)
+
+    # 4a. One JSON request per line; custom_id lets us match answers later
+    lines = []
+    for i, question in enumerate(questions, start=1):
+        lines.append(json.dumps({
+            "custom_id": f"q{i}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": "gpt-5-nano",
+                "messages": [{"role": "user", "content": question}],
+                "max_tokens": 100
+            }
+        }))
+    jsonl = ("\n".join(lines) + "\n").encode('utf-8')
+
+    # 4b. Upload the file (multipart form data, like 08_whisper.py)
+    boundary = str(uuid.uuid4())
+    body = b'\r\n'.join([
+        f'--{boundary}'.encode(),
+        b'Content-Disposition: form-data; name="purpose"',
+        b'',
+        b'batch',
+        f'--{boundary}'.encode(),
+        b'Content-Disposition: form-data; name="file"; filename="questions.jsonl"',
+        b'Content-Type: application/jsonl',
+        b'',
+        jsonl,
+        f'--{boundary}--'.encode()
+    ])
+    uploaded = openai_json(
+        api_key, "POST", "/v1/files", body,
+        f'multipart/form-data; boundary={boundary}')
+    print(f"Uploaded batch file: {uploaded['id']}")
+
+    # 4c. Create the batch job
+    batch = openai_json(api_key, "POST", "/v1/batches", json.dumps({
+        "input_file_id": uploaded['id'],
+        "endpoint": "/v1/chat/completions",
+        "completion_window": "24h"
+    }).encode('utf-8'))
+    print(f"Created batch job: {batch['id']} (status: {batch['status']})")
+
+    # 4d. Poll until the job finishes (press Ctrl+C to stop waiting;
+    #     the job keeps running on OpenAI's side)
+    while batch['status'] not in BATCH_DONE_STATES:
+        time.sleep(BATCH_POLL_SECONDS)
+        batch = openai_json(api_key, "GET", f"/v1/batches/{batch['id']}")
+        print(f"  status: {batch['status']}")
+
+    # A failed job lists why in batch['errors']; a completed job whose
+    # requests all failed has no output file, only an error file
+    if batch['status'] != "completed" or not batch.get('output_file_id'):
+        if batch['status'] == "completed":
+            print("Batch finished, but every request in it failed", file=sys.stderr)
+        else:
+            print(f"Batch did not complete: {batch['status']}", file=sys.stderr)
+        errors = (batch.get('errors') or {}).get('data', [])
+        for error in errors:
+            print(f"  {error.get('code')}: {error.get('message')}", file=sys.stderr)
+        if batch.get('error_file_id'):
+            print(f"  Details: file {batch['error_file_id']}", file=sys.stderr)
+        sys.exit(1)
+
+    # 4e. Download results; they may come back in any order
+    status, output = openai_request(api_key, "GET", f"/v1/files/{batch['output_file_id']}/content")
+    stop_on_api_error(status, output)
+    answers = {}
+    usage = {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+    for line in output.decode('utf-8').splitlines():
+        if not line.strip():
+            continue
+        result = json.loads(line)
+        # A request that failed inside the batch has an error instead
+        if result.get('error') or result['response']['status_code'] != 200:
+            error = result.get('error') or result['response']['body'].get('error')
+            message = error.get('message', error) if isinstance(error, dict) else error
+            answers[result['custom_id']] = f"(API error: {message})"
+            continue
+        response_body = result['response']['body']
+        answers[result['custom_id']] = response_body['choices'][0]['message']['content']
+        for key in usage:
+            usage[key] += response_body.get('usage', {}).get(key, 0)
+
+    return [answers.get(f"q{i}", "(no answer)")
+            for i in range(1, len(questions) + 1)], usage
+
+
+# ==============================================================================
+# Step 5: Run and display the results
+# ==============================================================================
+
+use_openai_batch = '--openai-batch' in sys.argv
+if use_openai_batch:
+    answers, usage = ask_openai_batch(questions)
+else:
+    answers, usage = ask_packed(questions)
+
+for question, answer in zip(questions, answers):
+    print(f"Q: {question}")
+    print(f"A: {answer}\n")
+
+if not use_openai_batch:
+    print(f"Chat requests sent: 1 (instead of {len(questions)})")
+print("Token Usage:")
+print(f"  Prompt: {usage.get('prompt_tokens', 0)}")
+print(f"  Response: {usage.get('completion_tokens', 0)}")
+print(f"  Total: {usage.get('total_tokens', 0)}")
+
+# Python concepts explained:
+#
+# enumerate(items, start=1)
+#   Loops over items and gives you a counter too: (1, first), (2, second), ...
+#
+# "\n".join(list_of_strings)
+#   Glues strings together with a newline between each one
+#
+# re.split(pattern, text, flags=re.MULTILINE)
+#   Splits text wherever the pattern matches. ^ means "start of a line"
+#   (because of MULTILINE). A (group) in the pattern is kept in the result.
+#
+# When NOT to pack questions:
+#   - When one answer depends on another (ask them in order instead)
+#   - When you need separate safety checks or logs per question
+#   - When answers are long: one bad answer can eat the shared max_tokens
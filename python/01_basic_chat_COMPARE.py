@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Example 1: Basic Chat - Compare Providers Side by Side
+
+WHAT THIS DEMONSTRATES:
+    - Asking the SAME question to several AI providers at once
+    - Running network requests concurrently with asyncio
+    - Limiting how many requests are in flight with a Semaphore
+    - Reusing HTTPS connections with a small connection pool
+
+WHAT YOU'LL LEARN:
+    - Why waiting on the network is "I/O-bound" work
+    - Sequential vs concurrent: sum of latencies vs slowest latency
+    - asyncio.gather() to wait for many tasks together
+    - Handling one failing provider without losing the others
+
+PREREQUISITES:
+    - Python 3.7 or higher (for asyncio.run)
+    - At least one of these environment variables set:
+      DEMETERICS_API_KEY, OPENAI_API_KEY, ANTHROPIC_API_KEY, SAMBANOVA_API_KEY
+    - Internet connection
+
+EXPECTED OUTPUT:
+    - One answer per provider whose API key is set
+    - How long each provider took
+    - Total wall-clock time (close to the SLOWEST provider, not the sum)
+
+Run with: python3 01_basic_chat_COMPARE.py
+     or:  python3 01_basic_chat_COMPARE.py openai anthropic   (only these)
+     or:  python3 01_basic_chat_COMPARE.py groq --repeat 20    (benchmark)
+"""
+
+import asyncio      # For running several requests at the same time
+import http.client  # For making HTTP/HTTPS requests
+import json         # For encoding/decoding JSON data
+import os           # For accessing environment variables
+import ssl          # For sharing one TLS configuration between connections
+import sys          # For choosing providers on the command line
+import threading    # For protecting the connection pool from races
+import time         # For measuring how long each request takes
+
+# ==============================================================================
+# Step 1: A registry that describes each provider
+# ==============================================================================
+
+# The single-provider scripts (01_basic_chat_OPENAI.py, ...) each spell out
+# one provider from top to bottom, which is great for learning one API.
+# Underneath, they only differ in a handful of things: host, path, how the
+# key is sent, and where the answer sits in the response. Here we collect
+# exactly those differences in ONE table (a "registry"), so a single chat()
+# function can talk to every provider.
+
+def bearer_headers(api_key):
+    """OpenAI-style authentication: Authorization: Bearer <key>."""
+    return {'Authorization': f'Bearer {api_key}'}
+
+
+def anthropic_headers(api_key):
+    """Anthropic-style authentication: x-api-key plus a version header."""
+    return {'x-api-key': api_key, 'anthropic-version': '2023-06-01'}
+
+
+def openai_text(response_json):
+    """OpenAI-compatible responses: choices[0].message.content."""
+    return response_json['choices'][0]['message']['content']
+
+
+def anthropic_text(response_json):
+    """Anthropic responses: content[0].text."""
+    return response_json['content'][0]['text']
+
+
+def openai_usage(response_json):
+    """Return (prompt_tokens, completion_tokens) from an OpenAI-style usage."""
+    usage = response_json.get('usage') or {}
+    return usage.get('prompt_tokens', 0), usage.get('completion_tokens', 0)
+
+
+def anthropic_usage(response_json):
+    """Return (input_tokens, output_tokens) from an Anthropic usage."""
+    usage = response_json.get('usage') or {}
+    return usage.get('input_tokens', 0), usage.get('output_tokens', 0)
+
+
+PROVIDERS = {
+    "groq": {
+        "name": "Groq (via Demeterics)",
+        "env_var": "DEMETERICS_API_KEY",
+        "host": "api.demeterics.com",
+        "path": "/groq/v1/chat/completions",
+        "model": "meta-llama/llama-4-scout-17b-16e-instruct",
+        "auth": bearer_headers,
+        "extract_text": openai_text,
+        "extract_usage": openai_usage,
+    },
+    "openai": {
+        "name": "OpenAI",
+        "env_var": "OPENAI_API_KEY",
+        "host": "api.openai.com",
+        "path": "/v1/chat/completions",
+        "model": "gpt-5-nano",
+        "auth": bearer_headers,
+        "extract_text": openai_text,
+        "extract_usage": openai_usage,
+    },
+    "anthropic": {
+        "name": "Anthropic",
+        "env_var": "ANTHROPIC_API_KEY",
+        "host": "api.anthropic.com",
+        "path": "/v1/messages",
+        "model": "claude-haiku-4-5",
+        "auth": anthropic_headers,
+        "extract_text": anthropic_text,
+        "extract_usage": anthropic_usage,
+    },
+    "sambanova": {
+        "name": "SambaNova",
+        "env_var": "SAMBANOVA_API_KEY",
+        "host": "api.sambanova.ai",
+        "path": "/v1/chat/completions",
+        "model": "Meta-Llama-3.1-8B-Instruct",
+        "auth": bearer_headers,
+        "extract_text": openai_text,
+        "extract_usage": openai_usage,
+    },
+}
+
+QUESTION = "What is the capital of Switzerland?"
+
+# Never have more than this many requests in flight at once. With only four
+# providers it rarely matters, but it keeps us polite if the table grows.
+MAX_CONCURRENT = 5
+
+# ==============================================================================
+# Step 2: Keep the requested providers whose API key is set
+# ==============================================================================
+
+# Pick providers by name on the command line, e.g.
+#   python3 01_basic_chat_COMPARE.py openai anthropic
+# With no names, every provider in the registry is tried.
+# --repeat N asks each provider N times, to see connection reuse at work.
+args = sys.argv[1:]
+repeat = 1
+if '--repeat' in args:
+    position = args.index('--repeat')
+    try:
+        repeat = int(args[position + 1])
+    except (IndexError, ValueError):
+        print("Error: --repeat needs a number, e.g. --repeat 10", file=sys.stderr)
+        sys.exit(1)
+    del args[position:position + 2]
+
+requested = args or list(PROVIDERS)
+unknown = [name for name in requested if name not in PROVIDERS]
+if unknown:
+    print(f"Error: unknown provider(s): {', '.join(unknown)}", file=sys.stderr)
+    print(f"Choose from: {', '.join(PROVIDERS)}", file=sys.stderr)
+    sys.exit(1)
+
+api_keys = {}
+for name in requested:
+    env_var = PROVIDERS[name]["env_var"]
+    if os.environ.get(env_var):
+        api_keys[name] = os.environ[env_var]
+    else:
+        print(f"Skipping {PROVIDERS[name]['name']}: {env_var} not set")
+
+if not api_keys:
+    print("Error: no provider API key is set", file=sys.stderr)
+    print("Run: export DEMETERICS_API_KEY='your_key_here' (or another provider key)", file=sys.stderr)
+    sys.exit(1)
+
+# ==============================================================================
+# Step 3: A tiny connection pool (one idle list per host)
+# ==============================================================================
+
+# An http.client connection can only carry ONE request at a time, so
+# concurrent requests each need their own. We keep finished connections in
+# a list per host and hand them out again instead of reconnecting. The lock
+# makes sure two threads never grab the same connection.
+#
+# With --repeat, this is where the savings show up: 20 requests to one host
+# with at most MAX_CONCURRENT in flight need only MAX_CONCURRENT TLS
+# handshakes, not 20. (HTTP/2 could even share ONE connection between all of
+# them, but Python's standard library only speaks HTTP/1.1.)
+_IDLE_CONNECTIONS = {}
+_POOL_LOCK = threading.Lock()
+connections_opened = {}  # host -> how many new connections we had to open
+
+# One SSL context (TLS settings + trusted certificates) shared by every
+# connection, instead of http.client building a new one per connection
+SSL_CONTEXT = ssl.create_default_context()
+
+
+def acquire_connection(host):
+    """Take an idle connection to host from the pool, or open a new one."""
+    with _POOL_LOCK:
+        idle = _IDLE_CONNECTIONS.get(host)
+        if idle:
+            return idle.pop()
+        connections_opened[host] = connections_opened.get(host, 0) + 1
+    return http.client.HTTPSConnection(host, timeout=30, context=SSL_CONTEXT)
+
+
+def release_connection(host, conn):
+    """Put a connection back in the pool so the next request can reuse it."""
+    with _POOL_LOCK:
+        _IDLE_CONNECTIONS.setdefault(host, []).append(conn)
+
+
+def close_all_connections():
+    """Close every pooled connection."""
+    with _POOL_LOCK:
+        for idle in _IDLE_CONNECTIONS.values():
+            for conn in idle:
+                conn.close()
+        _IDLE_CONNECTIONS.clear()
+
+
+# ==============================================================================
+# Step 4: One chat() function for every provider (normal, blocking)
+# ==============================================================================
+
+def chat(name, question):
+    """Ask one registered provider and return (answer, usage, seconds taken).
+
+    usage is a (prompt_tokens, completion_tokens) tuple, whatever the
+    provider calls those fields.
+    """
+    provider = PROVIDERS[name]
+    payload = {
+        "model": provider["model"],
+        "messages": [{"role": "user", "content": question}],
+        "temperature": 0.7,
+        "max_tokens": 100,
+    }
+    headers = {'Content-Type': 'application/json', 'Connection': 'keep-alive',
+               **provider["auth"](api_keys[name])}
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+    start = time.perf_counter()
+    for attempt in range(2):
+        conn = acquire_connection(provider["host"])
+        try:
+            conn.request("POST", provider["path"], body, headers)
+            response_json = json.loads(conn.getresponse().read())
+        except (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                ConnectionResetError, BrokenPipeError):
+            # A pooled connection the server closed while it sat idle:
+            # throw it away and try once more on a fresh one
+            conn.close()
+            if attempt == 1:
+                raise
+            continue
+        except Exception:
+            # A broken connection must not go back into the pool
+            conn.close()
+            raise
+        release_connection(provider["host"], conn)
+        break
+    seconds = time.perf_counter() - start
+
+    if 'error' in response_json:
+        raise RuntimeError(f"API error: {response_json['error']}")
+    return (provider["extract_text"](response_json),
+            provider["extract_usage"](response_json), seconds)
+
+
+# ==============================================================================
+# Step 5: Ask all providers concurrently
+# ==============================================================================
+
+# http.client is blocking: while one request waits for the network, nothing
+# else in that thread can run. run_in_executor() moves each blocking call to
+# a worker thread, and asyncio.gather() waits for all of them together.
+# Waiting on the network uses almost no CPU, so the requests overlap nicely:
+# total time is about the SLOWEST provider instead of the SUM of all of them.
+
+async def ask_with_limit(semaphore, name, question):
+    """Ask one provider, but only while holding a semaphore slot."""
+    async with semaphore:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, chat, name, question)
+
+
+async def ask_all(question):
+    """Ask every available provider `repeat` times at once.
+
+    Returns {provider name: [result, result, ...]}.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT)
+    jobs = [name for name in api_keys for _ in range(repeat)]
+    tasks = [ask_with_limit(semaphore, name, question) for name in jobs]
+    # return_exceptions=True: one failing provider gives us its exception
+    # object instead of cancelling everyone else
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    grouped = {name: [] for name in api_keys}
+    for name, result in zip(jobs, results):
+        grouped[name].append(result)
+    return grouped
+
+
+print(f"Question: {QUESTION}")
+print(f"Asking {len(api_keys)} provider(s) x {repeat} concurrently...\n")
+
+wall_start = time.perf_counter()
+try:
+    results = asyncio.run(ask_all(QUESTION))
+finally:
+    close_all_connections()
+wall_time = time.perf_counter() - wall_start
+
+# ==============================================================================
+# Step 6: Display the results
+# ==============================================================================
+
+sum_of_latencies = 0.0
+for name, provider_results in results.items():
+    provider = PROVIDERS[name]
+    print("=" * 50)
+    successes = [r for r in provider_results if not isinstance(r, Exception)]
+    failures = [r for r in provider_results if isinstance(r, Exception)]
+    if not successes:
+        print(f"{provider['name']}: FAILED ({failures[0]})")
+        continue
+
+    answer, (prompt_tokens, completion_tokens), seconds = successes[0]
+    sum_of_latencies += sum(r[2] for r in successes)
+    print(f"{provider['name']} ({provider['model']}) - {seconds:.2f}s, "
+          f"{prompt_tokens} prompt + {completion_tokens} completion tokens")
+    print(answer)
+
+    if repeat > 1:
+        average = sum(r[2] for r in successes) / len(successes)
+        opened = connections_opened.get(provider['host'], 0)
+        print(f"  {len(successes)}/{repeat} succeeded, average {average:.2f}s")
+        print(f"  TLS handshakes: {opened} for {repeat} requests "
+              f"({repeat - opened} saved by keep-alive)")
+        if failures:
+            print(f"  First failure: {failures[0]}")
+
+print("=" * 50)
+print(f"Wall-clock time:  {wall_time:.2f}s")
+print(f"Sum of latencies: {sum_of_latencies:.2f}s (what a sequential loop would take)")
+
+# Python concepts explained:
+#
+# async def / await
+#   An "async" function can pause at each await and let other tasks run.
+#
+# asyncio.run(coroutine)
+#   Starts the event loop, runs the coroutine to completion, stops the loop.
+#
+# asyncio.gather(*tasks)
+#   Runs many awaitables at the same time and returns all their results
+#   in the same order you passed them in.
+#
+# asyncio.Semaphore(n)
+#   A counter that lets at most n tasks inside "async with semaphore:".
+#
+# loop.run_in_executor(None, function, *args)
+#   Runs a normal blocking function in a background thread and lets us
+#   await its result.
+#
+# threading.Lock()
+#   Only one thread at a time can be inside "with lock:".
+#
+# Functions stored in a dictionary
+#   "auth": bearer_headers stores the function itself (no parentheses).
+#   provider["auth"](api_key) looks it up and then calls it.
+#
+# {**a, **b}
+#   Builds one new dictionary from the keys of a and b together.
+#
+# time.perf_counter()
+#   High-resolution clock for measuring elapsed time.
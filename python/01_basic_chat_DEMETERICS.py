@@ -31,7 +31,7 @@ PREREQUISITES:
     - Internet connection
 
 EXPECTED OUTPUT:
-    - Full JSON response (same as direct Groq)
+    - Full JSON response, same as direct Groq (only with AI101_VERBOSE=1)
     - AI's answer to your question
     - Token usage (tracked by Demeterics)
     - Visit Demeterics dashboard for analytics!
@@ -39,9 +39,13 @@ EXPECTED OUTPUT:
 Run with: python3 01_basic_chat_DEMETERICS.py
 """
 
+import atexit
 import http.client
 import json
 import os
+import ssl
+import sys
+import time
 
 # ==============================================================================
 # Step 1: Load Demeterics API credentials
@@ -50,10 +54,10 @@ import os
 api_key = os.environ.get('DEMETERICS_API_KEY')
 
 if not api_key:
-    print("Error: DEMETERICS_API_KEY environment variable not set")
-    print("Run: export DEMETERICS_API_KEY='...'")
-    print("Get your key from: https://demeterics.com")
-    exit(1)
+    print("Error: DEMETERICS_API_KEY environment variable not set", file=sys.stderr)
+    print("Run: export DEMETERICS_API_KEY='...'", file=sys.stderr)
+    print("Get your key from: https://demeterics.com", file=sys.stderr)
+    sys.exit(1)
 
 # Optional: Combined key format for advanced features
 # If you have both Demeterics and provider keys:
@@ -63,53 +67,180 @@ if not api_key:
 # Step 2: Build the request payload (same as Groq)
 # ==============================================================================
 
-payload = {
+# Settings shared by every question (the question itself is added in ask())
+BASE_PAYLOAD = {
     "model": "meta-llama/llama-4-scout-17b-16e-instruct",  # Groq model
-    "messages": [
-        {
-            "role": "user",
-            "content": "What is the capital of Switzerland?"
-        }
-    ],
     "temperature": 0.7,
     "max_tokens": 100
 }
 
-payload_json = json.dumps(payload)
-
 # ==============================================================================
-# Step 3: Connect to Demeterics proxy
+# Step 3: Reuse one connection to Demeterics
 # ==============================================================================
 
-# Demeterics proxy endpoint (routes to Groq)
-conn = http.client.HTTPSConnection("api.demeterics.com")
+# One kept-alive connection per host, reused for every request (see
+# 01_basic_chat.py for why).
+_CONNECTIONS = {}
+
+# One SSL context (TLS settings + trusted certificates) shared by every
+# connection, instead of http.client building a new one per connection
+SSL_CONTEXT = ssl.create_default_context()
+
+
+def get_shared_connection(host):
+    """Return the cached HTTPS connection for host, creating it on first use."""
+    conn = _CONNECTIONS.get(host)
+    if conn is None:
+        conn = http.client.HTTPSConnection(host, timeout=30,
+                                           context=SSL_CONTEXT)
+        _CONNECTIONS[host] = conn
+    return conn
+
+
+def close_shared_connections():
+    """Close every cached connection (called automatically at exit)."""
+    for conn in _CONNECTIONS.values():
+        conn.close()
+    _CONNECTIONS.clear()
+
+
+atexit.register(close_shared_connections)
+
+
+# Temporary failures are worth retrying: 429 means "too many requests, slow
+# down" and 5xx codes mean the server had a hiccup. We retry those a couple of
+# times, waiting longer before each new attempt ("exponential backoff").
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 2
+BACKOFF_FACTOR = 0.3  # Waits 0.3s, then 0.6s, ...
+
+
+def send_request(host, path, body, headers):
+    """POST body to host+path over the shared connection and return the response.
+
+    If the server dropped our idle kept-alive connection, throw the stale
+    connection away and retry once on a fresh one. Responses with a status
+    in RETRY_STATUSES are retried up to MAX_RETRIES times with backoff.
+    """
+    reconnected = False
+    attempt = 0
+    while True:
+        conn = get_shared_connection(host)
+        try:
+            conn.request("POST", path, body, headers)
+            response = conn.getresponse()
+        except (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                ConnectionResetError, BrokenPipeError):
+            conn.close()
+            _CONNECTIONS.pop(host, None)
+            if reconnected:
+                raise
+            reconnected = True
+            continue
+
+        if response.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            return response
+
+        # Read (and ignore) the error body so the connection can be reused
+        response.read()
+
+        # Respect the server's Retry-After hint if it is longer than ours
+        delay = BACKOFF_FACTOR * (2 ** attempt)
+        retry_after = response.getheader('Retry-After', '')
+        if retry_after.isdigit():
+            delay = max(delay, int(retry_after))
+        time.sleep(delay)
+        attempt += 1
+
+
+# Identical requests can reuse a saved answer instead of calling the API
+# again. Deterministic requests (temperature 0) are cached automatically;
+# set AI101_CACHE=1 to also cache random ones, or run with --no-cache to
+# always call the API.
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'ai101')
+
+
+def cache_enabled(payload):
+    """Return True if this request's answer may be read from / saved to disk."""
+    if '--no-cache' in sys.argv:
+        return False
+    return payload.get('temperature') == 0 or os.environ.get('AI101_CACHE') == '1'
+
+
+def get_cache_path(host, path, payload):
+    """Return the cache file named after the SHA-256 of host, path and payload."""
+    import hashlib  # Only needed with the cache (see 01_basic_chat.py)
+
+    key_source = json.dumps([host, path, payload], sort_keys=True)
+    key = hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+    return os.path.join(CACHE_DIR, key + '.json')
+
+
+def cached_chat(host, path, payload, body, headers):
+    """Return the API's answer as a dictionary, from the cache when possible."""
+    use_cache = cache_enabled(payload)
+    if use_cache:
+        cache_file = get_cache_path(host, path, payload)
+        if os.path.exists(cache_file):
+            # Say so: a saved answer looks just like a new one
+            print(f'(Answer loaded from {cache_file}; '
+                  'run with --no-cache to call the API)\n')
+            with open(cache_file, 'rb') as f:
+                return json.loads(f.read())
+
+    response = send_request(host, path, body, headers)
+    # json.loads() reads the UTF-8 bytes directly (no .decode() copy needed)
+    response_json = json.loads(response.read())
+
+    # Remember successful answers, via a temp file (see 01_basic_chat.py)
+    if use_cache and response.status == 200:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(response_json, f)
+        os.replace(tmp_file, cache_file)
+
+    return response_json
+
 
 # ==============================================================================
 # Step 4: Send request through Demeterics
 # ==============================================================================
 
-headers = {
+HEADERS = {
     'Content-Type': 'application/json',
-    'Authorization': f'Bearer {api_key}'  # Demeterics API key
+    'Authorization': f'Bearer {api_key}',  # Demeterics API key
+    'Connection': 'keep-alive'             # Reuse the connection
 }
 
-try:
-    # Use Groq endpoint path, but through Demeterics proxy
-    conn.request("POST", "/groq/v1/chat/completions", payload_json, headers)
 
-    # Get the response
-    response = conn.getresponse()
-    response_data = response.read().decode('utf-8')
+def ask(question):
+    """Send one question to the Demeterics proxy and return the parsed JSON response.
+
+    Only the messages change from question to question, so BASE_PAYLOAD
+    and HEADERS are built once when the script starts, not on every call.
+    """
+    payload = {**BASE_PAYLOAD, "messages": [{"role": "user", "content": question}]}
+
+    # Compact JSON (no extra spaces), encoded to bytes once for sending
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
 
-    # Parse JSON response
-    response_json = json.loads(response_data)
+    # Use Groq endpoint path, but through Demeterics proxy (routes to Groq)
+    return cached_chat("api.demeterics.com", "/groq/v1/chat/completions",
+                       payload, body, HEADERS)
+
+
+try:
+    response_json = ask("What is the capital of Switzerland?")
 
     # ==============================================================================
     # Step 5: Display the results
     # ==============================================================================
 
-    print("Full Response (via Demeterics proxy):")
-    print(json.dumps(response_json, indent=2))
+    # The full JSON dump is only printed with: export AI101_VERBOSE=1
+    if os.environ.get('AI101_VERBOSE') == '1':
+        print("Full Response (via Demeterics proxy):")
+        print(json.dumps(response_json, indent=2))
 
     # Extract and display the answer
     if 'choices' in response_json and len(response_json['choices']) > 0:
@@ -149,9 +280,6 @@ except Exception as e:
     print("2. Verify your Demeterics API key")
     print("3. Check Demeterics service status")
 
-finally:
-    conn.close()
-
 # ==============================================================================
 # Demeterics Benefits:
 # ==============================================================================
@@ -22,16 +22,20 @@ PREREQUISITES:
     - Internet connection
 
 EXPECTED OUTPUT:
-    - Full JSON response from OpenAI
+    - Full JSON response from OpenAI (only with AI101_VERBOSE=1)
     - GPT's answer to your question
     - Token usage statistics
 
 Run with: python3 01_basic_chat_OPENAI.py
 """
 
+import atexit
 import http.client
 import json
 import os
+import ssl
+import sys
+import time
 
 # ==============================================================================
 # Step 1: Load OpenAI API credentials
@@ -40,62 +44,203 @@ import os
 api_key = os.environ.get('OPENAI_API_KEY')
 
 if not api_key:
-    print("Error: OPENAI_API_KEY environment variable not set")
-    print("Run: export OPENAI_API_KEY='sk-...'")
-    print("Get your key from: https://platform.openai.com")
-    exit(1)
+    print("Error: OPENAI_API_KEY environment variable not set", file=sys.stderr)
+    print("Run: export OPENAI_API_KEY='sk-...'", file=sys.stderr)
+    print("Get your key from: https://platform.openai.com", file=sys.stderr)
+    sys.exit(1)
 
 # ==============================================================================
 # Step 2: Build the OpenAI request payload
 # ==============================================================================
 
-payload = {
+# Settings shared by every question (the question itself is added in ask())
+BASE_PAYLOAD = {
     "model": "gpt-5-nano",  # OpenAI's latest efficient model
-    "messages": [
-        {
-            "role": "user",
-            "content": "What is the capital of Switzerland?"
-        }
-    ],
     "temperature": 0.7,  # Creativity level
     "max_tokens": 100    # Response length limit
 }
 
-payload_json = json.dumps(payload)
+# Price per token in US dollars: (input, output) for each model.
+# Listed per 1,000 tokens and divided once here, not after every request
+# (example rates, check OpenAI pricing).
+PRICING = {
+    "gpt-5-nano": (0.0005 / 1000, 0.0015 / 1000),
+}
+
+
+def cost(model, prompt_tokens, completion_tokens):
+    """Return the estimated cost in US dollars of one request."""
+    prompt_price, completion_price = PRICING[model]
+    return prompt_tokens * prompt_price + completion_tokens * completion_price
 
 # ==============================================================================
-# Step 3: Connect to OpenAI API
+# Step 3: Reuse one connection to OpenAI
 # ==============================================================================
 
-# OpenAI uses api.openai.com as the base URL
-conn = http.client.HTTPSConnection("api.openai.com")
+# One kept-alive connection per host, reused for every request (see
+# 01_basic_chat.py for why).
+_CONNECTIONS = {}
+
+# One SSL context (TLS settings + trusted certificates) shared by every
+# connection, instead of http.client building a new one per connection
+SSL_CONTEXT = ssl.create_default_context()
+
+
+def get_shared_connection(host):
+    """Return the cached HTTPS connection for host, creating it on first use."""
+    conn = _CONNECTIONS.get(host)
+    if conn is None:
+        conn = http.client.HTTPSConnection(host, timeout=30,
+                                           context=SSL_CONTEXT)
+        _CONNECTIONS[host] = conn
+    return conn
+
+
+def close_shared_connections():
+    """Close every cached connection (called automatically at exit)."""
+    for conn in _CONNECTIONS.values():
+        conn.close()
+    _CONNECTIONS.clear()
+
+
+atexit.register(close_shared_connections)
+
+
+# Temporary failures are worth retrying: 429 means "too many requests, slow
+# down" and 5xx codes mean the server had a hiccup. We retry those a couple of
+# times, waiting longer before each new attempt ("exponential backoff").
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 2
+BACKOFF_FACTOR = 0.3  # Waits 0.3s, then 0.6s, ...
+
+
+def send_request(host, path, body, headers):
+    """POST body to host+path over the shared connection and return the response.
+
+    If the server dropped our idle kept-alive connection, throw the stale
+    connection away and retry once on a fresh one. Responses with a status
+    in RETRY_STATUSES are retried up to MAX_RETRIES times with backoff.
+    """
+    reconnected = False
+    attempt = 0
+    while True:
+        conn = get_shared_connection(host)
+        try:
+            conn.request("POST", path, body, headers)
+            response = conn.getresponse()
+        except (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                ConnectionResetError, BrokenPipeError):
+            conn.close()
+            _CONNECTIONS.pop(host, None)
+            if reconnected:
+                raise
+            reconnected = True
+            continue
+
+        if response.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            return response
+
+        # Read (and ignore) the error body so the connection can be reused
+        response.read()
+
+        # Respect the server's Retry-After hint if it is longer than ours
+        delay = BACKOFF_FACTOR * (2 ** attempt)
+        retry_after = response.getheader('Retry-After', '')
+        if retry_after.isdigit():
+            delay = max(delay, int(retry_after))
+        time.sleep(delay)
+        attempt += 1
+
+
+# Identical requests can reuse a saved answer instead of calling the API
+# again. Deterministic requests (temperature 0) are cached automatically;
+# set AI101_CACHE=1 to also cache random ones, or run with --no-cache to
+# always call the API.
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'ai101')
+
+
+def cache_enabled(payload):
+    """Return True if this request's answer may be read from / saved to disk."""
+    if '--no-cache' in sys.argv:
+        return False
+    return payload.get('temperature') == 0 or os.environ.get('AI101_CACHE') == '1'
+
+
+def get_cache_path(host, path, payload):
+    """Return the cache file named after the SHA-256 of host, path and payload."""
+    import hashlib  # Only needed with the cache (see 01_basic_chat.py)
+
+    key_source = json.dumps([host, path, payload], sort_keys=True)
+    key = hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+    return os.path.join(CACHE_DIR, key + '.json')
+
+
+def cached_chat(host, path, payload, body, headers):
+    """Return the API's answer as a dictionary, from the cache when possible."""
+    use_cache = cache_enabled(payload)
+    if use_cache:
+        cache_file = get_cache_path(host, path, payload)
+        if os.path.exists(cache_file):
+            # Say so: a saved answer looks just like a new one
+            print(f'(Answer loaded from {cache_file}; '
+                  'run with --no-cache to call the API)\n')
+            with open(cache_file, 'rb') as f:
+                return json.loads(f.read())
+
+    response = send_request(host, path, body, headers)
+    # json.loads() reads the UTF-8 bytes directly (no .decode() copy needed)
+    response_json = json.loads(response.read())
+
+    # Remember successful answers, via a temp file (see 01_basic_chat.py)
+    if use_cache and response.status == 200:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(response_json, f)
+        os.replace(tmp_file, cache_file)
+
+    return response_json
+
 
 # ==============================================================================
 # Step 4: Send the request with OpenAI headers
 # ==============================================================================
 
-headers = {
+HEADERS = {
     'Content-Type': 'application/json',
-    'Authorization': f'Bearer {api_key}'  # OpenAI uses Bearer auth
+    'Authorization': f'Bearer {api_key}',  # OpenAI uses Bearer auth
+    'Connection': 'keep-alive'             # Reuse the connection
 }
 
-try:
+
+def ask(question):
+    """Send one question to OpenAI and return the parsed JSON response.
+
+    Only the messages change from question to question, so BASE_PAYLOAD
+    and HEADERS are built once when the script starts, not on every call.
+    """
+    payload = {**BASE_PAYLOAD, "messages": [{"role": "user", "content": question}]}
+
+    # Compact JSON (no extra spaces), encoded to bytes once for sending
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
     # Send POST request to OpenAI's chat completions endpoint
-    conn.request("POST", "/v1/chat/completions", payload_json, headers)
+    # (OpenAI uses api.openai.com as the base URL)
+    return cached_chat("api.openai.com", "/v1/chat/completions",
+                       payload, body, HEADERS)
 
-    # Get the response
-    response = conn.getresponse()
-    response_data = response.read().decode('utf-8')
 
-    # Parse JSON response
-    response_json = json.loads(response_data)
+try:
+    response_json = ask("What is the capital of Switzerland?")
 
     # ==============================================================================
     # Step 5: Display the results
     # ==============================================================================
 
-    print("Full OpenAI Response:")
-    print(json.dumps(response_json, indent=2))
+    # The full JSON dump is only printed with: export AI101_VERBOSE=1
+    if os.environ.get('AI101_VERBOSE') == '1':
+        print("Full OpenAI Response:")
+        print(json.dumps(response_json, indent=2))
 
     # Extract and display the answer
     if 'choices' in response_json and len(response_json['choices']) > 0:
@@ -105,18 +250,17 @@ try:
         print(answer)
 
     # Show token usage
-    if 'usage' in response_json:
-        usage = response_json['usage']
+    usage = response_json.get('usage') or {}
+    if usage:
+        prompt_tokens = usage.get('prompt_tokens', 0)
+        completion_tokens = usage.get('completion_tokens', 0)
         print("\n" + "="*50)
         print("Token Usage:")
-        print(f"  Prompt tokens: {usage.get('prompt_tokens', 0)}")
-        print(f"  Completion tokens: {usage.get('completion_tokens', 0)}")
+        print(f"  Prompt tokens: {prompt_tokens}")
+        print(f"  Completion tokens: {completion_tokens}")
         print(f"  Total tokens: {usage.get('total_tokens', 0)}")
-
-        # Estimate cost (example rates, check OpenAI pricing)
-        prompt_cost = usage.get('prompt_tokens', 0) * 0.0005 / 1000
-        completion_cost = usage.get('completion_tokens', 0) * 0.0015 / 1000
-        print(f"  Estimated cost: ${prompt_cost + completion_cost:.6f}")
+        cost_usd = cost(BASE_PAYLOAD["model"], prompt_tokens, completion_tokens)
+        print(f"  Estimated cost: ${cost_usd:.6f}")
 
     # Check for errors
     if 'error' in response_json:
@@ -130,9 +274,6 @@ except Exception as e:
     print("2. Verify your API key is correct")
     print("3. Check OpenAI service status")
 
-finally:
-    conn.close()
-
 # ==============================================================================
 # OpenAI API Notes:
 # ==============================================================================
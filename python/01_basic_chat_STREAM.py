@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Example 1: Basic Chat - Streaming the Answer Word by Word
+
+WHAT THIS DEMONSTRATES:
+    - Asking the API to send the answer in small pieces as it is generated
+    - Reading Server-Sent Events (SSE) line by line with http.client
+    - Printing each piece immediately instead of waiting for the whole reply
+    - The two SSE formats you will meet: OpenAI-style and Anthropic-style
+
+WHAT YOU'LL LEARN:
+    - Time-to-first-token vs total response time
+    - Why response.read() makes you wait for the very last byte
+    - How "data: {...}" event streams are structured
+    - Where token usage shows up when streaming
+
+PREREQUISITES:
+    - Python 3.6 or higher
+    - DEMETERICS_API_KEY environment variable set
+      (or ANTHROPIC_API_KEY when using --anthropic)
+    - Internet connection
+
+EXPECTED OUTPUT:
+    - The answer appearing a few words at a time
+    - Time until the first word, and total time
+    - Token usage statistics
+
+Run with: python3 01_basic_chat_STREAM.py
+     or:  python3 01_basic_chat_STREAM.py --anthropic
+"""
+
+import http.client  # For making HTTP/HTTPS requests
+import json         # For encoding/decoding JSON data
+import os           # For accessing environment variables
+import ssl          # For the TLS configuration of the connection
+import sys          # For the --anthropic flag and flushing output
+import time         # For measuring time-to-first-token
+
+# ==============================================================================
+# Step 1: Pick the provider and load its API key
+# ==============================================================================
+
+use_anthropic = '--anthropic' in sys.argv
+
+if use_anthropic:
+    env_var = 'ANTHROPIC_API_KEY'
+    host, path = "api.anthropic.com", "/v1/messages"
+else:
+    env_var = 'DEMETERICS_API_KEY'
+    host, path = "api.demeterics.com", "/groq/v1/chat/completions"
+
+api_key = os.environ.get(env_var)
+if not api_key:
+    print(f"Error: {env_var} environment variable not set", file=sys.stderr)
+    print(f"Run: export {env_var}='your_key_here'", file=sys.stderr)
+    sys.exit(1)
+
+# ==============================================================================
+# Step 2: Build a payload with "stream": True
+# ==============================================================================
+
+# "stream": True tells the server to send the answer as a series of small
+# events while the model is still writing, instead of one JSON at the end.
+payload = {
+    "messages": [
+        {
+            "role": "user",
+            "content": "What is the capital of Switzerland?"
+        }
+    ],
+    "temperature": 0.7,
+    "max_tokens": 100,
+    "stream": True
+}
+
+if use_anthropic:
+    payload["model"] = "claude-haiku-4-5"
+    headers = {
+        'Content-Type': 'application/json',
+        'x-api-key': api_key,
+        'anthropic-version': '2023-06-01'
+    }
+else:
+    payload["model"] = "meta-llama/llama-4-scout-17b-16e-instruct"
+    # Ask for token usage in the last event (it is not sent by default)
+    payload["stream_options"] = {"include_usage": True}
+    headers = {
+        'Content-Type': 'application/json',
+        'Authorization': f'Bearer {api_key}'
+    }
+
+payload_json = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+# ==============================================================================
+# Step 3: Send the request
+# ==============================================================================
+
+# As in the other examples, the TLS settings (and trusted certificates) are
+# loaded once into SSL_CONTEXT and handed to the connection
+SSL_CONTEXT = ssl.create_default_context()
+conn = http.client.HTTPSConnection(host, timeout=30, context=SSL_CONTEXT)
+start_time = time.perf_counter()
+conn.request("POST", path, payload_json, headers)
+response = conn.getresponse()
+
+# Errors are NOT streamed: they come back as one normal JSON body
+if response.status != 200:
+    print(f"API Error (HTTP {response.status}):", file=sys.stderr)
+    print(response.read().decode('utf-8'), file=sys.stderr)
+    conn.close()
+    sys.exit(1)
+
+# ==============================================================================
+# Step 4: Read the event stream line by line
+# ==============================================================================
+
+# The body looks like this (one event per "data:" line, blank line between):
+#
+#   data: {"choices":[{"delta":{"content":"The"}}]}
+#
+#   data: {"choices":[{"delta":{"content":" capital"}}]}
+#
+#   data: [DONE]
+#
+# Anthropic adds an "event:" line before each "data:" line and uses
+# different JSON shapes (content_block_delta, message_delta, ...).
+# response.readline() returns as soon as ONE line has arrived, so we can
+# print each piece while the rest of the answer is still being generated.
+
+print("AI Answer:")
+first_token_time = None
+usage = {}
+
+while True:
+    line = response.readline()
+    if not line:
+        break  # The server closed the stream
+
+    line = line.strip()
+    if not line.startswith(b'data: '):
+        continue  # Skip blank separators and "event:" lines
+
+    data = line[len(b'data: '):]
+    if data == b'[DONE]':
+        break  # OpenAI-style end-of-stream marker
+
+    event = json.loads(data)
+
+    # Pull the new piece of text (and any usage numbers) out of the event
+    text = ""
+    if use_anthropic:
+        if event.get('type') == 'content_block_delta':
+            text = event['delta'].get('text', '')
+        elif event.get('type') == 'message_start':
+            usage['prompt_tokens'] = event['message']['usage'].get('input_tokens', 0)
+        elif event.get('type') == 'message_delta':
+            usage['completion_tokens'] = event['usage'].get('output_tokens', 0)
+        elif event.get('type') == 'message_stop':
+            break
+    else:
+        if event.get('choices'):
+            text = event['choices'][0]['delta'].get('content') or ""
+        # OpenAI puts usage in the final event; Groq puts it under x_groq
+        final_usage = event.get('usage') or event.get('x_groq', {}).get('usage')
+        if final_usage:
+            usage = final_usage
+
+    if text:
+        if first_token_time is None:
+            first_token_time = time.perf_counter() - start_time
+        # end="" keeps pieces on the same line; flush=True shows them NOW
+        print(text, end="", flush=True)
+
+total_time = time.perf_counter() - start_time
+conn.close()
+print()
+
+# ==============================================================================
+# Step 5: Display timing and token usage
+# ==============================================================================
+
+print("\nTiming:")
+if first_token_time is not None:
+    print(f"  First token after: {first_token_time:.2f}s")
+print(f"  Full answer after: {total_time:.2f}s")
+
+if usage:
+    prompt_tokens = usage.get('prompt_tokens', 0)
+    completion_tokens = usage.get('completion_tokens', 0)
+    print("\nToken Usage:")
+    print(f"  Prompt: {prompt_tokens}")
+    print(f"  Response: {completion_tokens}")
+    print(f"  Total: {usage.get('total_tokens', prompt_tokens + completion_tokens)}")
+
+# Python concepts explained:
+#
+# response.readline()
+#   Reads ONE line from the network (waits only until that line arrives)
+#   Returns b'' when the server has closed the connection
+#
+# b'data: '
+#   A bytes literal. Network data arrives as bytes, so we compare bytes
+#   with bytes and only decode the JSON part.
+#
+# print(text, end="", flush=True)
+#   end=""     -> do not add a newline after each piece
+#   flush=True -> push the text to the screen immediately
+#
+# Streaming vs non-streaming:
+#   - Same total time, same tokens, same cost
+#   - Much faster FIRST word, which makes chat apps feel responsive
+#   - You only get the full answer once the stream ends
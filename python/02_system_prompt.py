@@ -28,9 +28,13 @@ EXPECTED OUTPUT:
 Run with: python3 02_system_prompt.py
 """
 
+import atexit       # For closing the shared connection when the script ends
 import http.client  # For making HTTPS API requests
 import json         # For JSON encoding/decoding
 import os           # For environment variables
+import ssl          # For sharing one TLS configuration between connections
+import sys          # For the --no-cache flag
+import time         # For waiting before retrying a failed request
 
 # ==============================================================================
 # Step 1: Load and validate API credentials
@@ -73,11 +77,33 @@ payload = {
 }
 
 # ==============================================================================
-# Step 3: Establish HTTPS connection to the API
+# Step 3: Get a reusable HTTPS connection to the API
 # ==============================================================================
 
-# Create secure connection to Demeterics Groq proxy
-conn = http.client.HTTPSConnection("api.demeterics.com")
+# When you try several system prompts in a loop, every request after the
+# first reuses this kept-alive connection (see 01_basic_chat.py).
+_CONNECTIONS = {}
+SSL_CONTEXT = ssl.create_default_context()
+
+
+def get_shared_connection(host):
+    """Return the cached HTTPS connection for host, creating it on first use."""
+    conn = _CONNECTIONS.get(host)
+    if conn is None:
+        conn = http.client.HTTPSConnection(host, timeout=30,
+                                           context=SSL_CONTEXT)
+        _CONNECTIONS[host] = conn
+    return conn
+
+
+def close_shared_connections():
+    """Close every cached connection (called automatically at exit)."""
+    for conn in _CONNECTIONS.values():
+        conn.close()
+    _CONNECTIONS.clear()
+
+
+atexit.register(close_shared_connections)
 
 # ==============================================================================
 # Step 4: Prepare authentication headers
@@ -86,37 +112,135 @@ conn = http.client.HTTPSConnection("api.demeterics.com")
 # Set up required headers for the API request
 headers = {
     'Content-Type': 'application/json',
-    'Authorization': f'Bearer {api_key}'
+    'Authorization': f'Bearer {api_key}',
+    'Connection': 'keep-alive'  # Ask the server to leave the connection open
 }
 
 # ==============================================================================
-# Step 5: Send the POST request with system + user messages
+# Step 5: Send the POST request (or reuse a saved answer)
 # ==============================================================================
 
-# Make the API request with both system and user messages
-# The system message will guide how the AI responds to the user message
-conn.request("POST", "/groq/v1/chat/completions", json.dumps(payload), headers)
 
-# ==============================================================================
-# Step 6: Receive and parse the response
-# ==============================================================================
+# Temporary failures (429 "too many requests", 5xx server hiccups) are
+# retried a couple of times, waiting a little longer before each attempt.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 2
+BACKOFF_FACTOR = 0.3  # Waits 0.3s, then 0.6s
+
+
+def send_request(host, path, body, headers):
+    """POST body over the shared connection and return the response.
+
+    If the server closed our idle kept-alive connection, reconnect once.
+    Responses with a status in RETRY_STATUSES are retried with backoff.
+    """
+    reconnected = False
+    attempt = 0
+    while True:
+        conn = get_shared_connection(host)
+        try:
+            conn.request("POST", path, body, headers)
+            response = conn.getresponse()
+        except (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                ConnectionResetError, BrokenPipeError):
+            conn.close()
+            _CONNECTIONS.pop(host, None)
+            if reconnected:
+                raise
+            reconnected = True
+            continue
+
+        if response.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            return response
+
+        # Read (and ignore) the error body so the connection can be reused,
+        # then wait: at least as long as the server's Retry-After asks
+        response.read()
+        delay = BACKOFF_FACTOR * (2 ** attempt)
+        retry_after = response.getheader('Retry-After', '')
+        if retry_after.isdigit():
+            delay = max(delay, int(retry_after))
+        time.sleep(delay)
+        attempt += 1
+
+
+# While you tune a system prompt you send the same request over and over.
+# Identical requests can reuse a saved answer instead of calling the API
+# again. Deterministic requests (temperature 0) are cached automatically;
+# set AI101_CACHE=1 to also cache random ones, or run with --no-cache to
+# always call the API (see 01_basic_chat.py for details).
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'ai101')
 
-# Get the response from the server
-response = conn.getresponse()
 
-# Before using the response, we need to parse it from JSON
-# This combines reading, decoding, and JSON parsing in one line
-response_data = json.loads(response.read().decode('utf-8'))
+def cache_enabled(payload):
+    """Return True if this request's answer may be read from / saved to disk."""
+    if '--no-cache' in sys.argv:
+        return False
+    return payload.get('temperature') == 0 or os.environ.get('AI101_CACHE') == '1'
+
+
+def get_cache_path(host, path, payload):
+    """Return the cache file named after the SHA-256 of host, path and payload."""
+    import hashlib
+
+    key_source = json.dumps([host, path, payload], sort_keys=True)
+    key = hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+    return os.path.join(CACHE_DIR, key + '.json')
+
+
+def cached_chat(host, path, payload, body, headers):
+    """Return the API's answer as a dictionary, from the cache when possible."""
+    use_cache = cache_enabled(payload)
+    if use_cache:
+        cache_file = get_cache_path(host, path, payload)
+        if os.path.exists(cache_file):
+            # Say so: a saved answer looks just like a new one
+            print(f'(Answer loaded from {cache_file}; '
+                  'run with --no-cache to call the API)\n')
+            with open(cache_file, 'rb') as f:
+                return json.loads(f.read())
+
+    response = send_request(host, path, body, headers)
+
+    # Before using the response, we need to parse it from JSON
+    # This combines reading and JSON parsing in one line. json.loads() accepts
+    # the raw bytes directly (and detects UTF-8 itself), so there is no need
+    # to .decode() the whole body into a string first.
+    response_json = json.loads(response.read())
+
+    # Keep the answer for the next run with the same prompt
+    if use_cache and response.status == 200:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(response_json, f)
+        os.replace(tmp_file, cache_file)
+
+    return response_json
+
+
+# Convert the payload to compact JSON bytes, once:
+# - separators=(',', ':') drops the spaces json.dumps adds by default
+# - .encode('utf-8') gives http.client the bytes it sends anyway
+# Because the body is bytes of known size, http.client adds the
+# Content-Length header itself (no chunked encoding), and it already turns
+# on TCP_NODELAY, so the small request is not held back by Nagle's algorithm.
+body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+# Make the API request with both system and user messages
+# The system message will guide how the AI responds to the user message
+response_data = cached_chat("api.demeterics.com", "/groq/v1/chat/completions",
+                            payload, body, headers)
 
 # ==============================================================================
-# Step 7: Clean up the connection
+# Step 6: Clean up the connection
 # ==============================================================================
 
-# Close the connection to free up resources
-conn.close()
+# Nothing to do here: the connection stays open for reuse and is closed
+# automatically by close_shared_connections() when the script exits.
 
 # ==============================================================================
-# Step 8: Display the interaction and results
+# Step 7: Display the interaction and results
 # ==============================================================================
 
 # Show the system prompt that controlled the AI's behavior
@@ -136,6 +260,18 @@ print(f"\nToken Usage: {response_data['usage']['total_tokens']}")
 
 # Key concepts:
 #
+# Response cache:
+#   AI101_CACHE=1 python3 02_system_prompt.py   -> second run answers instantly
+#   python3 02_system_prompt.py --no-cache      -> always ask the API
+#
+# json.loads(response.read()):
+#   The response body arrives as bytes. json.loads() parses UTF-8 bytes
+#   directly, so .decode('utf-8') first would only add a full extra copy.
+#
+# Connection reuse (keep-alive):
+#   The first request pays for the TCP + TLS handshakes.
+#   Later requests on the same open connection skip them.
+#
 # Message roles:
 #   "system"    = Instructions for the AI's behavior
 #   "user"      = Your questions/prompts
@@ -183,6 +319,7 @@ print(f"\nToken Usage: {response_data['usage']['total_tokens']}")
 #   1.3-2.0: Poetry, experimental content
 #
 # Try this:
-#   Change temperature to 0.0 and run multiple times
+#   Change temperature to 0.0 and run multiple times with --no-cache
+#   (without it, runs after the first reuse the saved answer)
 #   Change temperature to 2.0 and run multiple times
 #   Compare the consistency of responses!
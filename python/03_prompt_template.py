@@ -16,25 +16,36 @@ Template features:
 - Timestamps: [[.Now]] replaced with current time
 
 Usage:
-    python 03_prompt_template.py [category] [topic]
+    python 03_prompt_template.py [category] [topic ...] [--stream] [--no-cache]
+
+    Several topics are sent as parallel requests sharing one compiled prompt.
+    --stream prints the essay while it is being written (Server-Sent Events,
+    single topic only)
 
 Examples:
     python 03_prompt_template.py "Science" "Quantum Computing"
     python 03_prompt_template.py "History" "The Industrial Revolution"
     python 03_prompt_template.py "Technology" "Artificial Intelligence"
+    python 03_prompt_template.py "Science" "Volcanoes" "Black Holes" "DNA"
 
 Environment:
     DEMETERICS_API_KEY - Your Demeterics Managed LLM Key (required)
 """
 
+import atexit
+import concurrent.futures
+import functools
 import os
+import ssl
 import sys
+import threading
+import time
 import json
 import re
 from datetime import datetime, timezone
 from pathlib import Path
 import http.client
-from typing import Dict, Any, Tuple, Optional
+from typing import Dict, Any, List, Tuple, Optional
 
 # Configuration
 API_URL = "api.demeterics.com"
@@ -49,6 +60,138 @@ TEMPLATE_FILE = TEMPLATE_DIR / "essay_writer.txt"
 INPUT_PRICE = 0.11
 OUTPUT_PRICE = 0.34
 
+# json.dumps() with any option (like separators) builds a new JSONEncoder on
+# every call; this one is built once and reused for every request body.
+# (json.loads() without options already reuses a shared decoder.)
+JSON_ENCODER = json.JSONEncoder(separators=(',', ':'))
+
+# Shared HTTPS connection. The TCP + TLS handshake is paid on the first
+# request only; later make_api_request() calls (e.g. rendering several
+# templates in a loop) reuse the open connection (HTTP keep-alive).
+SSL_CONTEXT = ssl.create_default_context()
+_connection: Optional[http.client.HTTPSConnection] = None
+
+def get_connection() -> http.client.HTTPSConnection:
+    """Return the shared keep-alive connection to the API.
+
+    Returns:
+        Open (or lazily opened) HTTPS connection to API_URL
+    """
+    global _connection
+    if _connection is None:
+        _connection = http.client.HTTPSConnection(API_URL, timeout=60, context=SSL_CONTEXT)
+    return _connection
+
+def close_connection() -> None:
+    """Close the shared connection (registered with atexit)."""
+    global _connection
+    if _connection is not None:
+        _connection.close()
+        _connection = None
+
+atexit.register(close_connection)
+
+@functools.lru_cache(maxsize=4)
+def get_headers(api_key: str) -> Dict[str, str]:
+    """Return the request headers for api_key.
+
+    The dictionary is built on the first call and the same one is returned
+    afterwards, so repeated requests skip formatting the Authorization
+    header. Callers must not modify it.
+
+    Args:
+        api_key: API key for authentication
+
+    Returns:
+        HTTP headers for the chat completions endpoint
+    """
+    return {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+        "Connection": "keep-alive"
+    }
+
+# Temporary failures (429 "too many requests", 5xx server hiccups) are
+# retried up to MAX_RETRIES times, waiting BACKOFF_FACTOR * 2**attempt seconds
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 2
+BACKOFF_FACTOR = 0.3
+
+def send_request(conn: http.client.HTTPSConnection, body: bytes,
+                 headers: Dict[str, str]) -> http.client.HTTPResponse:
+    """POST body to API_PATH, reconnecting and retrying when it makes sense.
+
+    If the server closed the idle connection in the meantime, close our
+    side too and try once more: http.client reconnects automatically on
+    the next request. Responses with a status in RETRY_STATUSES are
+    retried with exponential backoff (honouring Retry-After).
+
+    Args:
+        conn: Connection to send the request on
+        body: Encoded JSON request body
+        headers: HTTP headers
+
+    Returns:
+        The response (body not read yet)
+    """
+    reconnected = False
+    attempt = 0
+    while True:
+        try:
+            conn.request("POST", API_PATH, body, headers)
+            response = conn.getresponse()
+        except (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                ConnectionResetError, BrokenPipeError):
+            conn.close()
+            if reconnected:
+                raise
+            reconnected = True
+            continue
+
+        if response.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            return response
+
+        # Drain the error body so the connection can be reused
+        response.read()
+        delay = BACKOFF_FACTOR * (2 ** attempt)
+        retry_after = response.getheader('Retry-After', '')
+        if retry_after.isdigit():
+            delay = max(delay, int(retry_after))
+        time.sleep(delay)
+        attempt += 1
+
+# Response cache. Identical requests can reuse a saved answer instead of
+# calling the API again: deterministic requests (temperature 0) are cached
+# automatically, AI101_CACHE=1 caches all requests, --no-cache disables it.
+CACHE_DIR = Path.home() / ".cache" / "ai101"
+
+def cache_enabled(request_data: Dict[str, Any]) -> bool:
+    """Return True if this request's answer may be read from / saved to disk."""
+    if '--no-cache' in sys.argv:
+        return False
+    return request_data.get('temperature') == 0 or os.environ.get('AI101_CACHE') == '1'
+
+# The [[.Now]] timestamp (see format_now) changes every second, so a key
+# that included it would never match again. It is replaced by a fixed
+# marker in the key: the same template, category and topic reuse the
+# saved answer, even though its prompt had an older timestamp.
+TIMESTAMP_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2} UTC")
+
+def get_cache_path(request_data: Dict[str, Any]) -> Path:
+    """Return the cache file for this request, ignoring the timestamp.
+
+    Args:
+        request_data: Request payload (the API key is never part of it)
+
+    Returns:
+        Path named after the SHA-256 hash of host, path and payload
+    """
+    import hashlib  # Only needed when the cache is switched on
+
+    key_source = json.dumps([API_URL, API_PATH, request_data], sort_keys=True)
+    key_source = TIMESTAMP_PATTERN.sub("[[.Now]]", key_source)
+    return CACHE_DIR / (hashlib.sha256(key_source.encode('utf-8')).hexdigest() + '.json')
+
 def create_example_template() -> None:
     """Create an example template file if it doesn't exist."""
     TEMPLATE_DIR.mkdir(parents=True, exist_ok=True)
@@ -102,12 +245,64 @@ Provide the essay with:
 - Key terms defined
 - 2-3 discussion questions at the end'''
 
-    TEMPLATE_FILE.write_text(template_content)
+    # Write to a temporary file first and rename it into place, so a second
+    # run starting at the same moment never reads a half-written template
+    tmp_file = TEMPLATE_FILE.with_name(f"{TEMPLATE_FILE.name}.{os.getpid()}.tmp")
+    tmp_file.write_text(template_content, encoding='utf-8')
+    os.replace(tmp_file, TEMPLATE_FILE)
     print(f"✅ Created template file: {TEMPLATE_FILE}")
 
+@functools.lru_cache(maxsize=1)
+def format_now(epoch_seconds: int) -> str:
+    """Format a Unix time (whole seconds) as the template's [[.Now]] value.
+
+    Calls within the same second return the remembered string instead of
+    building a datetime and running strftime again.
+
+    Args:
+        epoch_seconds: Seconds since 1970-01-01 UTC, e.g. int(time.time())
+
+    Returns:
+        Timestamp like "2025-01-31 14:05:09 UTC"
+    """
+    return datetime.fromtimestamp(epoch_seconds, timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+
+@functools.lru_cache(maxsize=16)
+def _read_template(path: str, mtime_ns: int, size: int) -> str:
+    """Read a template file, reusing the text while the file is unchanged.
+
+    mtime_ns and size are not used in the body: they are part of the cache
+    key, so editing the file (new modification time or size) reads it again.
+
+    Args:
+        path: Template file path
+        mtime_ns: Last modification time in nanoseconds (from os.stat)
+        size: File size in bytes (from os.stat)
+
+    Returns:
+        Template content as string
+    """
+    # One read() of the raw bytes plus one UTF-8 decode. The explicit
+    # encoding also keeps the emoji headings readable on systems whose
+    # default text encoding is not UTF-8 (e.g. Windows).
+    return Path(path).read_bytes().decode('utf-8')
+
 class TemplateProcessor:
     """Process templates with variable substitution and basic conditionals."""
 
+    # Regular expressions are compiled once, when the class is defined,
+    # instead of being rebuilt from strings on every process() call.
+    _COMMENT_RE = re.compile(r'^[^\S\n]*///.*\n?', re.MULTILINE)
+    _VARIABLE_RE = re.compile(r'\[\[\.(\w+)\]\]')
+    _CONDITIONAL_RE = re.compile(r'\[\[if \.Category == "(.*?)"\]\](.*?)\[\[end\]\]', re.DOTALL)
+    # Splits a block at [[else if .Category == "Y"]] (keeping "Y") and [[else]]
+    _BRANCH_RE = re.compile(r'\[\[else if \.Category == "(.*?)"\]\]|\[\[else\]\]')
+    _MARKER_RE = re.compile(r'\[\[if.*?\]\]|\[\[else.*?\]\]|\[\[end\]\]')
+    _BLANK_LINES_RE = re.compile(r'\n\n\n+')
+
+    # How many compiled results process() remembers per template
+    MAX_CACHED_RESULTS = 128
+
     def __init__(self, template_path: Path):
         """Initialize the template processor.
 
@@ -116,6 +311,10 @@ class TemplateProcessor:
         """
         self.template_path = template_path
         self.template_content = self._load_template()
+        # Names the template actually uses as [[.Name]], found once here
+        self.variable_names = set(self._VARIABLE_RE.findall(self.template_content))
+        # Compiled prompts, keyed by the variables they were built from
+        self._results: Dict[Tuple[Tuple[str, Any], ...], str] = {}
 
     def _load_template(self) -> str:
         """Load template from file.
@@ -126,9 +325,13 @@ class TemplateProcessor:
         Raises:
             FileNotFoundError: If template file doesn't exist
         """
-        if not self.template_path.exists():
-            raise FileNotFoundError(f"Template not found: {self.template_path}")
-        return self.template_path.read_text()
+        # One stat() call both checks that the file exists and gives the
+        # cache key for _read_template()
+        try:
+            stat = self.template_path.stat()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Template not found: {self.template_path}") from None
+        return _read_template(str(self.template_path), stat.st_mtime_ns, stat.st_size)
 
     def process(self, variables: Dict[str, Any]) -> str:
         """Process template with variable substitution.
@@ -139,6 +342,21 @@ class TemplateProcessor:
         Returns:
             Processed template string
         """
+        # The same variables always give the same prompt, so a repeated
+        # call is answered from the cache without any regex work
+        # Only variables the template uses (plus Category, which drives the
+        # conditionals) can change the result, so only they form the key
+        key: Optional[Tuple[Tuple[str, Any], ...]] = tuple(sorted(
+            (name, value) for name, value in variables.items()
+            if name in self.variable_names or name == 'Category'))
+        try:
+            cached = self._results.get(key)
+        except TypeError:
+            # A value like a list cannot be a dictionary key: don't cache
+            key, cached = None, None
+        if cached is not None:
+            return cached
+
         processed = self.template_content
 
         # Step 1: Remove comment lines (///)
@@ -153,6 +371,12 @@ class TemplateProcessor:
         # Step 4: Clean up any remaining markers
         processed = self._cleanup_markers(processed)
 
+        if key is not None:
+            if len(self._results) >= self.MAX_CACHED_RESULTS:
+                # Forget the oldest entry (dictionaries keep insertion order)
+                del self._results[next(iter(self._results))]
+            self._results[key] = processed
+
         return processed
 
     def _remove_comments(self, text: str) -> str:
@@ -164,9 +388,9 @@ class TemplateProcessor:
         Returns:
             Text with comment lines removed
         """
-        lines = text.split('\n')
-        filtered_lines = [line for line in lines if not line.strip().startswith('///')]
-        return '\n'.join(filtered_lines)
+        # One regex pass deletes each comment line together with its
+        # newline, without splitting the text into a list of lines first
+        return self._COMMENT_RE.sub('', text)
 
     def _substitute_variables(self, text: str, variables: Dict[str, Any]) -> str:
         """Substitute [[.VarName]] with actual values.
@@ -178,13 +402,19 @@ class TemplateProcessor:
         Returns:
             Text with variables substituted
         """
-        for key, value in variables.items():
+        # Nothing to do if none of the given variables appear in the template
+        if self.variable_names.isdisjoint(variables):
+            return text
+
+        def replace_variable(match):
+            key = match.group(1)
             # Skip Topic variable as it will be in user message
-            if key == "Topic":
-                continue
-            pattern = f"\\[\\[\\.{key}\\]\\]"
-            text = re.sub(pattern, str(value), text)
-        return text
+            if key == "Topic" or key not in variables:
+                return match.group(0)
+            return str(variables[key])
+
+        # One pass over the text replaces every [[.VarName]] at once
+        return self._VARIABLE_RE.sub(replace_variable, text)
 
     def _process_conditionals(self, text: str, variables: Dict[str, Any]) -> str:
         """Process basic conditional blocks.
@@ -201,38 +431,32 @@ class TemplateProcessor:
         Returns:
             Text with conditionals processed
         """
-        category = variables.get('Category', '')
+        # A quick substring test (fast, done in C) skips the regex for
+        # templates without any conditional blocks
+        if '[[if' not in text:
+            return text
 
-        # Pattern to match conditional blocks
-        pattern = r'\[\[if \.Category == "(.*?)"\]\](.*?)\[\[end\]\]'
+        category = variables.get('Category', '')
 
         def replace_conditional(match):
-            condition_value = match.group(1)
-            content = match.group(2)
-
-            # Check if condition matches
-            if condition_value == category:
-                # Process the content for this condition
-                # Remove else blocks
-                content = re.sub(r'\[\[else.*?\]\].*?(?=\[\[end\]\]|\Z)', '', content, flags=re.DOTALL)
-                return content.strip()
-            else:
-                # Look for else if or else blocks
-                else_pattern = r'\[\[else if \.Category == "' + re.escape(category) + r'"\]\](.*?)(?=\[\[else|\[\[end\]\])'
-                else_match = re.search(else_pattern, content, re.DOTALL)
-                if else_match:
-                    return else_match.group(1).strip()
-
-                # Look for generic else
-                else_pattern = r'\[\[else\]\](.*?)(?=\[\[end\]\]|\Z)'
-                else_match = re.search(else_pattern, content, re.DOTALL)
-                if else_match:
-                    return else_match.group(1).strip()
+            # Split the block into its branches in one pass:
+            # [(value, body), (value, body), ..., (None, else_body)]
+            parts = self._BRANCH_RE.split(match.group(2))
+            branches = [(match.group(1), parts[0])]
+            branches += zip(parts[1::2], parts[2::2])
+
+            # Pick the first branch whose value matches, else the [[else]]
+            for condition_value, content in branches:
+                if condition_value == category:
+                    return content.strip()
+            for condition_value, content in branches:
+                if condition_value is None:
+                    return content.strip()
 
             return ''
 
         # Process conditionals
-        text = re.sub(pattern, replace_conditional, text, flags=re.DOTALL)
+        text = self._CONDITIONAL_RE.sub(replace_conditional, text)
 
         return text
 
@@ -245,23 +469,64 @@ class TemplateProcessor:
         Returns:
             Cleaned text
         """
-        # Remove any remaining conditional markers
-        markers = [r'\[\[if.*?\]\]', r'\[\[else.*?\]\]', r'\[\[end\]\]']
-        for marker in markers:
-            text = re.sub(marker, '', text)
+        # Remove any remaining conditional markers (all three kinds in one
+        # pass), unless the text has no [[ at all
+        if '[[' in text:
+            text = self._MARKER_RE.sub('', text)
 
         # Clean up multiple blank lines
-        text = re.sub(r'\n\n\n+', '\n\n', text)
+        text = self._BLANK_LINES_RE.sub('\n\n', text)
 
         return text.strip()
 
-def make_api_request(system_prompt: str, user_prompt: str, api_key: str) -> Dict[str, Any]:
+def print_stream(response: http.client.HTTPResponse) -> Dict[str, Any]:
+    """Print a streamed answer as it arrives and return it as a normal response.
+
+    Each "data: {...}" line holds one small piece of the essay, so only one
+    line is in memory at a time instead of the whole JSON body.
+
+    Args:
+        response: Open HTTP response of a request sent with "stream": true
+
+    Returns:
+        Dictionary shaped like a non-streamed response (choices + usage)
+    """
+    print("\n" + "="*70)
+    print("GENERATED ESSAY")
+    print("="*70)
+
+    pieces = []
+    usage: Dict[str, Any] = {}
+    for line in iter(response.readline, b''):
+        line = line.strip()
+        if not line.startswith(b'data: ') or line == b'data: [DONE]':
+            continue
+        event = json.loads(line[len(b'data: '):])
+        if event.get('choices'):
+            text = event['choices'][0]['delta'].get('content') or ''
+            pieces.append(text)
+            print(text, end='', flush=True)
+        # Usage arrives in the last event (Groq nests it under x_groq)
+        usage = event.get('usage') or event.get('x_groq', {}).get('usage') or usage
+    print()
+
+    return {
+        "choices": [{"message": {"role": "assistant", "content": ''.join(pieces)}}],
+        "usage": usage
+    }
+
+def make_api_request(system_prompt: str, user_prompt: str, api_key: str,
+                     conn: Optional[http.client.HTTPSConnection] = None,
+                     stream: bool = False) -> Dict[str, Any]:
     """Make request to Demeterics Groq proxy.
 
     Args:
         system_prompt: System message content
         user_prompt: User message content
         api_key: API key for authentication
+        conn: Connection to send the request on (defaults to the shared
+            keep-alive connection from get_connection())
+        stream: Print the answer while it is generated (see print_stream)
 
     Returns:
         API response as dictionary
@@ -279,55 +544,123 @@ def make_api_request(system_prompt: str, user_prompt: str, api_key: str) -> Dict
         "max_tokens": 2000,
         "temperature": 0.7
     }
+    if stream:
+        request_data["stream"] = True
+        request_data["stream_options"] = {"include_usage": True}
+
+    # Return the saved answer if this exact request was made before
+    # (streamed answers are printed live, so they are never cached)
+    use_cache = not stream and cache_enabled(request_data)
+    if use_cache:
+        cache_file = get_cache_path(request_data)
+        if cache_file.exists():
+            # One write (the newline is part of the text), so the notices
+            # from parallel requests never run into each other
+            print(f"(Answer loaded from {cache_file}; "
+                  "run with --no-cache to call the API)\n", end='')
+            return json.loads(cache_file.read_bytes())
+
+    # Convert to compact JSON bytes (no spaces after , and :), encoded once
+    # here instead of by http.client when it sends a str. For a bytes body
+    # http.client sets Content-Length itself (no chunked encoding) and its
+    # sockets already use TCP_NODELAY, so nothing is delayed by Nagle.
+    json_data = JSON_ENCODER.encode(request_data).encode('utf-8')
+
+    # Reuse an open HTTPS connection instead of a new handshake per request
+    if conn is None:
+        conn = get_connection()
+
+    # Set headers (built once per API key, then reused)
+    headers = get_headers(api_key)
+
+    # Send request (see send_request for reconnects and retries)
+    response = send_request(conn, json_data, headers)
+
+    # Errors are never streamed: they come back as one normal JSON body
+    if stream and response.status == 200:
+        return print_stream(response)
+
+    # Read the whole body, so the connection is ready for the next request
+    response_data = response.read()
+
+    # Parse JSON response straight from the bytes (json.loads detects
+    # UTF-8 itself, which saves decoding the body into a str first)
+    result = json.loads(response_data)
+
+    # Check for API errors
+    if 'error' in result:
+        raise Exception(f"API Error: {result['error'].get('message', 'Unknown error')}")
+
+    # Keep the answer for the next time this template renders the same way
+    if use_cache and response.status == 200:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        tmp_file.write_text(json.dumps(result), encoding='utf-8')
+        os.replace(tmp_file, cache_file)
+
+    return result
+
+# At most this many essays are requested at the same time
+MAX_PARALLEL_REQUESTS = 4
+
+def essay_request(topic: str) -> str:
+    """Return the user message asking for the essay about topic."""
+    return f"Please write the essay about {topic} as specified in the instructions."
+
+def make_api_requests(system_prompt: str, topics: List[str], api_key: str) -> List[Dict[str, Any]]:
+    """Request one essay per topic, several at the same time.
+
+    The compiled system prompt is shared; only the user message differs.
+    Groq's endpoint only supports n=1 (one answer per request), so the
+    topics are sent as parallel requests instead of a single n=k request.
+    Each worker thread keeps its own keep-alive connection, because one
+    HTTPSConnection cannot carry two requests at once.
 
-    # Convert to JSON
-    json_data = json.dumps(request_data)
-
-    # Make HTTPS connection
-    conn = http.client.HTTPSConnection(API_URL)
-
-    try:
-        # Set headers
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-
-        # Send request
-        conn.request("POST", API_PATH, json_data, headers)
-
-        # Get response
-        response = conn.getresponse()
-        response_data = response.read().decode('utf-8')
-
-        # Parse JSON response
-        result = json.loads(response_data)
+    Args:
+        system_prompt: Compiled template (system message content)
+        topics: Essay topics
+        api_key: API key for authentication
 
-        # Check for API errors
-        if 'error' in result:
-            raise Exception(f"API Error: {result['error'].get('message', 'Unknown error')}")
+    Returns:
+        API responses, in the same order as topics
+    """
+    local = threading.local()
+    connections: List[http.client.HTTPSConnection] = []
 
-        return result
+    def request_one(topic: str) -> Dict[str, Any]:
+        if not hasattr(local, 'conn'):
+            local.conn = http.client.HTTPSConnection(API_URL, timeout=60, context=SSL_CONTEXT)
+            connections.append(local.conn)
+        return make_api_request(system_prompt, essay_request(topic), api_key, conn=local.conn)
 
+    workers = min(len(topics), MAX_PARALLEL_REQUESTS)
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            # map() returns the results in the order of topics, not the
+            # order in which the answers arrive
+            return list(pool.map(request_one, topics))
     finally:
-        conn.close()
+        for conn in connections:
+            conn.close()
 
-def display_response(response: Dict[str, Any]) -> None:
+def display_response(response: Dict[str, Any], show_content: bool = True) -> None:
     """Display the API response.
 
     Args:
         response: API response dictionary
+        show_content: False if the essay was already printed (streaming)
     """
     # Extract content
-    if 'choices' in response and response['choices']:
-        content = response['choices'][0]['message']['content']
+    if show_content:
+        if 'choices' in response and response['choices']:
+            content = response['choices'][0]['message']['content']
 
-        print("\n" + "="*70)
-        print("GENERATED ESSAY")
-        print("="*70)
-        print(content)
-    else:
-        print("No response generated")
+            print("\n" + "="*70)
+            print("GENERATED ESSAY")
+            print("="*70)
+            print(content)
+        else:
+            print("No response generated")
 
     # Display usage statistics
     if 'usage' in response:
@@ -356,14 +689,18 @@ def main():
     """Main function to demonstrate template processing."""
 
     # Parse command line arguments
-    category = sys.argv[1] if len(sys.argv) > 1 else "Science"
-    topic = sys.argv[2] if len(sys.argv) > 2 else "Climate Change"
+    # (--stream and --no-cache are flags, not a category or topic)
+    stream = '--stream' in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg not in ('--stream', '--no-cache')]
+    category = args[0] if len(args) > 0 else "Science"
+    topics = args[1:] or ["Climate Change"]
+    topic = topics[0]
 
     print("="*70)
     print("PROMPT TEMPLATE COMPILATION DEMO")
     print("="*70)
     print(f"Category: {category}")
-    print(f"Topic: {topic}")
+    print(f"Topic: {', '.join(topics)}")
 
     # Check for API key
     api_key = os.getenv('DEMETERICS_API_KEY')
@@ -379,7 +716,7 @@ def main():
         create_example_template()
 
     # Get current timestamp
-    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+    now = format_now(int(time.time()))
     print(f"Timestamp: {now}")
 
     # Prepare variables for template
@@ -412,20 +749,31 @@ def main():
         print(processed_prompt[:preview_length] + "...")
         print(f"\n(Showing first {preview_length} characters of {len(processed_prompt)} total)")
 
-        # Create user message
-        user_message = f"Please write the essay about {topic} as specified in the instructions."
-
         # Make API request
         print("\n" + "="*70)
         print("SENDING TO AI")
         print("="*70)
         print(f"Model: {MODEL}")
-        print("Making API request...")
-
-        response = make_api_request(processed_prompt, user_message, api_key)
 
-        # Display response
-        display_response(response)
+        if len(topics) == 1:
+            print("Making API request...")
+            response = make_api_request(processed_prompt, essay_request(topic), api_key, stream=stream)
+
+            # Display response
+            display_response(response, show_content=not stream)
+        else:
+            # The system prompt does not depend on the topic (the topic is in
+            # the user message), so it is compiled once and shared
+            print(f"Making {len(topics)} API requests, up to {MAX_PARALLEL_REQUESTS} at a time...")
+            if stream:
+                print("(--stream is ignored for several topics: the answers would interleave)")
+            responses = make_api_requests(processed_prompt, topics, api_key)
+
+            for essay_topic, response in zip(topics, responses):
+                print("\n" + "#"*70)
+                print(f"TOPIC: {essay_topic}")
+                print("#"*70)
+                display_response(response)
 
         # Educational notes
         print("\n" + "="*70)
@@ -449,6 +797,11 @@ Key techniques demonstrated:
 
 Python-specific features used:
 - pathlib for cross-platform file handling
+- A shared keep-alive HTTPS connection (one TLS handshake per run)
+- An on-disk response cache (AI101_CACHE=1, --no-cache)
+- Streaming with --stream: the first words appear after a fraction of a
+  second, and the full JSON body is never held in memory at once
+- concurrent.futures to request essays for several topics in parallel
 - Regular expressions for pattern matching
 - String formatting for variable substitution
 - datetime for timestamp generation
@@ -7,12 +7,13 @@ WHAT THIS DEMONSTRATES:
     - Reading binary image files in Python
     - Base64 encoding for embedding images in JSON
     - Multi-modal content (text + image) in a single request
+    - Sending several images in one request
     - Automatic image format detection
 
 WHAT YOU'LL LEARN:
     - Binary file handling with 'rb' mode
     - Base64 encoding/decoding for images
-    - MIME type detection from file extensions
+    - MIME type detection from file signatures ("magic bytes")
     - Data URL format for embedded images
     - Multi-content message structure
     - Error handling with try/except
@@ -29,13 +30,21 @@ EXPECTED OUTPUT:
     - Token usage statistics
 
 Run with: python3 03_vision.py
+     or:   python3 04_vision.py photo1.jpg photo2.png   (up to 5 images, one request)
+     or:   python3 04_vision.py https://picsum.photos/400/300   (image URL)
+     Add --stream to see the answer while it is written,
+     or --no-cache to always call the API (see AI101_CACHE in 01_basic_chat.py)
 Create test image: curl -o test_image.jpg https://picsum.photos/400/300
 """
 
+import atexit       # For closing the shared connection when the script ends
 import http.client  # For HTTPS API requests
 import json         # For JSON encoding/decoding
 import os           # For environment variables
-import base64       # For encoding binary image data to text
+import ssl          # For sharing one TLS configuration between connections
+import sys          # For the image paths given on the command line
+import binascii     # For encoding binary image data to base64 text
+import mmap         # For reading the image without copying it into memory
 
 # ==============================================================================
 # Step 1: Load and validate API credentials
@@ -50,71 +59,203 @@ if not api_key:
     exit(1)
 
 # ==============================================================================
-# Step 2: Specify the image file path
+# Step 2: Specify the image file path(s)
 # ==============================================================================
 
-# Path to test_image.jpg from the root directory
-image_path = '../test_image.jpg'
+# Path to test_image.jpg from the root directory, or the images named on the
+# command line: python3 04_vision.py photo1.jpg photo2.png
+# An image that is already online can be given by its web address instead:
+#   python3 04_vision.py https://example.com/photo.jpg
+# The API then downloads it itself, so we upload a short URL instead of the
+# whole (base64-encoded, 33% bigger) image - by far the cheapest way to
+# send a large picture.
+# Several images go into ONE request, so the AI can describe or compare them
+# together and we pay for one round-trip instead of one per image.
+# (--stream and --no-cache are options, not images - see Steps 6 and 10)
+STREAM = '--stream' in sys.argv
+image_paths = ([arg for arg in sys.argv[1:] if arg not in ('--stream', '--no-cache')]
+               or ['../test_image.jpg'])
+
+# Groq's vision models accept at most 5 images per request
+MAX_IMAGES = 5
+if len(image_paths) > MAX_IMAGES:
+    print(f"Error: at most {MAX_IMAGES} images per request ({len(image_paths)} given)")
+    exit(1)
+
+# Largest base64 text the API accepts for one embedded image (4 MB)
+MAX_BASE64_SIZE = 4 * 1024 * 1024
+
+# The image is base64-encoded in pieces of this many bytes (192 KB).
+# It must be a multiple of 3 - see Step 3.
+BASE64_CHUNK_SIZE = 3 * 64 * 1024
 
 # ==============================================================================
-# Step 3: Read and encode the image file
+# Step 3: Read and encode an image file
 # ==============================================================================
 
 # Before sending images to the API, we must:
 # 1. Read the image as binary data
 # 2. Encode it to base64 (converts binary to text)
 # 3. Create a data URL with the base64 string
-
-# Try to read and encode the image (with error handling)
-try:
-    # Open file in binary read mode ('rb') - images are binary data, not text
-    with open(image_path, 'rb') as image_file:
-        # Read the entire image file into memory as bytes
-        image_data = image_file.read()
-
-        # Before sending to API, encode binary data to base64 string
-        # base64.b64encode() returns bytes, so we decode to get a string
-        image_base64 = base64.b64encode(image_data).decode('utf-8')
+#
+# Images can be large, so we never build the whole base64 text in memory:
+# check_image() only looks at the start of the file, and Step 9 encodes the
+# image piece by piece with send_image_base64() while it is being sent.
+
+
+def base64_length(size):
+    """Return how many base64 characters encode size bytes (with padding)."""
+    # Every 3 bytes (rounded up) become 4 characters
+    return (size + 2) // 3 * 4
+
+
+def check_image(image_path):
+    """Check one image file and return (MIME type, size in bytes)."""
+    # Try to read the image (with error handling)
+    try:
+        # Open file in binary read mode ('rb') - images are binary data, not text
+        with open(image_path, 'rb') as image_file:
+            # The first bytes of a file tell us its real format (Step 4)
+            mime_type = detect_mime_type(image_path, image_file.read(12))
+            image_size = os.fstat(image_file.fileno()).st_size
+
+    except FileNotFoundError:
+        # Handle case where image file doesn't exist
+        print(f"Error: Image file '{image_path}' not found")
+        print("\nTo create a test image, run:")
+        print("  curl -o test_image.jpg https://picsum.photos/400/300")
+        exit(1)
+
+    if image_size == 0:
+        print(f"Error: Image file '{image_path}' is empty")
+        exit(1)
+
+    # The API rejects embedded images whose base64 text is over 4 MB
+    # (a file of about 3 MB). Checking the size now, before anything is
+    # encoded or sent, avoids uploading megabytes just to get an error back.
+    if base64_length(image_size) > MAX_BASE64_SIZE:
+        print(f"Error: Image file '{image_path}' is too large "
+              f"({image_size / 1024 / 1024:.1f} MB)")
+        print("Embedded images are limited to 4 MB of base64 (about 3 MB of image).")
+        print("Make it smaller, or put it online and pass its URL instead:")
+        print("  python3 04_vision.py https://example.com/photo.jpg")
+        exit(1)
 
     # Display image loading information
-    print(f"Image loaded: {image_path}")
-    print(f"Image size: {len(image_data) / 1024:.2f} KB")
-    print(f"Base64 size: {len(image_base64) / 1024:.2f} KB")
+    print(f"Image loaded: {image_path} ({mime_type})")
+    print(f"Image size: {image_size / 1024:.2f} KB")
+    print(f"Base64 size: {base64_length(image_size) / 1024:.2f} KB")
     print("(Base64 is ~33% larger than original)\n")
 
-except FileNotFoundError:
-    # Handle case where image file doesn't exist
-    print(f"Error: Image file '{image_path}' not found")
-    print("\nTo create a test image, run:")
-    print("  curl -o test_image.jpg https://picsum.photos/400/300")
-    exit(1)
+    return mime_type, image_size
+
+
+def send_image_base64(image_path, send):
+    """Base64-encode an image chunk by chunk, passing each chunk to send()."""
+    with open(image_path, 'rb') as image_file:
+        # Instead of copying the whole file into a bytes object with
+        # image_file.read(), we "memory-map" it: the operating system lets us
+        # use the file's contents as if they were bytes in memory, loading
+        # them from disk only when they are touched. Slicing the map, like
+        # image_data[0:100], reads just that part of the file.
+        # (0 = map the whole file, ACCESS_READ = read-only)
+        with mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ) as image_data:
+            # Hint that we read the file once, front to back, so the OS can
+            # load the next pages ahead of time (Linux/macOS, Python 3.8+)
+            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                image_data.madvise(mmap.MADV_SEQUENTIAL)
+
+            # Base64 turns every 3 input bytes into 4 characters, so a piece
+            # whose length is a multiple of 3 encodes exactly like the same
+            # bytes inside the whole file (padding "=" only appears at the
+            # very end). Only one small chunk exists in memory at a time.
+            #
+            # base64.b64encode(data) is a small Python wrapper around
+            # binascii.b2a_base64(data, newline=False); calling the C
+            # function directly skips the wrapper for every chunk.
+            for offset in range(0, len(image_data), BASE64_CHUNK_SIZE):
+                chunk = image_data[offset:offset + BASE64_CHUNK_SIZE]
+                send(binascii.b2a_base64(chunk, newline=False))
 
 # ==============================================================================
-# Step 4: Detect image MIME type from file extension
+# Step 4: Detect image MIME type from the file's first bytes
 # ==============================================================================
 
 # Before creating the data URL, we need to specify the correct MIME type
 # This tells the API what kind of image we're sending
+#
+# File names can lie: phones and screenshot tools often save PNG images as
+# "something.jpg". The file's contents can't: every image format starts
+# with a fixed "signature" (also called "magic bytes").
+IMAGE_SIGNATURES = [
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+]
+
+# File extension → MIME type, used only if the signature is not recognized.
+# A dictionary finds the answer in one lookup, instead of testing the
+# extensions one after another with if/elif.
+MIME_TYPES = {
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp',
+}
 
-# Check file extension to determine MIME type
-if image_path.lower().endswith('.png'):
-    mime_type = 'image/png'
-elif image_path.lower().endswith(('.jpg', '.jpeg')):
-    mime_type = 'image/jpeg'
-elif image_path.lower().endswith('.gif'):
-    mime_type = 'image/gif'
-elif image_path.lower().endswith('.webp'):
-    mime_type = 'image/webp'
-else:
-    mime_type = 'image/jpeg'  # Default to JPEG if unknown
+
+def detect_mime_type(image_path, header):
+    """Return the MIME type for an image, from its first 12 bytes (header).
+
+    Falls back to the file extension for formats we don't recognize.
+    """
+    for signature, mime_type in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return mime_type
+
+    # WebP files start with 'RIFF', 4 bytes of file size, then 'WEBP'
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'image/webp'
+
+    # os.path.splitext('photos/cat.PNG') → ('photos/cat', '.PNG')
+    extension = os.path.splitext(image_path)[1].lower()
+    return MIME_TYPES.get(extension, 'image/jpeg')  # Default to JPEG if unknown
 
 # ==============================================================================
-# Step 5: Build the data URL with base64-encoded image
+# Step 5: Build a data URL for each local image
 # ==============================================================================
 
 # Create data URL format: data:[mime-type];base64,[base64-data]
-# This is how we embed the image directly in JSON
-image_url = f"data:{mime_type};base64,{image_base64}"
+# This is how we embed the image directly in JSON.
+#
+# The base64 text is large (hundreds of KB or more). Putting it inside the
+# payload dictionary would make json.dumps() copy it into a string, and
+# .encode() copy it again into bytes. Instead, the payload holds a short
+# placeholder where each image's base64 data belongs ("@@IMAGE_0@@",
+# "@@IMAGE_1@@", ...), and Step 9 sends the real bytes in its place.
+local_paths = []          # The local image files, in order
+image_sizes_base64 = []   # The base64 length of each local image
+image_items = []          # One "image_url" content item per image
+for image_path in image_paths:
+    if image_path.startswith(('http://', 'https://')):
+        # Remote image: the URL goes into the request as it is
+        print(f"Image URL: {image_path}\n")
+        image_items.append({"type": "image_url", "image_url": {"url": image_path}})
+        continue
+
+    mime_type, image_size = check_image(image_path)
+    placeholder = f"@@IMAGE_{len(local_paths)}@@"
+    local_paths.append(image_path)
+    image_sizes_base64.append(base64_length(image_size))
+    image_items.append({
+        "type": "image_url",
+        "image_url": {
+            # Our data URL (placeholder for now)
+            "url": f"data:{mime_type};base64,{placeholder}"
+        }
+    })
 
 # ==============================================================================
 # Step 6: Create the request payload with multi-modal content
@@ -125,6 +266,12 @@ image_url = f"data:{mime_type};base64,{image_base64}"
 # - Content items can be text OR images
 # - The AI processes them together
 
+if len(image_paths) == 1:
+    question = "What is in this image? Describe it in detail."
+else:
+    question = (f"What is in these {len(image_paths)} images? "
+                "Describe each one in detail, in order.")
+
 # Create the request with BOTH text and image content
 payload = {
     "model": "meta-llama/llama-4-scout-17b-16e-instruct",
@@ -132,32 +279,50 @@ payload = {
         {
             "role": "user",
             # IMPORTANT: content is now an ARRAY of content items, not a string
-            "content": [
-                {
-                    # First content item: text instruction
-                    "type": "text",
-                    "text": "What is in this image? Describe it in detail."
-                },
-                {
-                    # Second content item: the image itself
-                    "type": "image_url",
-                    "image_url": {
-                        "url": image_url  # Our base64-encoded data URL
-                    }
-                }
-            ]
+            # First content item: text instruction
+            # Then one content item per image
+            "content": [{"type": "text", "text": question}] + image_items
         }
     ],
     "temperature": 0.3,  # Low temperature for factual, detailed descriptions
     "max_tokens": 500    # Allow longer response for detailed image description
 }
 
+# With --stream, the answer is sent piece by piece while it is being
+# written (Server-Sent Events), so the first words appear after a moment
+# instead of after the whole 500-token description is done.
+if STREAM:
+    payload["stream"] = True
+    payload["stream_options"] = {"include_usage": True}  # Token counts at the end
+
 # ==============================================================================
-# Step 7: Establish HTTPS connection to the API
+# Step 7: Get a reusable HTTPS connection to the API
 # ==============================================================================
 
-# Create secure connection to Demeterics Groq proxy
-conn = http.client.HTTPSConnection("api.demeterics.com")
+# Analysing several images in a loop sends them all over one kept-alive
+# connection (see 01_basic_chat.py).
+_CONNECTIONS = {}
+SSL_CONTEXT = ssl.create_default_context()
+
+
+def get_shared_connection(host):
+    """Return the cached HTTPS connection for host, creating it on first use."""
+    conn = _CONNECTIONS.get(host)
+    if conn is None:
+        conn = http.client.HTTPSConnection(host, timeout=30,
+                                           context=SSL_CONTEXT)
+        _CONNECTIONS[host] = conn
+    return conn
+
+
+def close_shared_connections():
+    """Close every cached connection (called automatically at exit)."""
+    for conn in _CONNECTIONS.values():
+        conn.close()
+    _CONNECTIONS.clear()
+
+
+atexit.register(close_shared_connections)
 
 # ==============================================================================
 # Step 8: Prepare authentication headers
@@ -166,45 +331,206 @@ conn = http.client.HTTPSConnection("api.demeterics.com")
 # Set up required headers
 headers = {
     'Content-Type': 'application/json',
-    'Authorization': f'Bearer {api_key}'
+    'Authorization': f'Bearer {api_key}',
+    'Connection': 'keep-alive'  # Ask the server to leave the connection open
 }
 
 # ==============================================================================
 # Step 9: Send the POST request with image data
 # ==============================================================================
 
-# Make the API request (this may take longer due to image processing)
-conn.request("POST", "/groq/v1/chat/completions", json.dumps(payload), headers)
+# Turn the payload (with its placeholders) into compact JSON bytes, then
+# cut it at each placeholder. Each image's base64 bytes go where its
+# placeholder was. With one image the body is sent in three parts:
+#   b'{"model":...,"url":"data:image/jpeg;base64,'
+#   <the image's base64 bytes, encoded while sending>
+#   b'"}}]}],"temperature":0.3,"max_tokens":500}'
+# Base64 only uses letters, digits, "+", "/" and "=", none of which need
+# escaping inside a JSON string, so the bytes can be inserted as they are.
+payload_json = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+body_parts = []   # JSON bytes and image paths, in sending order
+rest = payload_json
+for index, image_path in enumerate(local_paths):
+    before, rest = rest.split(f"@@IMAGE_{index}@@".encode('utf-8'))
+    body_parts += [before, image_path]
+body_parts.append(rest)
+
+# The exact body size is known before a single image byte is encoded
+content_length = sum(len(part) for part in body_parts[::2]) + sum(image_sizes_base64)
+
+
+def write_body(body_parts, write):
+    """Pass the whole request body, piece by piece, to write().
+
+    bytes parts are written as they are; the other parts are image paths
+    whose base64 text is encoded and written chunk by chunk. write can be
+    anything that accepts bytes: conn.send for the API, or f.write to save
+    the exact request to a file (or a pipe to another program):
+        with open('request.json', 'wb') as f:
+            write_body(body_parts, f.write)
+    """
+    for part in body_parts:
+        if isinstance(part, bytes):
+            write(part)
+        else:
+            send_image_base64(part, write)
+
+
+def send_streamed_request(host, path, headers, body_parts, content_length):
+    """POST body_parts over the shared connection and return the response.
+
+    The body is produced piece by piece by write_body(). conn.request()
+    needs the whole body up front, so we use its building blocks instead:
+    putrequest() + putheader() + endheaders() send the headers, then
+    conn.send() sends each piece of the body as soon as it is ready.
+
+    If the server closed our idle kept-alive connection, reconnect once.
+    """
+    for attempt in range(2):
+        conn = get_shared_connection(host)
+        try:
+            conn.putrequest("POST", path)
+            # We announce the size ourselves, so the server knows where the
+            # body ends without the whole body being in memory
+            conn.putheader('Content-Length', str(content_length))
+            for name, value in headers.items():
+                conn.putheader(name, value)
+            conn.endheaders()
+
+            write_body(body_parts, conn.send)
+            return conn.getresponse()
+        except (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                ConnectionResetError, BrokenPipeError):
+            _CONNECTIONS.pop(host).close()
+            if attempt == 1:
+                raise
+
 
 # ==============================================================================
-# Step 10: Receive and parse the response
+# Step 10: Receive and parse the response (or reuse a saved answer)
 # ==============================================================================
 
-# Get the response from the server
-response = conn.getresponse()
-
-# Parse the JSON response
-response_data = json.loads(response.read().decode('utf-8'))
+# While you try out questions on the same image you send the same request
+# over and over. Identical requests can reuse a saved answer instead of
+# calling the API again. Deterministic requests (temperature 0) are cached
+# automatically; set AI101_CACHE=1 to also cache others like this one, or
+# run with --no-cache to always call the API (see 01_basic_chat.py).
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'ai101')
+
+
+def cache_enabled(payload):
+    """Return True if this request's answer may be read from / saved to disk."""
+    if '--no-cache' in sys.argv:
+        return False
+    return payload.get('temperature') == 0 or os.environ.get('AI101_CACHE') == '1'
+
+
+def get_cache_path(host, path, payload, image_paths):
+    """Return the cache file named after the SHA-256 of the request.
+
+    The payload only holds placeholders for the images, so the images'
+    contents are hashed too: editing a picture gives a new cache entry.
+    """
+    import hashlib
+
+    key = hashlib.sha256(json.dumps([host, path, payload], sort_keys=True).encode('utf-8'))
+    for image_path in image_paths:
+        with open(image_path, 'rb') as image_file:
+            with mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ) as image_data:
+                key.update(image_data)
+    return os.path.join(CACHE_DIR, key.hexdigest() + '.json')
+
+
+def print_stream(response):
+    """Print a streamed answer as it arrives and return it as a normal response.
+
+    Each "data: {...}" line holds one small piece of the answer, so we never
+    wait for (or hold) the whole body. See 03_prompt_template.py.
+    """
+    print("AI Vision Analysis:")
+    print("=" * 50)
+
+    pieces = []
+    usage = {}
+    for line in iter(response.readline, b''):
+        line = line.strip()
+        if not line.startswith(b'data: ') or line == b'data: [DONE]':
+            continue
+        event = json.loads(line[len(b'data: '):])
+        if event.get('choices'):
+            text = event['choices'][0]['delta'].get('content') or ''
+            pieces.append(text)
+            print(text, end='', flush=True)
+        # Usage arrives in the last event (Groq nests it under x_groq)
+        usage = event.get('usage') or event.get('x_groq', {}).get('usage') or usage
+    print()
+    print("=" * 50)
+
+    return {
+        "choices": [{"message": {"role": "assistant", "content": ''.join(pieces)}}],
+        "usage": usage
+    }
+
+
+def cached_chat(host, path, payload, headers, body_parts, content_length):
+    """Return the API's answer as a dictionary, from the cache when possible."""
+    # (streamed answers are printed live, so they are never cached)
+    use_cache = not payload.get('stream') and cache_enabled(payload)
+    if use_cache:
+        # body_parts alternates JSON bytes and image paths (Step 9)
+        cache_file = get_cache_path(host, path, payload, body_parts[1::2])
+        if os.path.exists(cache_file):
+            print(f'(Answer loaded from {cache_file}; '
+                  'run with --no-cache to call the API)\n')
+            with open(cache_file, 'rb') as f:
+                return json.loads(f.read())
+
+    # Make the API request (this may take longer due to image processing)
+    response = send_streamed_request(host, path, headers, body_parts, content_length)
+
+    # Errors are never streamed: they come back as one normal JSON body
+    if payload.get('stream') and response.status == 200:
+        return print_stream(response)
+
+    # Parse the JSON response. json.loads() accepts the raw UTF-8 bytes,
+    # so there is no .decode() copy of the whole body first.
+    response_json = json.loads(response.read())
+
+    # Keep the analysis, so the same images and question skip the upload
+    if use_cache and response.status == 200:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(response_json, f)
+        os.replace(tmp_file, cache_file)
+
+    return response_json
+
+
+response_data = cached_chat("api.demeterics.com", "/groq/v1/chat/completions",
+                            payload, headers, body_parts, content_length)
 
 # ==============================================================================
 # Step 11: Clean up the connection
 # ==============================================================================
 
-# Close the connection
-conn.close()
+# Nothing to do here: the connection stays open for reuse and is closed
+# automatically by close_shared_connections() when the script exits.
 
 # ==============================================================================
 # Step 12: Display the AI's image analysis
 # ==============================================================================
 
 # Display the AI's visual analysis of the image
-print("AI Vision Analysis:")
-print("=" * 50)
-print(response_data['choices'][0]['message']['content'])
-print("=" * 50)
+# (with --stream it was already printed while it arrived)
+if not STREAM:
+    print("AI Vision Analysis:")
+    print("=" * 50)
+    print(response_data['choices'][0]['message']['content'])
+    print("=" * 50)
 
 # Show token usage (note: images consume more tokens than text)
-print(f"\nToken Usage: {response_data['usage']['total_tokens']} tokens")
+print(f"\nToken Usage: {response_data['usage'].get('total_tokens', 'unknown')} tokens")
 
 # Python file handling concepts:
 #
@@ -235,6 +561,11 @@ print(f"\nToken Usage: {response_data['usage']['total_tokens']} tokens")
 #   os.path.getsize('file.txt')  # Size in bytes
 #   len(data)                    # Size of data in memory
 #
+# Memory-mapped files:
+#   with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+#       data[:4]      # Works like bytes, but nothing is copied up front:
+#                     # the OS loads each part of the file when it is used
+#
 # Base64 encoding:
 #   base64.b64encode(bytes)     # Encode bytes → base64 bytes
 #   base64.b64decode(bytes)     # Decode base64 bytes → original bytes
@@ -244,15 +575,56 @@ print(f"\nToken Usage: {response_data['usage']['total_tokens']} tokens")
 # Example:
 #   original = b'Hello'                    # bytes
 #   encoded = base64.b64encode(original)   # b'SGVsbG8='
-#   encoded_str = encoded.decode('utf-8')  # 'SGVsbG8='
+#   encoded_str = encoded.decode('ascii')  # 'SGVsbG8='
+#   (base64 output is always plain ASCII, and the ASCII decoder is simpler
+#   and faster than UTF-8; use 'utf-8' for text that may contain é, ü, 😀...)
 #   decoded = base64.b64decode(encoded)    # b'Hello'
 #
+# base64 vs binascii:
+#   base64.b64encode(b'Hi')                      # b'SGk='
+#   binascii.b2a_base64(b'Hi', newline=False)    # b'SGk=' (same C code,
+#                                                #  without the wrapper)
+#   binascii.b2a_base64(b'Hi')                   # b'SGk=\n' (adds a newline!)
+#
+# Encoding in chunks:
+#   b64encode(b'abc') + b64encode(b'def') == b64encode(b'abcdef')
+#   This only holds when every chunk but the last is a multiple of 3 bytes
+#   long; otherwise "=" padding would appear in the middle.
+#
+# Freeing memory early with del:
+#   del data   # Removes the name; once nothing refers to the data any more,
+#              # Python frees it immediately (not only when the script ends)
+#   Variables inside a function are freed the same way when it returns,
+#   which is why send_image_base64() leaves no image data behind.
+#
+# Building a big request body without extra copies:
+#   prefix, suffix = b'{"url":"@@X@@"}'.split(b'@@X@@')
+#   body = b''.join((prefix, big_data, suffix))   # Copies big_data once
+#   (prefix + big_data + suffix would build a temporary copy in between)
+#
+# Sending a body piece by piece (what Step 9 does):
+#   conn.putrequest("POST", path)              # Request line
+#   conn.putheader('Content-Length', '1234')   # One header at a time
+#   conn.endheaders()                          # Headers are sent
+#   conn.send(piece)                           # Then the body, in pieces
+#   response = conn.getresponse()
+#
 # String methods for paths:
 #   .endswith('.jpg')     # True if string ends with '.jpg'
 #   .startswith('/home')  # True if string starts with '/home'
 #   .lower()              # Convert to lowercase
 #   .replace('.jpg', '.png')  # Replace substring
 #
+# Magic bytes (file signatures):
+#   PNG  files start with  b'\x89PNG\r\n\x1a\n'
+#   JPEG files start with  b'\xff\xd8\xff'
+#   GIF  files start with  b'GIF87a' or b'GIF89a'
+#   header.startswith(b'\xff\xd8\xff')   # Works on bytes just like on str
+#
+# Splitting off the extension:
+#   os.path.splitext('photo.JPG')            # ('photo', '.JPG')
+#   os.path.splitext('photo.JPG')[1].lower() # '.jpg' - ready for a dict lookup
+#
 # Better way using pathlib (Python 3.4+):
 #   from pathlib import Path
 #   p = Path('image.jpg')
@@ -261,9 +633,19 @@ print(f"\nToken Usage: {response_data['usage']['total_tokens']} tokens")
 #   p.name           # 'image.jpg'
 #   p.exists()       # True if file exists
 #
+# Streaming (--stream):
+#   for line in iter(response.readline, b''):   # One line at a time, as
+#       ...                                      # soon as it arrives
+#   b'data: {"choices":[{"delta":{"content":"A red"}}]}'
+#   b'data: [DONE]'                              # End of the answer
+#
+# Response cache:
+#   AI101_CACHE=1 python3 04_vision.py   -> second run answers instantly
+#   python3 04_vision.py --no-cache      -> always ask the API
+#
 # Image size limits:
 #   Base64 embedded: 4 MB max
-#   URL (remote): 20 MB max
+#   URL (remote): 20 MB max     (python3 04_vision.py https://.../photo.jpg)
 #   Resolution: 33 megapixels max
 #
 # Why base64?
@@ -285,3 +667,9 @@ print(f"\nToken Usage: {response_data['usage']['total_tokens']} tokens")
 #   "Describe this image for someone who can't see"
 #   "What's the mood or atmosphere of this image?"
 #   "Count how many people are in this image"
+#
+# Why this file can have so many comments:
+#   Python compiles a script to bytecode before running it, and comments are
+#   thrown away at that point - they are not part of the bytecode at all.
+#   Imported modules keep that bytecode in __pycache__/*.pyc, so later runs
+#   don't even re-read the comments. Explaining things costs nothing.
@@ -16,6 +16,8 @@ LlamaGuard checks images for:
 
 Usage:
     python 06_image_safety_check.py
+    python 06_image_safety_check.py photo.png
+    python 06_image_safety_check.py https://example.com/photo.jpg
 
 Environment:
     DEMETERICS_API_KEY - Your Demeterics Managed LLM Key
@@ -23,46 +25,91 @@ Environment:
 
 import os
 import json
-import base64
+import re
+import atexit
+import binascii
 import http.client
+import mmap
+import ssl
+import sys
+import threading
 from pathlib import Path
 
-def check_image_safety(image_path):
+# Calling check_image_safety() in a loop checks every image over the same
+# kept-alive connection (see 01_basic_chat.py).
+_CONNECTIONS = {}
+SSL_CONTEXT = ssl.create_default_context()
+
+def get_shared_connection(host):
+    """Return the cached HTTPS connection for host, creating it on first use."""
+    conn = _CONNECTIONS.get(host)
+    if conn is None:
+        conn = http.client.HTTPSConnection(host, timeout=30,
+                                           context=SSL_CONTEXT)
+        _CONNECTIONS[host] = conn
+    return conn
+
+def close_shared_connections():
+    """Close every cached connection (called automatically at exit)."""
+    for conn in _CONNECTIONS.values():
+        conn.close()
+    _CONNECTIONS.clear()
+
+atexit.register(close_shared_connections)
+
+def send_request(host, path, body, headers):
+    """POST body over the shared connection and return the response.
+
+    If the server closed our idle kept-alive connection, reconnect once.
+    Depending on timing, a closed connection shows up as an empty answer
+    (RemoteDisconnected, BadStatusLine) or as an error while sending
+    (ConnectionResetError, BrokenPipeError).
     """
-    Check if an image is safe using LlamaGuard Vision
-
-    Args:
-        image_path: Path to the image file
-
-    Returns:
-        dict: API response with safety assessment
+    try:
+        conn = get_shared_connection(host)
+        conn.request("POST", path, body, headers)
+        return conn.getresponse()
+    except (http.client.RemoteDisconnected, http.client.BadStatusLine,
+            ConnectionResetError, BrokenPipeError):
+        _CONNECTIONS.pop(host).close()
+        conn = get_shared_connection(host)
+        conn.request("POST", path, body, headers)
+        return conn.getresponse()
+
+def warm_up_connection(host):
+    """Open the shared connection to host on a background thread.
+
+    The TCP + TLS handshakes then happen while we read and encode the image,
+    instead of delaying the request. Returns the thread; join() it before
+    using the connection, since one connection must not be used by two
+    threads at once.
     """
-    # Step 1: Check API key
-    api_key = os.getenv('DEMETERICS_API_KEY')
-    if not api_key:
-        raise ValueError("DEMETERICS_API_KEY environment variable not set")
-
-    # Step 2: Load and encode the image
-    print(f"Loading image: {image_path}")
-
-    # Check if file exists
-    if not Path(image_path).exists():
-        raise FileNotFoundError(f"Image not found: {image_path}")
-
-    # Read and encode to base64
-    with open(image_path, 'rb') as f:
-        image_data = f.read()
-
-    # Encode to base64 and convert to string
-    image_base64 = base64.b64encode(image_data).decode('utf-8')
-
-    # Get image size for info
-    image_size = len(image_data)
-    print(f"Image size: {image_size:,} bytes")
-    print(f"Base64 size: {len(image_base64):,} characters")
-
-    # Step 3: Prepare the API request
-    request_data = {
+    def connect():
+        conn = get_shared_connection(host)
+        try:
+            conn.connect()
+        except OSError:
+            # No harm done: close() resets the connection, and the request
+            # will try again to connect (and report the error if it fails)
+            conn.close()
+
+    thread = threading.Thread(target=connect, daemon=True)
+    thread.start()
+    return thread
+
+# Marks where the base64 image goes in the request JSON (see below)
+IMAGE_PLACEHOLDER = '@@IMAGE@@'
+
+# Encode the image in pieces of this many bytes (a multiple of 3). The
+# encoding itself is done by binascii, which is written in C and ships with
+# every Python installation, so there is no slow pure-Python fallback to
+# worry about: a multi-megabyte image encodes in milliseconds, far less than
+# the time it takes to upload.
+BASE64_CHUNK_SIZE = 3 * 64 * 1024
+
+def build_request_data(image_url):
+    """Return the LlamaGuard Vision request for one image URL"""
+    return {
         "model": "meta-llama/llama-guard-4-12b",
         "messages": [
             {
@@ -75,44 +122,249 @@ def check_image_safety(image_path):
                     {
                         "type": "image_url",
                         "image_url": {
-                            "url": f"data:image/jpeg;base64,{image_base64}"
+                            "url": image_url
                         }
                     }
                 ]
             }
         ],
-        "max_tokens": 100  # Safety responses are typically short
+        "max_tokens": 16,  # The verdict is a few tokens ("safe", "unsafe\nS1")
+        "temperature": 0,  # Same image, same verdict
+        "stop": ["\n\n"]  # The verdict never contains a blank line
     }
 
+# File names can lie: phones and screenshot tools often save PNG images as
+# "something.jpg". The file's contents can't: every image format starts
+# with a fixed "signature" (also called "magic bytes"), see 04_vision.py.
+IMAGE_SIGNATURES = [
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+]
+
+# File extension → MIME type, used only if the signature is not recognized
+MIME_TYPES = {
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp',
+}
+
+def detect_mime_type(image_path, header):
+    """Return the MIME type for an image, from its first 12 bytes (header).
+
+    Falls back to the file extension for formats we don't recognize.
+    """
+    for signature, mime_type in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return mime_type
+
+    # WebP files start with 'RIFF', 4 bytes of file size, then 'WEBP'
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'image/webp'
+
+    extension = os.path.splitext(image_path)[1].lower()
+    return MIME_TYPES.get(extension, 'image/jpeg')  # Default to JPEG if unknown
+
+# For a local image only the base64 text (and the image type) changes from
+# one request to the next. So the rest is turned into compact JSON bytes (no
+# spaces after , and :) once, when the script starts, with IMAGE_PLACEHOLDER
+# where the image goes, and cut in two around it: one ready-made pair for
+# each image type. Each request then only has to put the base64 text
+# between the two halves. This also avoids keeping the image in memory
+# several times over (as a base64 string, inside the dictionary, and again
+# inside the JSON text).
+def build_image_request(mime_type):
+    """Return (request_data, prefix, suffix) for a local image of mime_type"""
+    request_data = build_request_data(f"data:{mime_type};base64,{IMAGE_PLACEHOLDER}")
+    prefix, _, suffix = json.dumps(
+        request_data, separators=(',', ':')
+    ).encode('utf-8').partition(IMAGE_PLACEHOLDER.encode('ascii'))
+
+    # The base64 text goes into the JSON as it is, without the escaping
+    # scan json.dumps() would run over every character. That is safe
+    # because base64 only uses A-Z, a-z, 0-9, + and / (plus = at the end):
+    # never a quote, a backslash or a control character, the only things
+    # JSON has to escape. What could go wrong is the placeholder itself not
+    # ending up in the JSON unchanged; check that here (partition() leaves
+    # suffix empty if the placeholder is missing).
+    assert suffix, "IMAGE_PLACEHOLDER was not found in the request JSON"
+    return request_data, prefix, suffix
+
+IMAGE_REQUESTS = {mime_type: build_image_request(mime_type)
+                  for mime_type in set(MIME_TYPES.values())}
+
+# Apps often check the same picture again (a re-upload, a retry), and
+# saved results let a repeated image skip the API call. Like the text
+# guards (05 and 07), a security check only reuses old verdicts if you opt
+# in with: export AI101_CACHE=1 (--no-cache still skips the cache).
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'ai101')
+
+def cache_enabled(request_data):
+    """Return True if this request's answer may be read from / saved to disk."""
+    if '--no-cache' in sys.argv:
+        return False
+    return os.environ.get('AI101_CACHE') == '1'
+
+def get_cache_path(host, path, body_parts):
+    """Return the cache file named after the SHA-256 of the request.
+
+    body_parts are the pieces of the request body (JSON before the image,
+    the raw image bytes, JSON after it). Hashing the raw image is quicker
+    than hashing its base64 text, and the same image always gives the same
+    base64 text, so the key still identifies the request.
+    """
+    import hashlib
+
+    hasher = hashlib.sha256(f'{host}{path}'.encode('utf-8'))
+    for part in body_parts:
+        hasher.update(part)
+    return os.path.join(CACHE_DIR, hasher.hexdigest() + '.json')
+
+def check_image_safety(image_path):
+    """
+    Check if an image is safe using LlamaGuard Vision
+
+    Args:
+        image_path: Path to the image file
+
+    Returns:
+        dict: API response with safety assessment
+    """
+    # Step 1: Check API key
+    api_key = os.getenv('DEMETERICS_API_KEY')
+    if not api_key:
+        raise ValueError("DEMETERICS_API_KEY environment variable not set")
+
+    # Step 2: Load and encode the image
+    # An image that is already online is sent as its URL: the API fetches
+    # it, so nothing is uploaded and there is no base64 to build (a base64
+    # upload is a third bigger than the image itself).
+    is_url = image_path.startswith(('http://', 'https://'))
+    if is_url:
+        print(f"Image URL: {image_path}")
+        image_data = b''
+    else:
+        print(f"Loading image: {image_path}")
+
+        # Check if file exists
+        if not Path(image_path).exists():
+            raise FileNotFoundError(f"Image not found: {image_path}")
+
+        # Read the image. Instead of copying the whole file into a bytes
+        # object with f.read(), we "memory-map" it: the operating system
+        # lets us use the file's contents as if they were bytes in memory,
+        # loading them from disk only when they are touched (see
+        # 04_vision.py). The map stays usable after the file is closed.
+        with open(image_path, 'rb') as f:
+            image_size = os.fstat(f.fileno()).st_size
+            if image_size == 0:
+                raise ValueError(f"Image file is empty: {image_path}")
+            image_data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # We read it once, front to back: let the OS load pages ahead of time
+        # (Linux/macOS, Python 3.8+)
+        if hasattr(mmap, 'MADV_SEQUENTIAL'):
+            image_data.madvise(mmap.MADV_SEQUENTIAL)
+
+        # Get image size for info (base64 turns every 3 bytes into 4 characters)
+        base64_size = (image_size + 2) // 3 * 4
+        print(f"Image size: {image_size:,} bytes")
+        print(f"Base64 size: {base64_size:,} characters")
+
+    # Step 3: Prepare the API request
+    if is_url:
+        # The whole request fits in prefix; there is nothing to splice in
+        request_data = build_request_data(image_path)
+        prefix = json.dumps(request_data, separators=(',', ':')).encode('utf-8')
+        suffix = b''
+    else:
+        # Same request as every other local image of this type: use the
+        # ready-made JSON
+        mime_type = detect_mime_type(image_path, image_data[:12])
+        print(f"Image type: {mime_type}")
+        request_data, prefix, suffix = IMAGE_REQUESTS[mime_type]
+
+    # Checked this exact image before? Then reuse the saved result
+    host, path = "api.demeterics.com", "/groq/v1/chat/completions"
+    use_cache = cache_enabled(request_data)
+    if use_cache:
+        cache_file = get_cache_path(host, path, [prefix, image_data, suffix])
+        if os.path.exists(cache_file):
+            print("\nUsing the saved safety result for this image")
+            with open(cache_file, 'rb') as f:
+                return json.loads(f.read())
+
+    # Start connecting to the API now, while we encode the image
+    warm_up = warm_up_connection(host)
+
+    # Build the body in one growing bytearray: the JSON before the image,
+    # the base64 text piece by piece, then the JSON after it. Base64 needs
+    # no JSON escaping (see build_image_request() above). Pieces
+    # are a multiple of 3 bytes long, so they encode without "=" padding in
+    # the middle. binascii is the C module behind base64.b64encode();
+    # newline=False leaves out the "\n" it would otherwise add.
+    json_data = bytearray(prefix)
+    for start in range(0, len(image_data), BASE64_CHUNK_SIZE):
+        chunk = image_data[start:start + BASE64_CHUNK_SIZE]
+        json_data += binascii.b2a_base64(chunk, newline=False)
+    json_data += suffix
+    del image_data  # The raw image is no longer needed (this unmaps the file)
+
     # Step 4: Make the API request
     print("\nChecking image safety with LlamaGuard...")
 
-    conn = http.client.HTTPSConnection("api.demeterics.com")
-
     headers = {
         'Authorization': f'Bearer {api_key}',
-        'Content-Type': 'application/json'
+        'Content-Type': 'application/json',
+        'Connection': 'keep-alive'
     }
 
-    # Convert request to JSON
-    json_data = json.dumps(request_data)
-
-    # Send request
-    conn.request("POST", "/groq/v1/chat/completions", json_data, headers)
+    # Send request over the shared connection (ready by now, or in a moment)
+    warm_up.join()
+    response = send_request(host, path, json_data, headers)
 
-    # Get response
-    response = conn.getresponse()
-    response_data = response.read().decode()
+    # Get response (reading it fully lets the connection be reused)
+    response_data = response.read()
 
-    # Step 5: Parse the response
+    # Step 5: Parse the response (json.loads() reads UTF-8 bytes directly)
     result = json.loads(response_data)
 
     # Check for errors
     if 'error' in result:
         raise Exception(f"API Error: {result['error']['message']}")
 
+    # Keep the verdict for this image
+    if use_cache and response.status == 200:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        os.replace(tmp_file, cache_file)
+
     return result
 
+# Common unsafe categories from LlamaGuard. Defined once, when the script
+# starts, instead of being rebuilt for every unsafe result.
+UNSAFE_CATEGORIES = {
+    "violence": "Violence or graphic content",
+    "sexual": "Sexual or suggestive content",
+    "hate": "Hate speech or discriminatory content",
+    "self-harm": "Self-harm or suicide content",
+    "illegal": "Illegal or dangerous activities",
+    "deception": "Deceptive or misleading content",
+    "privacy": "Privacy violation",
+    "children": "Child safety concern"
+}
+
+# One pattern that matches any of the category names above, e.g.
+# "violence|sexual|hate|...". Searching with it reads the answer once,
+# instead of once per category; re.escape() makes "self-harm" match
+# literally.
+UNSAFE_CATEGORY_PATTERN = re.compile('|'.join(map(re.escape, UNSAFE_CATEGORIES)))
+
 def interpret_safety_result(result):
     """
     Interpret the LlamaGuard safety check result
@@ -134,22 +386,11 @@ def interpret_safety_result(result):
 
     # Parse the category if unsafe
     if not is_safe:
-        # Common unsafe categories from LlamaGuard
-        categories = {
-            "violence": "Violence or graphic content",
-            "sexual": "Sexual or suggestive content",
-            "hate": "Hate speech or discriminatory content",
-            "self-harm": "Self-harm or suicide content",
-            "illegal": "Illegal or dangerous activities",
-            "deception": "Deceptive or misleading content",
-            "privacy": "Privacy violation",
-            "children": "Child safety concern"
-        }
-
-        # Find which category was flagged
-        for key, description in categories.items():
-            if key in content:
-                return False, key, description
+        # Find which category was flagged (the first one mentioned)
+        match = UNSAFE_CATEGORY_PATTERN.search(content)
+        if match:
+            key = match.group()
+            return False, key, UNSAFE_CATEGORIES[key]
 
         # Generic unsafe
         return False, "unsafe", content
@@ -166,12 +407,18 @@ def main():
         "image.jpg"  # Alternative name
     ]
 
-    # Find first available image
-    image_path = None
-    for path in test_images:
-        if Path(path).exists():
-            image_path = path
-            break
+    # An image (file or https:// URL) given on the command line comes first
+    args = [arg for arg in sys.argv[1:] if arg != '--no-cache']
+
+    if args:
+        image_path = args[0]
+    else:
+        # Find first available image
+        image_path = None
+        for path in test_images:
+            if Path(path).exists():
+                image_path = path
+                break
 
     if not image_path:
         print("No test image found. Please provide an image file.")
@@ -220,7 +467,7 @@ def main():
         print("="*50)
         print("- LlamaGuard can analyze images for multiple safety categories")
         print("- Always check images before processing in production apps")
-        print("- Consider caching results for frequently checked images")
+        print("- With AI101_CACHE=1, checking the same image again is instant")
         print("- Combine with text safety checks for complete moderation")
 
     except FileNotFoundError as e:
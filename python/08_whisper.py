@@ -26,12 +26,17 @@ EXPECTED OUTPUT:
     - Duration and cost information
 
 Run with: python3 07_whisper.py
+     or:  python3 07_whisper.py --text-only   (smaller answer, no duration/cost)
 """
 
+import atexit       # For closing the shared connection when the script ends
 import http.client  # For HTTPS API requests
 import json         # For JSON encoding/decoding
 import os           # For environment variables
 import mimetypes    # For detecting file MIME types
+import mmap         # For sending the audio without copying it into memory
+import ssl          # For sharing one TLS configuration between connections
+import sys          # For the --text-only flag
 import uuid         # For generating multipart boundary
 import time         # For measuring latency
 
@@ -59,9 +64,16 @@ if not os.path.exists(audio_file_path):
     print(f"Error: Audio file not found at {audio_file_path}")
     exit(1)
 
-# Read the audio file as binary data
+# Instead of copying the whole file (up to 25 MB) into a bytes object with
+# f.read(), we "memory-map" it: the operating system lets us use the file's
+# contents as if they were bytes in memory, loading them from disk only as
+# they are sent (see 04_vision.py). The map stays usable after the file is
+# closed. (An empty file can't be mapped, and there is nothing to transcribe.)
 with open(audio_file_path, 'rb') as f:
-    audio_data = f.read()
+    if os.fstat(f.fileno()).st_size == 0:
+        print(f"Error: Audio file is empty: {audio_file_path}")
+        exit(1)
+    audio_data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
 
 # Get the file name from the path
 file_name = os.path.basename(audio_file_path)
@@ -83,67 +95,154 @@ print()
 # Step 3: Create multipart form data
 # ==============================================================================
 
+# The form fields that never change, turned into bytes once. Each part of
+# a multipart body is: --boundary, its headers, an empty line, its content.
+# Lines end with \r\n.
+MODEL_FIELD = (
+    b'Content-Disposition: form-data; name="model"\r\n'
+    b'\r\n'
+    b'whisper-large-v3-turbo'
+)
+# verbose_json includes the duration, used for the cost below, but also
+# every segment with its timestamps: for long recordings that is many times
+# bigger than the text itself. With --text-only we ask for plain json
+# ({"text": ...}), which is smaller to download and to parse.
+TEXT_ONLY = '--text-only' in sys.argv
+RESPONSE_FORMAT_FIELD = (
+    b'Content-Disposition: form-data; name="response_format"\r\n'
+    b'\r\n'
+    + (b'json' if TEXT_ONLY else b'verbose_json')
+)
+
+
+def create_multipart_parts(audio_data, boundary, file_name, mime_type):
+    """Return the multipart body as [text before audio, audio, text after].
+
+    Gluing the pieces into one bytes object would copy the whole audio file
+    (up to 25 MB) just to send it; instead, each piece is sent as it is
+    (see send_streamed_request() below). Only the boundary, file name and
+    MIME type change between files, so that is all that gets formatted.
+    """
+    boundary = boundary.encode('ascii')
+
+    # Part 1: The audio file (the headers come before the audio data)
+    file_header = (
+        b'--%b\r\n'
+        b'Content-Disposition: form-data; name="file"; filename="%b"\r\n'
+        b'Content-Type: %b\r\n'
+        b'\r\n'
+    ) % (boundary, file_name.encode('utf-8'), mime_type.encode('ascii'))
+
+    # Part 2: The model, Part 3: the response format, then the final boundary
+    form_fields = b'\r\n--%b\r\n%b\r\n--%b\r\n%b\r\n--%b--' % (
+        boundary, MODEL_FIELD, boundary, RESPONSE_FORMAT_FIELD, boundary)
+
+    # The audio goes in as a memoryview, not as the mmap itself: conn.send()
+    # treats anything with a .read() method (like an mmap) as a file and
+    # reads it to its end, so after a reconnect there would be nothing left
+    # to send. A memoryview is sent from the start every time, still
+    # without copying the audio.
+    return [file_header, memoryview(audio_data), form_fields]
+
+
 # Generate a unique boundary for multipart data
 boundary = str(uuid.uuid4())
 
 # Build the multipart form data body
-body_parts = []
-
-# Part 1: The audio file
-body_parts.append(f'--{boundary}'.encode())
-body_parts.append(f'Content-Disposition: form-data; name="file"; filename="{file_name}"'.encode())
-body_parts.append(f'Content-Type: {mime_type}'.encode())
-body_parts.append(b'')
-body_parts.append(audio_data)
-
-# Part 2: The model parameter
-body_parts.append(f'--{boundary}'.encode())
-body_parts.append(b'Content-Disposition: form-data; name="model"')
-body_parts.append(b'')
-body_parts.append(b'whisper-large-v3-turbo')
-
-# Part 3: Response format (verbose_json for duration info)
-body_parts.append(f'--{boundary}'.encode())
-body_parts.append(b'Content-Disposition: form-data; name="response_format"')
-body_parts.append(b'')
-body_parts.append(b'verbose_json')
+body_parts = create_multipart_parts(audio_data, boundary, file_name, mime_type)
 
-# Final boundary
-body_parts.append(f'--{boundary}--'.encode())
-
-# Combine all parts with CRLF line endings
-body = b'\r\n'.join(body_parts)
+# The server needs the total size up front (the Content-Length header)
+content_length = sum(len(part) for part in body_parts)
 
 # ==============================================================================
 # Step 4: Make the API request
 # ==============================================================================
 
-# Create secure connection to Demeterics Groq proxy
-conn = http.client.HTTPSConnection("api.demeterics.com")
+# The connection stays open, so transcribing more files, e.g. the chunks
+# of a long recording (see the end of this file), skips reconnecting.
+_CONNECTIONS = {}
+SSL_CONTEXT = ssl.create_default_context()
+
+
+def get_shared_connection(host):
+    """Return the cached HTTPS connection for host, creating it on first use."""
+    conn = _CONNECTIONS.get(host)
+    if conn is None:
+        conn = http.client.HTTPSConnection(host, timeout=120,
+                                           context=SSL_CONTEXT)
+        _CONNECTIONS[host] = conn
+    return conn
+
+
+def close_shared_connections():
+    """Close every cached connection (called automatically at exit)."""
+    for conn in _CONNECTIONS.values():
+        conn.close()
+    _CONNECTIONS.clear()
+
+
+atexit.register(close_shared_connections)
+
+
+def send_streamed_request(host, path, headers, body_parts, content_length):
+    """POST body_parts over the shared connection and return the response.
+
+    conn.request() needs the whole body as one object, so we use its
+    building blocks instead: putrequest() + putheader() + endheaders() send
+    the headers, then conn.send() sends each piece of the body as it is.
+
+    If the server closed our idle kept-alive connection, reconnect once.
+    Depending on timing, a closed connection shows up as an empty answer
+    (RemoteDisconnected, BadStatusLine) or as an error while sending
+    (ConnectionResetError, BrokenPipeError).
+    """
+    for attempt in range(2):
+        conn = get_shared_connection(host)
+        try:
+            conn.putrequest("POST", path)
+            # We announce the size ourselves, so the server knows where the
+            # body ends without the whole body being in one piece
+            conn.putheader('Content-Length', str(content_length))
+            for name, value in headers.items():
+                conn.putheader(name, value)
+            conn.endheaders()
+
+            for part in body_parts:
+                conn.send(part)
+            return conn.getresponse()
+        except (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                ConnectionResetError, BrokenPipeError):
+            _CONNECTIONS.pop(host).close()
+            if attempt == 1:
+                raise
+
 
 # Set up required headers for multipart form data
 headers = {
     'Authorization': f'Bearer {api_key}',
-    'Content-Type': f'multipart/form-data; boundary={boundary}'
+    'Content-Type': f'multipart/form-data; boundary={boundary}',
+    'Connection': 'keep-alive'  # Ask the server to leave the connection open
 }
 
 # Measure API latency
 start_time = time.time()
 
-# Make the API request to transcribe audio
-conn.request("POST", "/groq/v1/audio/transcriptions", body, headers)
+# Make the API request to transcribe audio (to the Demeterics Groq proxy)
+response = send_streamed_request("api.demeterics.com",
+                                 "/groq/v1/audio/transcriptions",
+                                 headers, body_parts, content_length)
 
-# Get the response from the server
-response = conn.getresponse()
-
-# Read and parse the JSON response
-response_data = json.loads(response.read().decode('utf-8'))
+# Read and parse the JSON response (reading it fully frees the connection
+# for the next request). The connection itself stays open. json.loads()
+# accepts the raw UTF-8 bytes, so there is no .decode() copy first; that
+# matters for verbose_json, which can be large for long recordings.
+response_data = json.loads(response.read())
 
 # Calculate latency
 latency_ms = int((time.time() - start_time) * 1000)
 
-# Close the connection
-conn.close()
+# No conn.close() here: the connection stays open for reuse and is closed
+# automatically by close_shared_connections() when the script exits.
 
 # ==============================================================================
 # Step 5: Display the transcription result
@@ -156,20 +255,37 @@ print()
 print("=" * 60)
 print()
 
-# Calculate cost based on audio duration
-duration = response_data.get('duration', 0)
-cost = (duration / 3600) * 0.04  # $0.04 per hour
-
 print("Performance Metrics:")
 print("=" * 60)
 print(f"API Latency:    {latency_ms}ms")
-print(f"Audio Duration: {duration}s")
-print(f"Cost:           ${cost:.6f}")
+
+# Calculate cost based on audio duration (only verbose_json includes it)
+if TEXT_ONLY:
+    print("Audio Duration: not requested (run without --text-only)")
+else:
+    duration = response_data.get('duration', 0)
+    cost = (duration / 3600) * 0.04  # $0.04 per hour
+    print(f"Audio Duration: {duration}s")
+    print(f"Cost:           ${cost:.6f}")
 print("=" * 60)
 print()
 print("Full API Response:")
 print(json.dumps(response_data, indent=2))
 
+# Connection reuse (keep-alive):
+#   The first request on a connection pays for the TCP + TLS handshakes.
+#   Later requests on the same open connection skip them.
+#
+# Sending the body in pieces:
+#   body = b'\r\n'.join(parts)   # Builds ONE new bytes object: the audio
+#                                # is copied into it before anything is sent
+#   for part in body_parts:
+#       conn.send(part)          # Sends each piece as it is, no copy
+#   Content-Length must then be added by hand: it is the sum of the pieces.
+#
+# Formatting bytes with %:
+#   b'--%b--' % (b'abc',)   → b'--abc--'   (%b inserts bytes into bytes)
+#
 # Model: whisper-large-v3-turbo
 #   - Fast, cost-effective speech recognition from OpenAI
 #   - Supports 99+ languages with high accuracy
@@ -214,50 +330,66 @@ print(json.dumps(response_data, indent=2))
 #       with open(audio_path, 'rb') as f:
 #           audio_data = f.read()
 #
-#       # Prepare multipart data
+#       # Prepare multipart data (as three pieces, see Step 3)
 #       boundary = str(uuid.uuid4())
-#       body = create_multipart_body(audio_data, boundary)
+#       body_parts = create_multipart_parts(audio_data, boundary,
+#                                           os.path.basename(audio_path),
+#                                           'audio/mpeg')
+#       content_length = sum(len(part) for part in body_parts)
 #
-#       # Make API request
-#       conn = http.client.HTTPSConnection("api.demeterics.com")
+#       # Make API request (over the shared kept-alive connection)
 #       headers = {
 #           'Authorization': f'Bearer {api_key}',
-#           'Content-Type': f'multipart/form-data; boundary={boundary}'
+#           'Content-Type': f'multipart/form-data; boundary={boundary}',
+#           'Connection': 'keep-alive'
 #       }
-#       conn.request("POST", "/groq/v1/audio/transcriptions", body, headers)
+#       response = send_streamed_request("api.demeterics.com",
+#                                        "/groq/v1/audio/transcriptions",
+#                                        headers, body_parts, content_length)
 #
-#       # Get response
-#       response = conn.getresponse()
-#       data = json.loads(response.read().decode('utf-8'))
-#       conn.close()
+#       # Get response (the connection stays open for the next file)
+#       data = json.loads(response.read())
 #
 #       return data.get('text', '')
 #
 # Advanced options (add to form data):
 #
-#   # Specify language (optional - auto-detected by default)
-#   body_parts.append(f'--{boundary}'.encode())
-#   body_parts.append(b'Content-Disposition: form-data; name="language"')
-#   body_parts.append(b'')
-#   body_parts.append(b'en')  # ISO-639-1 code (en, es, fr, de, etc.)
+#   Every field goes BEFORE the closing boundary (--boundary--), which
+#   must stay the very last thing in the body. So new fields belong in
+#   create_multipart_parts(), next to the model and response format.
+#   Define each one like MODEL_FIELD:
 #
-#   # Response format (optional - json is default)
-#   body_parts.append(f'--{boundary}'.encode())
-#   body_parts.append(b'Content-Disposition: form-data; name="response_format"')
-#   body_parts.append(b'')
-#   body_parts.append(b'json')  # Options: json, text, srt, vtt
+#   # Specify language (optional - auto-detected by default)
+#   LANGUAGE_FIELD = (
+#       b'Content-Disposition: form-data; name="language"\r\n'
+#       b'\r\n'
+#       b'en'  # ISO-639-1 code (en, es, fr, de, etc.)
+#   )
 #
 #   # Temperature for randomness (optional - 0.0 to 1.0)
-#   body_parts.append(f'--{boundary}'.encode())
-#   body_parts.append(b'Content-Disposition: form-data; name="temperature"')
-#   body_parts.append(b'')
-#   body_parts.append(b'0.0')  # 0.0 = deterministic, 1.0 = creative
-#
-#   # Timestamp granularities (optional)
-#   body_parts.append(f'--{boundary}'.encode())
-#   body_parts.append(b'Content-Disposition: form-data; name="timestamp_granularities[]"')
-#   body_parts.append(b'')
-#   body_parts.append(b'word')  # Options: word, segment
+#   TEMPERATURE_FIELD = (
+#       b'Content-Disposition: form-data; name="temperature"\r\n'
+#       b'\r\n'
+#       b'0.0'  # 0.0 = deterministic, 1.0 = creative
+#   )
+#
+#   # Timestamp granularities (optional, needs verbose_json)
+#   GRANULARITY_FIELD = (
+#       b'Content-Disposition: form-data; name="timestamp_granularities[]"\r\n'
+#       b'\r\n'
+#       b'word'  # Options: word, segment
+#   )
+#
+#   Then, in create_multipart_parts(), send each one after its own
+#   --boundary line, before the final --boundary--:
+#
+#   fields = [MODEL_FIELD, RESPONSE_FORMAT_FIELD, LANGUAGE_FIELD,
+#             TEMPERATURE_FIELD, GRANULARITY_FIELD]
+#   form_fields = b''.join(b'\r\n--%b\r\n%b' % (boundary, field)
+#                          for field in fields) + b'\r\n--%b--' % boundary
+#
+#   The response format works the same way: RESPONSE_FORMAT_FIELD accepts
+#   json, verbose_json, text, srt or vtt.
 #
 # Error handling example:
 #
@@ -364,6 +496,12 @@ print(json.dumps(response_data, indent=2))
 #     00:00:00.000 --> 00:00:05.000
 #     Transcription here
 #
+# Why the answer is read in one go:
+#   Whisper sends its answer only once the whole file is transcribed, so
+#   the JSON arrives in one burst right after the wait. Parsing it piece by
+#   piece as it arrives (with a streaming parser like the third-party ijson)
+#   would save almost nothing; asking for less (--text-only) saves more.
+#
 # Performance tips:
 #   - Use MP3 format for smaller file sizes
 #   - 16kHz sample rate is usually sufficient
@@ -23,10 +23,13 @@ This example:
 - No external dependencies (uses Python standard library)
 """
 
+import gzip
+import hashlib
 import http.client
 import json
 import os
 import sys
+import time
 
 # Check for API key
 if not os.environ.get('TAVILY_API_KEY'):
@@ -38,6 +41,14 @@ if not os.environ.get('TAVILY_API_KEY'):
     print('  4. Set: export TAVILY_API_KEY="tvly-your-key-here"\n', file=sys.stderr)
     sys.exit(1)
 
+# Print output in big blocks instead of line by line. On a terminal, Python
+# normally writes each printed line to the screen right away, one system
+# call per line; with line buffering off, many lines go out in one write.
+# We flush by hand before waiting for the network, so progress messages
+# still appear on time, and before printing an error, so the error shows
+# up after the lines printed before it.
+sys.stdout.reconfigure(line_buffering=False)
+
 # Tavily Search API Request Parameters
 #
 # REQUIRED:
@@ -63,36 +74,91 @@ request_data = {
     'include_images': False
 }
 
+# Saved answers: re-running this example with the same request reads the
+# answer from ~/.cache/ai101 instead of waiting for the network (and using
+# up the monthly quota). Saved answers expire: search results go stale, so
+# they are re-fetched after a day. Run with --no-cache to always call the API.
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'ai101')
+CACHE_TTL = 24 * 3600  # Seconds
+
+
+def get_cache_path(path, body):
+    """Return the cache file named after the SHA-256 of the request"""
+    key = hashlib.sha256(f'{path} {body}'.encode('utf-8')).hexdigest()
+    return os.path.join(CACHE_DIR, f'tavily-{key}.json')
+
+
+def load_cached(cache_file):
+    """Return the saved answer if it is younger than CACHE_TTL, else None"""
+    try:
+        if time.time() - os.path.getmtime(cache_file) < CACHE_TTL:
+            with open(cache_file, 'rb') as f:
+                return f.read()
+    except OSError:
+        pass  # Not cached yet
+    return None
+
+
+def save_cached(cache_file, data):
+    """Save an answer atomically (write a temp file, then rename)"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_file, cache_file)
+
+
 print('===========================================')
 print('Tavily Search API - French Bread Recipes')
 print('===========================================\n')
 print('Query: traditional French bread recipes')
 print('Options: include_answer=True, max_results=5\n')
 print('Sending request to Tavily...\n')
+sys.stdout.flush()  # Show the messages above before we wait
 
 # Make API request
 try:
-    conn = http.client.HTTPSConnection('api.tavily.com')
+    body = json.dumps(request_data)
 
-    headers = {
-        'Content-Type': 'application/json',
-        'Authorization': f'Bearer {os.environ["TAVILY_API_KEY"]}'
-    }
+    use_cache = '--no-cache' not in sys.argv
+    cache_file = get_cache_path('/search', body) if use_cache else None
+    data = load_cached(cache_file) if use_cache else None
 
-    body = json.dumps(request_data)
+    if data is not None:
+        print(f'(Using the saved answer from {cache_file})\n')
+    else:
+        conn = http.client.HTTPSConnection('api.tavily.com')
+
+        headers = {
+            'Content-Type': 'application/json',
+            'Authorization': f'Bearer {os.environ["TAVILY_API_KEY"]}',
+            'Accept-Encoding': 'gzip'  # We can unpack compressed answers
+        }
+
+        conn.request('POST', '/search', body, headers)
 
-    conn.request('POST', '/search', body, headers)
+        response = conn.getresponse()
+        # Keep the raw bytes: json.loads() parses UTF-8 bytes directly, so
+        # decoding them into a str first would only copy the whole answer
+        data = response.read()
 
-    response = conn.getresponse()
-    data = response.read().decode('utf-8')
+        # Long JSON (and markdown) text shrinks to a fraction of its size
+        # when compressed. We said we accept gzip, so the server may have
+        # compressed its answer; if so, unpack it
+        if response.getheader('Content-Encoding') == 'gzip':
+            data = gzip.decompress(data)
 
-    conn.close()
+        conn.close()
+
+        if use_cache and response.status == 200:
+            save_cached(cache_file, data)
 
     # Parse response
     result = json.loads(data)
 
     # Check for errors
     if 'error' in result:
+        sys.stdout.flush()  # Show what was printed so far before the error
         print(f'API Error: {result["error"]}', file=sys.stderr)
         sys.exit(1)
 
@@ -109,12 +175,13 @@ try:
     print('========================================\n')
     print(f'Found {len(result["results"])} results:\n')
 
+    # One print() per result: the four lines (and the blank line after
+    # them) are formatted together, instead of five separate print() calls
     for i, item in enumerate(result['results']):
-        print(f'[{i + 1}] {item["title"]}')
-        print(f'URL: {item["url"]}')
-        print(f'Relevance Score: {item["score"]}')
-        print(f'Summary: {item["content"]}')
-        print('')
+        print(f'[{i + 1}] {item["title"]}\n'
+              f'URL: {item["url"]}\n'
+              f'Relevance Score: {item["score"]}\n'
+              f'Summary: {item["content"]}\n')
 
     # Display metadata
     print('========================================')
@@ -124,12 +191,15 @@ try:
     print(f'Request ID: {result.get("request_id", "N/A")}')
     print('')
 
-    # Display raw JSON
-    print('========================================')
-    print('Raw API Response (formatted)')
-    print('========================================\n')
-    print(json.dumps(result, indent=2))
-    print('')
+    # Display raw JSON. Every field we need was shown above, and
+    # re-formatting the whole answer costs time, so this is only
+    # printed when you ask for it: export AI101_VERBOSE=1
+    if os.environ.get('AI101_VERBOSE') == '1':
+        print('========================================')
+        print('Raw API Response (formatted)')
+        print('========================================\n')
+        print(json.dumps(result, indent=2))
+        print('')
 
     # Summary
     print('===========================================')
@@ -147,5 +217,6 @@ try:
     print('  - Sending results via ntfy.sh notifications\n')
 
 except Exception as error:
+    sys.stdout.flush()  # Show what was printed so far before the error
     print(f'Error: {error}', file=sys.stderr)
     sys.exit(1)
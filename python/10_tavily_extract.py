@@ -16,12 +16,16 @@ This example:
 - Uses "advanced" extraction depth
 - Includes images from the article
 - Saves clean markdown output to file
+- Extracts several pages in one request if you pass their URLs
 """
 
+import gzip
+import hashlib
 import http.client
 import json
 import os
 import sys
+import time
 
 # Check for API key
 if not os.environ.get('TAVILY_API_KEY'):
@@ -30,44 +34,126 @@ if not os.environ.get('TAVILY_API_KEY'):
     print('Then: export TAVILY_API_KEY="tvly-your-key-here"\n', file=sys.stderr)
     sys.exit(1)
 
+# Print output in big blocks instead of line by line. On a terminal, Python
+# normally writes each printed line to the screen right away, one system
+# call per line; with line buffering off, many lines go out in one write.
+# We flush by hand before waiting for the network, so progress messages
+# still appear on time, and before printing an error, so the error shows
+# up after the lines printed before it.
+sys.stdout.reconfigure(line_buffering=False)
+
 article_url = 'https://medium.com/@pdeglon/california-ai-rules-explained-in-everyday-english-fea55637cb96'
 
+# Pass your own URLs on the command line to extract those instead:
+#   python3 10_tavily_extract.py https://example.com/a https://example.com/b
+# The Extract API takes a list of URLs, so they all go in ONE request: one
+# round-trip instead of one per URL, and Tavily fetches the pages in
+# parallel on its side. A single request accepts up to 20 URLs.
+MAX_URLS_PER_REQUEST = 20
+urls = [arg for arg in sys.argv[1:] if not arg.startswith('--')] or [article_url]
+
+if len(urls) > MAX_URLS_PER_REQUEST:
+    print(f'Error: at most {MAX_URLS_PER_REQUEST} URLs per request '
+          f'(got {len(urls)})', file=sys.stderr)
+    sys.exit(1)
+
 request_data = {
-    'urls': [article_url],
+    'urls': urls,
     'include_images': True,
     'extract_depth': 'advanced'
 }
 
+# Saved answers: re-running this example with the same request reads the
+# answer from ~/.cache/ai101 instead of waiting for the network (and using
+# up the monthly quota). Saved answers expire: pages change slowly, so
+# they are re-fetched after a week. Run with --no-cache to always call the API.
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'ai101')
+CACHE_TTL = 7 * 24 * 3600  # Seconds
+
+
+def get_cache_path(path, body):
+    """Return the cache file named after the SHA-256 of the request"""
+    key = hashlib.sha256(f'{path} {body}'.encode('utf-8')).hexdigest()
+    return os.path.join(CACHE_DIR, f'tavily-{key}.json')
+
+
+def load_cached(cache_file):
+    """Return the saved answer if it is younger than CACHE_TTL, else None"""
+    try:
+        if time.time() - os.path.getmtime(cache_file) < CACHE_TTL:
+            with open(cache_file, 'rb') as f:
+                return f.read()
+    except OSError:
+        pass  # Not cached yet
+    return None
+
+
+def save_cached(cache_file, data):
+    """Save an answer atomically (write a temp file, then rename)"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_file, cache_file)
+
+
 print('===========================================')
 print('Tavily Extract API - Medium Article')
 print('===========================================\n')
-print(f'URL: {article_url}')
+for url in urls:
+    print(f'URL: {url}')
 print('Options: extract_depth=advanced, include_images=True\n')
 print('Sending request to Tavily...\n')
+sys.stdout.flush()  # Show the messages above before we wait
 
 # Make API request
 try:
-    conn = http.client.HTTPSConnection('api.tavily.com')
+    body = json.dumps(request_data)
 
-    headers = {
-        'Content-Type': 'application/json',
-        'Authorization': f'Bearer {os.environ["TAVILY_API_KEY"]}'
-    }
+    use_cache = '--no-cache' not in sys.argv
+    cache_file = get_cache_path('/extract', body) if use_cache else None
+    data = load_cached(cache_file) if use_cache else None
 
-    body = json.dumps(request_data)
+    response_status = None  # Stays None when the answer comes from the cache
+    if data is not None:
+        print(f'(Using the saved answer from {cache_file})\n')
+    else:
+        conn = http.client.HTTPSConnection('api.tavily.com')
 
-    conn.request('POST', '/extract', body, headers)
+        headers = {
+            'Content-Type': 'application/json',
+            'Authorization': f'Bearer {os.environ["TAVILY_API_KEY"]}',
+            'Accept-Encoding': 'gzip'  # We can unpack compressed answers
+        }
 
-    response = conn.getresponse()
-    data = response.read().decode('utf-8')
+        conn.request('POST', '/extract', body, headers)
 
-    conn.close()
+        response = conn.getresponse()
+        # Keep the raw bytes: json.loads() parses UTF-8 bytes directly, so
+        # decoding them into a str first would only copy the whole answer
+        data = response.read()
+
+        # Long JSON (and markdown) text shrinks to a fraction of its size
+        # when compressed. We said we accept gzip, so the server may have
+        # compressed its answer; if so, unpack it
+        if response.getheader('Content-Encoding') == 'gzip':
+            data = gzip.decompress(data)
+
+        conn.close()
+        response_status = response.status
 
     # Parse response
     result = json.loads(data)
 
+    # Only keep an answer where every page was extracted: a page that failed
+    # (often a temporary error) would otherwise fail again for a whole week
+    if (use_cache and response_status == 200 and result.get('results')
+            and not result.get('failed_results')):
+        save_cached(cache_file, data)
+
     # Check for errors
     if 'error' in result:
+        sys.stdout.flush()  # Show what was printed so far before the error
         print(f'API Error: {result["error"]}', file=sys.stderr)
         sys.exit(1)
 
@@ -76,6 +162,7 @@ try:
     failed_count = len(result.get('failed_results', []))
 
     if result_count == 0:
+        sys.stdout.flush()
         print('Extraction failed\n', file=sys.stderr)
         print(f'Failed URLs: {result.get("failed_results", [])}', file=sys.stderr)
         sys.exit(1)
@@ -86,66 +173,94 @@ try:
     print(f'Successful: {result_count}')
     print(f'Failed: {failed_count}\n')
 
-    # Extract content
-    content = result['results'][0]['raw_content']
-    content_length = len(content)
+    # Show and save each extracted page. With one URL the file is
+    # extracted_content.md; with several, extracted_001.md, extracted_002.md...
+    total_length = 0
+    total_images = 0
+    output_files = []
 
-    print('========================================')
-    print('Extracted Content (Markdown)')
-    print('========================================\n')
-    print(f'Content length: {content_length} characters\n')
-    print('First 1000 characters:\n')
-    print(content[:1000])
-    print('\n... (truncated, see full output below) ...\n')
+    for i, page in enumerate(result['results']):
+        # This doesn't copy the (possibly very long) markdown: content is
+        # just another name for the string already inside result.
+        content = page['raw_content']
+        content_length = len(content)
+        total_length += content_length
 
-    # Extract images
-    images = result['results'][0].get('images', [])
-    image_count = len(images)
+        print('========================================')
+        print(f'Extracted Content (Markdown): {page["url"]}')
+        print('========================================\n')
+        print(f'Content length: {content_length} characters\n')
+        print('First 1000 characters:\n')
+        print(content[:1000])
+        print('\n... (truncated, see the saved file for the full text) ...\n')
 
-    print('========================================')
-    print('Extracted Images')
-    print('========================================\n')
-    print(f'Found {image_count} images:\n')
+        # Extract images
+        images = page.get('images', [])
+        image_count = len(images)
+        total_images += image_count
 
-    for i, image_url in enumerate(images):
-        print(f'[{i + 1}] {image_url}')
-    print('')
+        print('========================================')
+        print('Extracted Images')
+        print('========================================\n')
+        print(f'Found {image_count} images:\n')
+
+        for j, image_url in enumerate(images):
+            print(f'[{j + 1}] {image_url}')
+        print('')
+
+        # Save full content to file
+        if result_count == 1:
+            output_file = 'extracted_content.md'
+        else:
+            output_file = f'extracted_{i + 1:03d}.md'
+        # Binary mode: the text is encoded to UTF-8 once and handed straight
+        # to the file, and it is saved byte-for-byte on every system (text
+        # mode on Windows would turn every line ending into \r\n)
+        with open(output_file, 'wb') as f:
+            f.write(content.encode('utf-8'))
+        output_files.append(output_file)
 
     # Display metadata
     print('========================================')
     print('Request Metadata')
     print('========================================\n')
     print(f'Response Time: {result["response_time"]}s')
-    print(f'Content Size: {content_length} characters')
-    print(f'Images Extracted: {image_count}\n')
-
-    # Save full content to file
-    output_file = 'extracted_content.md'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(content)
+    print(f'Content Size: {total_length} characters')
+    print(f'Images Extracted: {total_images}\n')
 
     print('========================================')
     print('Full Content Saved')
     print('========================================\n')
-    print(f'Saved to: {output_file}\n')
-    print(f'View with: cat {output_file}')
+    for output_file in output_files:
+        print(f'Saved to: {output_file}')
+    print(f'\nView with: cat {output_files[0]}')
     print('Or open with your editor\n')
 
-    # Display raw JSON
-    print('========================================')
-    print('Raw API Response (formatted)')
-    print('========================================\n')
-    print(json.dumps(result, indent=2))
-    print('')
+    # Save raw JSON. Every field we need was shown above, and formatting
+    # the whole answer (which repeats the full article) costs time, so this
+    # only happens when you ask for it:
+    #   export AI101_VERBOSE=1
+    # It goes to a file rather than the screen: scrolling hundreds of KB
+    # through a terminal can take longer than the request itself, and a
+    # file is easier to search anyway.
+    if os.environ.get('AI101_VERBOSE') == '1':
+        raw_file = 'last_response.json'
+        with open(raw_file, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+
+        print('========================================')
+        print('Raw API Response (formatted)')
+        print('========================================\n')
+        print(f'Saved to: {raw_file}\n')
 
     # Summary
     print('===========================================')
     print('Summary')
     print('===========================================\n')
-    print('✓ Content extracted successfully')
-    print(f'✓ Extracted {content_length} characters of clean markdown')
-    print(f'✓ Found {image_count} images')
-    print(f'✓ Saved to {output_file}')
+    print(f'✓ Content extracted successfully from {result_count} page(s)')
+    print(f'✓ Extracted {total_length} characters of clean markdown')
+    print(f'✓ Found {total_images} images')
+    print(f'✓ Saved to {", ".join(output_files)}')
     print(f'✓ Response time: {result["response_time"]}s\n')
     print('Try the exercises to:')
     print('  - Extract content from multiple URLs at once')
@@ -154,5 +269,6 @@ try:
     print('  - Build a web clipper / read-later service\n')
 
 except Exception as error:
+    sys.stdout.flush()  # Show what was printed so far before the error
     print(f'Error: {error}', file=sys.stderr)
     sys.exit(1)
@@ -11,10 +11,17 @@ Note: Uses Python standard library only
 For production, consider: pip install groq tavily-python
 """
 
+import atexit
+import concurrent.futures
+import gzip
+import hashlib
 import http.client
 import json
 import os
+import ssl
 import sys
+import threading
+import time
 
 # Check for API keys
 if not os.environ.get('DEMETERICS_API_KEY') or not os.environ.get('TAVILY_API_KEY'):
@@ -23,52 +30,183 @@ if not os.environ.get('DEMETERICS_API_KEY') or not os.environ.get('TAVILY_API_KE
     print('Get a Tavily key: https://tavily.com', file=sys.stderr)
     sys.exit(1)
 
+# Print output in big blocks instead of line by line. On a terminal, Python
+# normally writes each printed line to the screen right away, one system
+# call per line; with line buffering off, many lines go out in one write.
+# We flush by hand before waiting for the network, so progress messages
+# still appear on time, and before printing an error, so the error shows
+# up after the lines printed before it.
+sys.stdout.reconfigure(line_buffering=False)
+
+# An agent run calls Groq and Tavily several times. Instead of paying a new
+# TCP + TLS handshake for every call, we keep connections open and reuse
+# them (HTTP/1.1 keep-alive). Tool calls run on worker threads (see main()),
+# and a connection can only carry one request at a time, so each thread
+# gets its own: the dictionary is keyed by (host, thread id).
+_CONNECTIONS = {}
+SSL_CONTEXT = ssl.create_default_context()
+
+def get_shared_connection(host):
+    """Return this thread's cached connection for host, creating it on first use"""
+    key = (host, threading.get_ident())
+    conn = _CONNECTIONS.get(key)
+    if conn is None:
+        conn = http.client.HTTPSConnection(host, timeout=30, context=SSL_CONTEXT)
+        _CONNECTIONS[key] = conn
+    return conn
+
+def close_shared_connections():
+    """Close every cached connection (called automatically at exit)"""
+    for conn in list(_CONNECTIONS.values()):
+        conn.close()
+    _CONNECTIONS.clear()
+
+atexit.register(close_shared_connections)
+
+# Temporary failures are worth retrying, so one hiccup doesn't end the
+# whole agent run: 429 means "too many requests, slow down" and 5xx codes
+# mean the server had a problem. We retry those a couple of times, waiting
+# longer before each new attempt ("exponential backoff").
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 2
+BACKOFF_FACTOR = 0.3  # Waits 0.3s, then 0.6s, ...
+
+def send_request(host, path, body, headers):
+    """POST body over this thread's connection and return the response
+
+    Servers close idle kept-alive connections after a while; if that
+    happened, reconnect once and send the request again. Responses with a
+    status in RETRY_STATUSES are retried up to MAX_RETRIES times.
+    """
+    sys.stdout.flush()  # Show what we printed so far before we wait
+    reconnected = False
+    attempt = 0
+    while True:
+        conn = get_shared_connection(host)
+        try:
+            conn.request('POST', path, body, headers)
+            response = conn.getresponse()
+        except (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                ConnectionResetError, BrokenPipeError):
+            _CONNECTIONS.pop((host, threading.get_ident())).close()
+            if reconnected:
+                raise
+            reconnected = True
+            continue
+
+        if response.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            return response
+
+        # Read (and ignore) the error body so the connection can be reused
+        response.read()
+
+        # Respect the server's Retry-After hint if it is longer than ours
+        delay = BACKOFF_FACTOR * (2 ** attempt)
+        retry_after = response.getheader('Retry-After', '')
+        if retry_after.isdigit():
+            delay = max(delay, int(retry_after))
+        time.sleep(delay)
+        attempt += 1
+
+def read_body(response):
+    """Return the whole response body, unpacked if the server gzipped it
+
+    We send 'Accept-Encoding: gzip', so the server may compress its answer:
+    long JSON text (search results, extracted pages) shrinks to a fraction
+    of its size, which is much quicker to download.
+    """
+    data = response.read()
+    if response.getheader('Content-Encoding') == 'gzip':
+        data = gzip.decompress(data)
+    return data
+
+# The Tavily headers are the same for every call, so build them once
+TAVILY_HEADERS = {
+    'Content-Type': 'application/json',
+    'Authorization': f'Bearer {os.environ["TAVILY_API_KEY"]}',
+    'Accept-Encoding': 'gzip',  # We can unpack compressed answers
+    'Connection': 'keep-alive'  # Ask the server to leave the connection open
+}
+
+# Tavily answers are saved in ~/.cache/ai101 so that re-running the agent
+# with the same searches doesn't wait for the network (or use up the
+# monthly quota). Web pages change, so saved answers expire: searches after
+# a day, extracted pages after a week. Run with --no-cache to always call
+# the API. Answers are also kept in memory, for when the AI repeats a call.
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'ai101')
+TAVILY_CACHE_TTL = {'/search': 24 * 3600, '/extract': 7 * 24 * 3600}
+_MEMORY_CACHE = {}
+_CACHE_HITS = []  # Saved answers used in this run (for the final summary)
+
+def tavily_request(path, request_data):
+    """POST request_data to Tavily and return its JSON answer as text
+
+    The answer is only passed on to the AI, which reads text, so we never
+    parse it: turning it into Python objects and back with json.dumps()
+    would cost time and give the AI the same information.
+    """
+    body = json.dumps(request_data)
+    use_cache = '--no-cache' not in sys.argv
+
+    if use_cache:
+        key = hashlib.sha256(f'{path} {body}'.encode('utf-8')).hexdigest()
+        if key in _MEMORY_CACHE:
+            return _MEMORY_CACHE[key]
+
+        cache_file = os.path.join(CACHE_DIR, f'tavily-{key}.json')
+        try:
+            if time.time() - os.path.getmtime(cache_file) < TAVILY_CACHE_TTL[path]:
+                with open(cache_file, encoding='utf-8') as f:
+                    result = f.read()
+                # Tools run on several threads at once: ending the text with
+                # its own newline makes it one write, so lines don't mix
+                print(f'[Tool] (Using the saved answer from {cache_file})\n', end='')
+                _CACHE_HITS.append(cache_file)
+                _MEMORY_CACHE[key] = result
+                return result
+        except OSError:
+            pass  # Not cached yet
+
+    response = send_request('api.tavily.com', path, body, TAVILY_HEADERS)
+
+    # Reading the whole body frees the connection for the next request
+    data = read_body(response)
+    result = data.decode('utf-8')
+
+    # Keep successful results, but not an extraction where a page failed
+    # (often a temporary error) or it would fail again for a whole week.
+    # Tools run in parallel, so the temp file name includes the thread.
+    if (use_cache and response.status == 200
+            and not (path == '/extract' and json.loads(data).get('failed_results'))):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_file = f'{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_file, cache_file)
+        _MEMORY_CACHE[key] = result
+
+    return result
+
 # Tool functions
 def tavily_search(query):
     """Search the web using Tavily API"""
-    print(f'[Tool] Executing tavily_search with query: {query}')
-
-    conn = http.client.HTTPSConnection('api.tavily.com')
-    headers = {
-        'Content-Type': 'application/json',
-        'Authorization': f'Bearer {os.environ["TAVILY_API_KEY"]}'
-    }
+    print(f'[Tool] Executing tavily_search with query: {query}\n', end='')
 
-    body = json.dumps({
+    return tavily_request('/search', {
         'query': query,
         'max_results': 5,
         'include_answer': True
     })
 
-    conn.request('POST', '/search', body, headers)
-    response = conn.getresponse()
-    data = response.read().decode('utf-8')
-    conn.close()
-
-    return json.loads(data)
-
 def tavily_extract(url):
     """Extract content from a URL using Tavily API"""
-    print(f'[Tool] Executing tavily_extract for URL: {url}')
-
-    conn = http.client.HTTPSConnection('api.tavily.com')
-    headers = {
-        'Content-Type': 'application/json',
-        'Authorization': f'Bearer {os.environ["TAVILY_API_KEY"]}'
-    }
+    print(f'[Tool] Executing tavily_extract for URL: {url}\n', end='')
 
-    body = json.dumps({
+    return tavily_request('/extract', {
         'urls': [url],
         'extract_depth': 'basic'
     })
 
-    conn.request('POST', '/extract', body, headers)
-    response = conn.getresponse()
-    data = response.read().decode('utf-8')
-    conn.close()
-
-    return json.loads(data)
-
 def execute_tool(function_name, arguments):
     """Execute a tool by name"""
     if function_name == 'tavily_search':
@@ -78,84 +216,153 @@ def execute_tool(function_name, arguments):
     else:
         raise ValueError(f'Unknown function: {function_name}')
 
-def call_groq(messages, tools=None):
-    """Call Demeterics Groq proxy"""
-    conn = http.client.HTTPSConnection('api.demeterics.com')
-    headers = {
-        'Content-Type': 'application/json',
-        'Authorization': f'Bearer {os.environ["DEMETERICS_API_KEY"]}'
-    }
-
-    request_data = {
-        'model': 'meta-llama/llama-4-scout-17b-16e-instruct',
-        'messages': messages
+# At most this many tool calls run at the same time
+MAX_PARALLEL_TOOLS = 8
+
+# One pool of worker threads for the whole run, created once. Each worker
+# keeps its own open connection (see get_shared_connection()), so running
+# every turn's tool calls on the same threads reuses those connections
+# too. A new pool per turn would start new threads, whose connections
+# would never be used again. Threads are only started when there is work
+# for them.
+_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_PARALLEL_TOOLS)
+
+def execute_tool_calls(tool_calls):
+    """Run all tool calls at the same time and return their results, in order
+
+    The AI can ask for several tools in one turn, and they don't depend on
+    each other. Run one after another, the waits add up; run on worker
+    threads, the turn takes about as long as the slowest call.
+
+    The AI sometimes asks for the same call twice in one turn. Each distinct
+    call (same function, same arguments) is run only once, and its result
+    is given to every tool call that asked for it.
+    """
+    # Group the calls: the key is the function name plus its arguments
+    # in a fixed order, so {"a":1,"b":2} and {"b": 2, "a": 1} match
+    keys = []
+    unique_calls = {}
+    for tool_call in tool_calls:
+        name = tool_call['function']['name']
+        args = json.loads(tool_call['function']['arguments'])
+        key = (name, json.dumps(args, sort_keys=True))
+        keys.append(key)
+        unique_calls.setdefault(key, (name, args))
+
+    def run(call):
+        name, args = call
+        return execute_tool(name, args)
+
+    # map() returns the results in the same order as the calls
+    results = dict(zip(unique_calls, _EXECUTOR.map(run, unique_calls.values())))
+
+    return [results[key] for key in keys]
+
+# Like the Tavily headers, these are built once (reading the API key from
+# the environment only here) and shared by every Groq call
+GROQ_HEADERS = {
+    'Content-Type': 'application/json',
+    'Authorization': f'Bearer {os.environ["DEMETERICS_API_KEY"]}',
+    'Accept-Encoding': 'gzip',  # We can unpack compressed answers
+    'Connection': 'keep-alive'  # Ask the server to leave the connection open
+}
+
+# Tool definitions, sent with the first request of every turn
+TOOLS = [
+    {
+        'type': 'function',
+        'function': {
+            'name': 'tavily_search',
+            'description': 'Search the web for current information using Tavily API',
+            'parameters': {
+                'type': 'object',
+                'properties': {
+                    'query': {
+                        'type': 'string',
+                        'description': 'The search query'
+                    }
+                },
+                'required': ['query']
+            }
+        }
+    },
+    {
+        'type': 'function',
+        'function': {
+            'name': 'tavily_extract',
+            'description': 'Extract content from a specific URL',
+            'parameters': {
+                'type': 'object',
+                'properties': {
+                    'url': {
+                        'type': 'string',
+                        'description': 'The URL to extract content from'
+                    }
+                },
+                'required': ['url']
+            }
+        }
     }
-
-    if tools:
-        request_data['tools'] = tools
-        request_data['tool_choice'] = 'auto'
-
-    body = json.dumps(request_data)
-
-    conn.request('POST', '/groq/v1/chat/completions', body, headers)
-    response = conn.getresponse()
-    data = response.read().decode('utf-8')
-    conn.close()
-
-    return json.loads(data)
-
-def main():
+]
+
+# Every request has the same model, and the first one of a turn also the
+# same tool definitions; only the messages change. So the JSON around the
+# messages is built once, and each call only encodes the messages and
+# glues the pieces together. The placeholder marks where they go.
+MODEL = 'meta-llama/llama-4-scout-17b-16e-instruct'
+MESSAGES_PLACEHOLDER = '@@MESSAGES@@'
+
+def build_request_template(request_data):
+    """Return the JSON text before and after the messages, as a pair"""
+    before, _, after = json.dumps(request_data).partition(
+        json.dumps(MESSAGES_PLACEHOLDER))
+    return before, after
+
+REQUEST_TEMPLATE = build_request_template(
+    {'model': MODEL, 'messages': MESSAGES_PLACEHOLDER})
+TOOLS_REQUEST_TEMPLATE = build_request_template(
+    {'model': MODEL, 'messages': MESSAGES_PLACEHOLDER,
+     'tools': TOOLS, 'tool_choice': 'auto'})
+
+def call_groq(messages, use_tools=False):
+    """Call Demeterics Groq proxy
+
+    Both calls of a tool-use turn come from the main thread, so the second
+    one reuses the first one's connection and skips the TLS handshake.
+    """
+    before, after = TOOLS_REQUEST_TEMPLATE if use_tools else REQUEST_TEMPLATE
+    body = before + json.dumps(messages) + after
+
+    response = send_request('api.demeterics.com', '/groq/v1/chat/completions',
+                            body, GROQ_HEADERS)
+    return json.loads(read_body(response))
+
+DEFAULT_QUERY = 'Search for the latest developments in quantum computing and provide a summary'
+
+# Everything that stays the same between questions (headers, tool
+# definitions, request templates, the SSL context, open connections) is
+# set up once at module level, not inside main(). A program that imports
+# this file and calls main() for many questions (a chat CLI or a small
+# server) pays those costs only once. Connections are per thread, so
+# main() can even run on several threads at the same time.
+def main(user_query=DEFAULT_QUERY):
+    """Answer one question, letting the AI use tools"""
     print('========================================')
     print('Groq Tool Use - AI Agent Demo')
     print('========================================\n')
 
-    user_query = 'Search for the latest developments in quantum computing and provide a summary'
-
     print(f'User Query: {user_query}\n')
     print('Step 1: Sending query to AI with tool definitions...\n')
 
-    # Tool definitions
-    tools = [
-        {
-            'type': 'function',
-            'function': {
-                'name': 'tavily_search',
-                'description': 'Search the web for current information using Tavily API',
-                'parameters': {
-                    'type': 'object',
-                    'properties': {
-                        'query': {
-                            'type': 'string',
-                            'description': 'The search query'
-                        }
-                    },
-                    'required': ['query']
-                }
-            }
-        },
-        {
-            'type': 'function',
-            'function': {
-                'name': 'tavily_extract',
-                'description': 'Extract content from a specific URL',
-                'parameters': {
-                    'type': 'object',
-                    'properties': {
-                        'url': {
-                            'type': 'string',
-                            'description': 'The URL to extract content from'
-                        }
-                    },
-                    'required': ['url']
-                }
-            }
-        }
-    ]
+    # One conversation list for the whole turn. Each call sends it again
+    # (the API remembers nothing between requests), but we only ever append
+    # to it, so every request starts with exactly the same bytes as the one
+    # before. Providers that cache prompts reuse that shared beginning
+    # instead of processing it again.
+    messages = [{'role': 'user', 'content': user_query}]
 
     # Step 1: Initial request
-    initial_response = call_groq([
-        {'role': 'user', 'content': user_query}
-    ], tools)
+    initial_response = call_groq(messages, use_tools=True)
 
     # Check for tool calls
     tool_calls = initial_response['choices'][0]['message'].get('tool_calls')
@@ -171,31 +378,27 @@ def main():
     print('========================================\n')
     print(f'Number of tool calls: {len(tool_calls)}\n')
 
-    tool_messages = []
-
     for tool_call in tool_calls:
         print(f'Function: {tool_call["function"]["name"]}')
         print(f'Arguments: {tool_call["function"]["arguments"]}\n')
 
-        args = json.loads(tool_call['function']['arguments'])
-        result = execute_tool(tool_call['function']['name'], args)
+    results = execute_tool_calls(tool_calls)
 
-        tool_messages.append({
+    messages.append(initial_response['choices'][0]['message'])
+
+    for tool_call, result in zip(tool_calls, results):
+        messages.append({
             'role': 'tool',
             'tool_call_id': tool_call['id'],
-            'content': json.dumps(result)
+            'content': result  # Already JSON text
         })
 
-        print('✓ Tool executed successfully\n')
+    print(f'✓ {len(tool_calls)} tool(s) executed successfully\n')
 
     # Step 3: Send results back to AI
     print('Step 2: Sending tool results back to AI for final answer...\n')
 
-    final_response = call_groq([
-        {'role': 'user', 'content': user_query},
-        initial_response['choices'][0]['message'],
-        *tool_messages
-    ])
+    final_response = call_groq(messages)
 
     # Display final response
     print('========================================')
@@ -221,12 +424,19 @@ def main():
     print('========================================\n')
     print('✓ AI agent successfully used tools')
     print(f'✓ Executed {len(tool_calls)} tool call(s)')
-    print('✓ Retrieved real-time information')
+    if _CACHE_HITS:
+        print(f'✓ Used {len(_CACHE_HITS)} saved web result(s); '
+              'run with --no-cache for fresh ones')
+    else:
+        print('✓ Retrieved real-time information')
     print('✓ Generated informed response\n')
 
 if __name__ == '__main__':
+    # Ask your own question with: python3 11_tool_use.py "your question"
+    words = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
     try:
-        main()
+        main(' '.join(words) or DEFAULT_QUERY)
     except Exception as error:
+        sys.stdout.flush()  # Show what was printed so far before the error
         print(f'Error: {error}', file=sys.stderr)
         sys.exit(1)
@@ -22,6 +22,7 @@ Expected output:
 Exercises: exercises/11_web_search.md
 """
 
+import gzip
 import http.client
 import json
 import os
@@ -34,6 +35,14 @@ if not api_key:
     print('Run: export DEMETERICS_API_KEY="dmt_your_api_key_here"', file=sys.stderr)
     sys.exit(1)
 
+# Print output in big blocks instead of line by line. On a terminal, Python
+# normally writes each printed line to the screen right away, one system
+# call per line; with line buffering off, many lines go out in one write.
+# Everything is printed after the answer arrives, so nothing waits on it
+# (Python flushes the rest when the script ends). Errors go to stderr, which
+# is not buffered, so we flush first to keep them after the earlier lines.
+sys.stdout.reconfigure(line_buffering=False)
+
 # Step 2: Build payload
 payload = {
     "model": "groq/compound-mini",
@@ -55,7 +64,8 @@ try:
 
     headers = {
         'Authorization': f'Bearer {api_key}',
-        'Content-Type': 'application/json'
+        'Content-Type': 'application/json',
+        'Accept-Encoding': 'gzip'  # We can unpack compressed answers
     }
 
     # Step 4: Send request
@@ -64,7 +74,14 @@ try:
 
     # Step 5: Read response
     res = conn.getresponse()
-    data = res.read().decode('utf-8')
+    # Keep the raw bytes: json.loads() parses UTF-8 bytes directly, so
+    # decoding them into a str first would only copy the whole answer
+    data = res.read()
+
+    # We said we accept gzip, so the server may have compressed its answer
+    # (long JSON text shrinks a lot); if so, unpack it
+    if res.getheader('Content-Encoding') == 'gzip':
+        data = gzip.decompress(data)
     conn.close()
 
     # Step 6: Parse JSON
@@ -103,6 +120,8 @@ try:
     print('Exercises: exercises/11_web_search.md')
 
 except Exception as e:
+    sys.stdout.flush()  # Show what was printed so far before the error
     print(f'Error: {e}', file=sys.stderr)
-    print('Raw response:', data if 'data' in locals() else '(none)', file=sys.stderr)
+    raw = data.decode('utf-8', 'replace') if 'data' in locals() else '(none)'
+    print('Raw response:', raw, file=sys.stderr)
     sys.exit(1)
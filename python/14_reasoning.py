@@ -18,10 +18,15 @@ Note: Uses Python standard library only
 For production, consider: pip install groq
 """
 
+import atexit
+import concurrent.futures
 import http.client
 import json
 import os
+import ssl
 import sys
+import threading
+import time
 
 # Check for API key
 if not os.environ.get('DEMETERICS_API_KEY'):
@@ -29,34 +34,217 @@ if not os.environ.get('DEMETERICS_API_KEY'):
     print('Get your Managed LLM Key from: https://demeterics.com', file=sys.stderr)
     sys.exit(1)
 
+# The demos send their requests at the same time from worker threads (see
+# main()). A connection can only carry one request at a time, so each
+# thread keeps its own open connection, keyed by (host, thread id), and
+# reuses it (HTTP/1.1 keep-alive) instead of paying a new TCP + TLS
+# handshake for every request.
+#
+# HTTP/2 could carry all three requests over a single connection at once,
+# but the standard library's http.client only speaks HTTP/1.1 (HTTP/2
+# needs a package such as httpx[http2]). With only a few requests, one
+# connection per thread costs just a few extra handshakes.
+_CONNECTIONS = {}
+SSL_CONTEXT = ssl.create_default_context()
+
+def get_shared_connection(host):
+    """Return this thread's cached connection for host, creating it on first use"""
+    key = (host, threading.get_ident())
+    conn = _CONNECTIONS.get(key)
+    if conn is None:
+        conn = http.client.HTTPSConnection(host, timeout=60, context=SSL_CONTEXT)
+        _CONNECTIONS[key] = conn
+    return conn
+
+def close_shared_connections():
+    """Close every cached connection (called automatically at exit)"""
+    for conn in list(_CONNECTIONS.values()):
+        conn.close()
+    _CONNECTIONS.clear()
+
+atexit.register(close_shared_connections)
+
+# Temporary failures are worth retrying, and sending many requests at
+# once makes "429 Too Many Requests" more likely. 429 and 5xx answers are
+# retried a couple of times, waiting longer before each new attempt
+# ("exponential backoff").
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 2
+BACKOFF_FACTOR = 0.3  # Waits 0.3s, then 0.6s, ...
+
+def send_request(host, path, body, headers):
+    """POST body over this thread's connection and return the response
+
+    Servers close idle kept-alive connections after a while; if that
+    happened, reconnect once and send the request again. Responses with a
+    status in RETRY_STATUSES are retried up to MAX_RETRIES times.
+    """
+    reconnected = False
+    attempt = 0
+    while True:
+        conn = get_shared_connection(host)
+        try:
+            conn.request('POST', path, body, headers)
+            response = conn.getresponse()
+        except (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                ConnectionResetError, BrokenPipeError):
+            _CONNECTIONS.pop((host, threading.get_ident())).close()
+            if reconnected:
+                raise
+            reconnected = True
+            continue
+
+        if response.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            return response
+
+        # Read (and ignore) the error body so the connection can be reused
+        response.read()
+
+        # Respect the server's Retry-After hint if it is longer than ours
+        delay = BACKOFF_FACTOR * (2 ** attempt)
+        retry_after = response.getheader('Retry-After', '')
+        if retry_after.isdigit():
+            delay = max(delay, int(retry_after))
+        time.sleep(delay)
+        attempt += 1
+
+# The headers are the same for every request, so build them once
+HEADERS = {
+    'Content-Type': 'application/json',
+    'Authorization': f'Bearer {os.environ["DEMETERICS_API_KEY"]}',
+    'Connection': 'keep-alive'  # Ask the server to leave the connection open
+}
+
+# Saved answers: with temperature 0.6 answers are random on purpose, so they
+# are only saved and reused if you opt in with: export AI101_CACHE=1
+# (handy while you work on the printing code). A deterministic request
+# (temperature 0) is always cached. Run with --no-cache to always call the API.
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'ai101')
+
+def cache_enabled(request_data):
+    """Return True if this request's answer may be read from / saved to disk"""
+    if '--no-cache' in sys.argv:
+        return False
+    return request_data.get('temperature') == 0 or os.environ.get('AI101_CACHE') == '1'
+
+def normalize_message(message):
+    """Return message with runs of whitespace turned into one space
+
+    "How many 'r' letters  are in\n'strawberry'? " and "How many 'r'
+    letters are in 'strawberry'?" get the same answer, so they should share
+    one cache entry. Upper/lower case is kept: for questions about spelling
+    and letters, like the one below, it can change the answer. (Matching
+    questions that are only worded differently would need an embedding
+    model, which this standard-library example doesn't have.)
+    """
+    return ' '.join(message.split())
+
+def get_cache_path(host, path, before, messages, after):
+    """Return the cache file named after the SHA-256 of the normalized request"""
+    import hashlib
+
+    key_messages = [{**m, 'content': normalize_message(m['content'])}
+                    for m in messages]
+    key_source = f'{host} {path} {before}{json.dumps(key_messages)}{after}'
+    key = hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+    return os.path.join(CACHE_DIR, key + '.json')
+
+# A system message that never changes, sent FIRST in every request.
+# Providers cache prompts by their beginning: if a new request starts with
+# exactly the same tokens as an earlier one, that shared part is served
+# from the cache at the cached-input price. So the fixed text goes first
+# and the question, which changes, goes last (see "Cache Optimization
+# Strategy" in the output). Two things to know:
+# - Caching usually only starts with a long shared beginning (often
+#   1024 tokens or more), so in a real app this is where a long system
+#   prompt or reference document belongs. This short one shows the order.
+# - Requests sent at the same moment (like the three demos below) can't
+#   reuse each other's cache; the requests that come after them can.
+# The model and temperature also stay the same for every request. The text
+# itself is neutral on purpose: asking the model to "show its work" would
+# push its reasoning into the answer, which the 'parsed' and 'hidden'
+# formats below are meant to keep out of it.
+SYSTEM_MESSAGE = {
+    'role': 'system',
+    'content': 'You are a helpful assistant.'
+}
+
+# The demos only read the message text and the token counts. Everything
+# else in an answer (ids, timestamps, timing details, ...) is dropped while
+# parsing: json.loads() calls object_hook on every {...} object as soon as
+# it is built, and keeps whatever the hook returns instead. The parser
+# still reads every byte, but the unused fields are not kept around.
+RESPONSE_KEYS = frozenset({
+    'choices', 'message', 'content', 'reasoning', 'error',
+    'usage', 'prompt_tokens', 'completion_tokens', 'total_tokens'
+})
+
+def keep_needed_keys(obj):
+    """object_hook for json.loads(): keep only the fields in RESPONSE_KEYS"""
+    return {key: value for key, value in obj.items() if key in RESPONSE_KEYS}
+
+# Every request uses the same settings; only the messages, the reasoning
+# effort and the reasoning format change. So the JSON around the messages
+# is built once for each effort/format pair, and each call only encodes
+# the messages and glues the pieces together (the same idea as in
+# 11_tool_use.py). The placeholder marks where the messages go.
+REASONING_SETTINGS = {
+    'model': 'openai/gpt-oss-20b',
+    'temperature': 0.6,
+    'max_completion_tokens': 1024
+}
+MESSAGES_PLACEHOLDER = '@@MESSAGES@@'
+_REQUEST_TEMPLATES = {}
+
+def get_request_template(format_type, effort):
+    """Return the JSON text before and after the messages, as a pair"""
+    key = (format_type, effort)
+    if key not in _REQUEST_TEMPLATES:
+        request_data = {**REASONING_SETTINGS,
+                        'messages': MESSAGES_PLACEHOLDER,
+                        'reasoning_effort': effort}
+        if format_type:
+            request_data['reasoning_format'] = format_type
+
+        # Compact JSON (no spaces after , and :) is a little smaller to send
+        text = json.dumps(request_data, separators=(',', ':'))
+        before, _, after = text.partition(json.dumps(MESSAGES_PLACEHOLDER))
+        _REQUEST_TEMPLATES[key] = (before, after)
+    return _REQUEST_TEMPLATES[key]
+
 def call_reasoning(messages, format_type=None, effort='medium'):
     """Call Demeterics Groq proxy with reasoning model"""
-    conn = http.client.HTTPSConnection('api.demeterics.com')
-
-    headers = {
-        'Content-Type': 'application/json',
-        'Authorization': f'Bearer {os.environ["DEMETERICS_API_KEY"]}'
-    }
-
-    request_data = {
-        'model': 'openai/gpt-oss-20b',
-        'messages': messages,
-        'temperature': 0.6,
-        'max_completion_tokens': 1024,
-        'reasoning_effort': effort
-    }
-
-    if format_type:
-        request_data['reasoning_format'] = format_type
-
-    body = json.dumps(request_data)
-
-    conn.request('POST', '/groq/v1/chat/completions', body, headers)
-    response = conn.getresponse()
-    data = response.read().decode('utf-8')
-    conn.close()
-
-    return json.loads(data)
+    before, after = get_request_template(format_type, effort)
+    body = before + json.dumps(messages, separators=(',', ':')) + after
+
+    host, path = 'api.demeterics.com', '/groq/v1/chat/completions'
+    use_cache = cache_enabled(REASONING_SETTINGS)
+    if use_cache:
+        cache_file = get_cache_path(host, path, before, messages, after)
+        if os.path.exists(cache_file):
+            # The demos run on several threads: the newline is part of the
+            # text, so this is one write that can't mix with other output
+            print(f'(Answer loaded from {cache_file}; '
+                  'run with --no-cache to call the API)\n', end='')
+            with open(cache_file, 'rb') as f:
+                return json.loads(f.read(), object_hook=keep_needed_keys)
+
+    response = send_request(host, path, body, HEADERS)
+
+    # json.loads() accepts the raw UTF-8 bytes, so there is no .decode() copy
+    data = response.read()
+    result = json.loads(data, object_hook=keep_needed_keys)
+
+    # Keep successful answers. The demos run in parallel, so the temp file
+    # name includes the thread.
+    if use_cache and response.status == 200:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_file = f'{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_file, cache_file)
+
+    return result
 
 def main():
     print('========================================')
@@ -64,16 +252,27 @@ def main():
     print('========================================\n')
 
     query = "How many 'r' letters are in the word 'strawberry'? Think through this step-by-step."
-    messages = [{'role': 'user', 'content': query}]
+    messages = [SYSTEM_MESSAGE, {'role': 'user', 'content': query}]
 
     print(f'Query: {query}\n')
 
+    # The three demos ask the same question and don't depend on each
+    # other, so all three requests are sent at the same time: the wait is
+    # about one answer instead of three. Results are printed in order below.
+    print('Sending the three requests at the same time...\n')
+    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as pool:
+        raw_future = pool.submit(call_reasoning, messages)
+        parsed_future = pool.submit(call_reasoning, messages, 'parsed')
+        hidden_future = pool.submit(call_reasoning, messages, 'hidden')
+    raw_response = raw_future.result()
+    parsed_response = parsed_future.result()
+    hidden_response = hidden_future.result()
+
     # Demo 1: Raw format (default)
     print('========================================')
     print('Demo 1: Raw Format (reasoning in <think> tags)')
     print('========================================\n')
 
-    raw_response = call_reasoning(messages)
     print('Response (raw format):')
     print(raw_response['choices'][0]['message']['content'])
     print('')
@@ -88,8 +287,6 @@ def main():
     print('Demo 2: Parsed Format (separate reasoning field)')
     print('========================================\n')
 
-    parsed_response = call_reasoning(messages, 'parsed')
-
     if 'reasoning' in parsed_response['choices'][0]['message']:
         print('Reasoning process:')
         print(parsed_response['choices'][0]['message']['reasoning'])
@@ -104,7 +301,6 @@ def main():
     print('Demo 3: Hidden Format (only final answer)')
     print('========================================\n')
 
-    hidden_response = call_reasoning(messages, 'hidden')
     print('Response (hidden format):')
     print(hidden_response['choices'][0]['message']['content'])
     print('')
@@ -10,20 +10,103 @@ Demonstrates:
 Note: Uses Python standard library only
 """
 
+import atexit
+import concurrent.futures
 import http.client
 import json
 import os
+import shutil
+import ssl
 import sys
+import threading
+import time
 
 if not os.environ.get('OPENAI_API_KEY'):
     print('Error: OPENAI_API_KEY not set', file=sys.stderr)
     print('Get your key from: https://platform.openai.com', file=sys.stderr)
     sys.exit(1)
 
-def text_to_speech(text, voice, **kwargs):
-    """Call OpenAI TTS API"""
-    conn = http.client.HTTPSConnection('api.openai.com')
-    
+# This demo makes 12 requests to the same server. Instead of paying a new
+# TCP + TLS handshake for every one, we keep connections open and reuse
+# them (HTTP/1.1 keep-alive). The voices are generated on worker threads
+# (see main()), and a connection can only carry one request at a time, so
+# each thread gets its own: the dictionary is keyed by (host, thread id).
+_CONNECTIONS = {}
+SSL_CONTEXT = ssl.create_default_context()
+
+def get_shared_connection(host):
+    """Return this thread's cached connection for host, creating it on first use"""
+    key = (host, threading.get_ident())
+    conn = _CONNECTIONS.get(key)
+    if conn is None:
+        conn = http.client.HTTPSConnection(host, timeout=60, context=SSL_CONTEXT)
+        _CONNECTIONS[key] = conn
+    return conn
+
+def close_shared_connections():
+    """Close every cached connection (called automatically at exit)"""
+    for conn in list(_CONNECTIONS.values()):
+        conn.close()
+    _CONNECTIONS.clear()
+
+atexit.register(close_shared_connections)
+
+# Temporary failures are worth retrying, and sending many requests at
+# once makes "429 Too Many Requests" more likely. 429 and 5xx answers are
+# retried a couple of times, waiting longer before each new attempt
+# ("exponential backoff").
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 2
+BACKOFF_FACTOR = 0.3  # Waits 0.3s, then 0.6s, ...
+
+def send_request(host, path, body, headers):
+    """POST body over this thread's connection and return the response
+
+    Servers close idle kept-alive connections after a while; if that
+    happened, reconnect once and send the request again. Responses with a
+    status in RETRY_STATUSES are retried up to MAX_RETRIES times.
+    """
+    reconnected = False
+    attempt = 0
+    while True:
+        conn = get_shared_connection(host)
+        try:
+            conn.request('POST', path, body, headers)
+            response = conn.getresponse()
+        except (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                ConnectionResetError, BrokenPipeError):
+            _CONNECTIONS.pop((host, threading.get_ident())).close()
+            if reconnected:
+                raise
+            reconnected = True
+            continue
+
+        if response.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            return response
+
+        # Read (and ignore) the error body so the connection can be reused
+        response.read()
+
+        # Respect the server's Retry-After hint if it is longer than ours
+        delay = BACKOFF_FACTOR * (2 ** attempt)
+        retry_after = response.getheader('Retry-After', '')
+        if retry_after.isdigit():
+            delay = max(delay, int(retry_after))
+        time.sleep(delay)
+        attempt += 1
+
+# The headers are the same for every request, so build them once
+HEADERS = {
+    'Content-Type': 'application/json',
+    'Authorization': f'Bearer {os.environ["OPENAI_API_KEY"]}',
+    'Connection': 'keep-alive'  # Ask the server to leave the connection open
+}
+
+# Audio is copied from the network to the file in pieces of this size
+CHUNK_SIZE = 64 * 1024
+
+def text_to_speech(text, voice, filename, **kwargs):
+    """Call OpenAI TTS API, save the audio to filename and return its size"""
     request_data = {
         'model': 'gpt-4o-mini-tts',
         'input': text,
@@ -32,17 +115,52 @@ def text_to_speech(text, voice, **kwargs):
     }
     
     body = json.dumps(request_data)
-    headers = {
-        'Content-Type': 'application/json',
-        'Authorization': f'Bearer {os.environ["OPENAI_API_KEY"]}'
-    }
+    response = send_request('api.openai.com', '/v1/audio/speech', body, HEADERS)
     
-    conn.request('POST', '/v1/audio/speech', body, headers)
-    response = conn.getresponse()
-    audio_data = response.read()
-    conn.close()
+    # An error comes back as JSON, not audio: don't save it as an .mp3.
+    # (Reading it also frees the connection for the next request.)
+    if response.status != 200:
+        error_text = response.read().decode('utf-8', 'replace')
+        raise Exception(f'API Error for voice {voice}: HTTP {response.status}\n{error_text}')
     
-    return audio_data
+    # Copy the audio straight into the file, one piece at a time, instead
+    # of first holding all of it in memory. Reading to the end also frees
+    # the connection for the next request.
+    with open(filename, 'wb') as f:
+        shutil.copyfileobj(response, f, CHUNK_SIZE)
+        return f.tell()
+
+# Why not OpenAI's Batch API (50% cheaper, see 01_basic_chat_BATCH.py)?
+# Batch jobs only accept text endpoints such as /v1/chat/completions and
+# /v1/embeddings, not /v1/audio/speech, and their results come back as
+# JSON lines, not audio files. For speech, sending the requests in
+# parallel is the way to save time.
+
+# At most this many voices are generated at the same time
+MAX_PARALLEL_REQUESTS = 8
+
+# One pool of worker threads for the whole run, created once. Each worker
+# keeps its own open connection (see get_shared_connection()), so sending
+# every batch through the same threads reuses those connections too. A new
+# pool per call would start new threads, whose connections would never be
+# used again. Threads are only started when there is work for them.
+_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_PARALLEL_REQUESTS)
+
+def voices_to_speech(text, voices):
+    """Say text in every voice at the same time, saving voice_<name>.mp3 files
+
+    Each voice takes a second or so to generate, and the voices don't
+    depend on each other. One after another, the waits add up; on worker
+    threads, all of them take about as long as the slowest one. Returns
+    the file names, in the same order as the voices.
+    """
+    filenames = [f'voice_{voice}.mp3' for voice in voices]
+    # Each worker also saves its own file as the audio arrives (see
+    # text_to_speech), so disk writes happen in parallel with the other
+    # downloads too: no separate pool for writing files is needed
+    # list() waits until every file is written (and raises any error)
+    list(_EXECUTOR.map(text_to_speech, [text] * len(voices), voices, filenames))
+    return filenames
 
 def main():
     print('========================================')
@@ -51,12 +169,9 @@ def main():
     
     # Demo 1: Basic TTS
     text = "Hello! This is an example of text-to-speech synthesis using OpenAI's affordable TTS model."
-    audio = text_to_speech(text, 'alloy')
-    
-    with open('demo1_alloy.mp3', 'wb') as f:
-        f.write(audio)
+    size = text_to_speech(text, 'alloy', 'demo1_alloy.mp3')
     
-    print(f'✓ Audio created: demo1_alloy.mp3 ({len(audio)} bytes)\n')
+    print(f'✓ Audio created: demo1_alloy.mp3 ({size} bytes)\n')
     
     # Demo 2: All voices
     print('Generating all 11 voices...\n')
@@ -64,12 +179,10 @@ def main():
               'onyx', 'nova', 'sage', 'shimmer', 'verse']
     
     comparison_text = "Welcome to OpenAI's text-to-speech demonstration."
-    for voice in voices:
-        audio = text_to_speech(comparison_text, voice)
-        filename = f'voice_{voice}.mp3'
-        with open(filename, 'wb') as f:
-            f.write(audio)
-        print(f'✓ {voice}: {filename}')
+    filenames = voices_to_speech(comparison_text, voices)
+    # One print() for all the lines instead of one print() per voice
+    print('\n'.join(f'✓ {voice}: {filename}'
+                    for voice, filename in zip(voices, filenames)))
     
     print('\n' + '='*40)
     print('Cost Analysis')
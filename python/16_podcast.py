@@ -18,6 +18,7 @@
 # Usage:
 #   export DEMETERICS_API_KEY="dmt_your-api-key"
 #   python3 16_podcast.py
+#   AI101_CACHE=1 python3 16_podcast.py   # Save the audio, reuse it next time
 #
 ################################################################################
 
@@ -25,6 +26,7 @@ import os
 import json
 import http.client
 import sys
+import shutil
 
 # Step 1: Check for API key
 api_key = os.environ.get('DEMETERICS_API_KEY')
@@ -86,36 +88,74 @@ print(f'Script length: {len(podcast_script)} characters')
 print('')
 print('Generating podcast audio...')
 
-# Step 5: Make the API request
-conn = http.client.HTTPSConnection('api.demeterics.com')
-headers = {
-    'Content-Type': 'application/json',
-    'Authorization': f'Bearer {api_key}'
-}
+# Step 5: Reuse the saved audio if we generated this exact podcast before
+# Generating audio takes a while and costs money. But speech generation is
+# random: the same script and voices give a (slightly) different podcast
+# every time. So, like the other examples' non-deterministic requests, the
+# audio is only saved if you opt in with: export AI101_CACHE=1
+# It is then saved in ~/.cache/ai101, named after the SHA-256 of the
+# request, and re-running the example just copies it. Run with --no-cache
+# to call the API even when the cache is switched on.
 
-conn.request('POST', '/tts/v1/generate', json.dumps(request_body), headers)
-response = conn.getresponse()
+# The body is encoded to JSON exactly once, and that one string is used
+# both for the cache key and for the request. Escaping the 2 KB script
+# happens a single time per run, which no template could beat.
+# Compact JSON (no spaces after , and :) is a little smaller to send
+body = json.dumps(request_body, separators=(',', ':'))
+output_file = 'columbus_podcast.wav'
 
-# Step 6: Check for errors
-if response.status != 200:
-    print(f'API Error: HTTP {response.status}')
-    print(response.read().decode('utf-8'))
-    sys.exit(1)
+use_cache = '--no-cache' not in sys.argv and os.environ.get('AI101_CACHE') == '1'
+if use_cache:
+    import hashlib
 
-# Step 7: Save the audio file directly (Demeterics returns audio bytes)
-audio_bytes = response.read()
-conn.close()
+    cache_dir = os.path.join(os.path.expanduser('~'), '.cache', 'ai101')
+    key = hashlib.sha256(f'/tts/v1/generate {body}'.encode('utf-8')).hexdigest()
+    cache_file = os.path.join(cache_dir, f'podcast-{key}.wav')
 
-output_file = 'columbus_podcast.wav'
-with open(output_file, 'wb') as f:
-    f.write(audio_bytes)
+if use_cache and os.path.exists(cache_file):
+    shutil.copyfile(cache_file, output_file)
+    audio_size = os.path.getsize(output_file)
+    print(f'(Using the saved audio from {cache_file})')
+else:
+    # Step 6: Make the API request
+    conn = http.client.HTTPSConnection('api.demeterics.com')
+    headers = {
+        'Content-Type': 'application/json',
+        'Authorization': f'Bearer {api_key}'
+    }
+
+    conn.request('POST', '/tts/v1/generate', body, headers)
+    response = conn.getresponse()
+
+    # Step 7: Check for errors
+    if response.status != 200:
+        print(f'API Error: HTTP {response.status}')
+        print(response.read().decode('utf-8'))
+        sys.exit(1)
+
+    # Step 8: Save the audio file directly (Demeterics returns audio bytes)
+    # The WAV file can be several MB. Instead of reading all of it into
+    # memory and then writing it out, copy it from the network to the file
+    # in 64 KB pieces as it arrives
+    with open(output_file, 'wb') as f:
+        shutil.copyfileobj(response, f, 64 * 1024)
+        audio_size = f.tell()
+    conn.close()
+
+    # Keep a copy for next time (copy to a temp file, then rename, so a
+    # crash can never leave half a file in the cache)
+    if use_cache:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+        shutil.copyfile(output_file, tmp_file)
+        os.replace(tmp_file, cache_file)
 
 print('')
 print('Success!')
 print('')
 print('Output:')
 print(f'  File: {output_file}')
-print(f'  Size: {len(audio_bytes)} bytes ({len(audio_bytes) // 1024} KB)')
+print(f'  Size: {audio_size} bytes ({audio_size // 1024} KB)')
 print('')
 print('To play:')
 print(f'  mpv {output_file}')
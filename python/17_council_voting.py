@@ -10,9 +10,13 @@ Demonstrates:
 Note: Uses Python standard library only
 """
 
+import atexit
+import collections
+import gzip
 import http.client
 import json
 import os
+import ssl
 import sys
 
 # Check for API keys
@@ -25,6 +29,58 @@ if not DEMETERICS_KEY or not GROQ_KEY:
     print('Get your Groq key: https://console.groq.com', file=sys.stderr)
     sys.exit(1)
 
+# The headers never change, so build them once. The Council API takes both
+# keys in one dual-key Authorization header: demeterics_key;groq_key
+HEADERS = {
+    'Content-Type': 'application/json',
+    'Authorization': f'Bearer {DEMETERICS_KEY};{GROQ_KEY}',
+    'Connection': 'keep-alive',  # Ask the server to leave the connection open
+    'Accept-Encoding': 'gzip'  # We can unpack compressed answers
+}
+
+# Keep the connection open between calls (HTTP/1.1 keep-alive), so
+# evaluating several questions only pays for one TCP + TLS handshake.
+_CONNECTIONS = {}
+SSL_CONTEXT = ssl.create_default_context()
+
+
+def get_shared_connection(host):
+    """Return the cached HTTPS connection for host, creating it on first use."""
+    conn = _CONNECTIONS.get(host)
+    if conn is None:
+        # A council run waits for every persona, so allow a long wait (5 min)
+        conn = http.client.HTTPSConnection(host, timeout=300,
+                                           context=SSL_CONTEXT)
+        _CONNECTIONS[host] = conn
+    return conn
+
+
+def close_shared_connections():
+    """Close every cached connection (called automatically at exit)."""
+    for conn in _CONNECTIONS.values():
+        conn.close()
+    _CONNECTIONS.clear()
+
+
+atexit.register(close_shared_connections)
+
+
+def send_request(host, path, body, headers):
+    """POST body over the shared connection and return the response.
+
+    If the server closed our idle kept-alive connection, reconnect once.
+    """
+    try:
+        conn = get_shared_connection(host)
+        conn.request('POST', path, body, headers)
+        return conn.getresponse()
+    except (http.client.RemoteDisconnected, http.client.BadStatusLine,
+            ConnectionResetError, BrokenPipeError):
+        _CONNECTIONS.pop(host).close()
+        conn = get_shared_connection(host)
+        conn.request('POST', path, body, headers)
+        return conn.getresponse()
+
 # Stories from December 3rd in History (simplified)
 STORIES = """A) John Paul Jones raises the first American flag on a warship in 1775.
 Cannons fire over Boston Harbor as sailors cheer. The Grand Union Flag flies
@@ -44,28 +100,43 @@ the bench, a watershed moment for American justice and civil rights."""
 
 
 def call_council(question, content, num_personas=8):
-    """Call the Demeterics Council API for voting evaluation."""
-    conn = http.client.HTTPSConnection('api.demeterics.com')
-
-    # Use dual-key format: demeterics_key;groq_key
-    auth_header = f'{DEMETERICS_KEY};{GROQ_KEY}'
-
-    headers = {
-        'Content-Type': 'application/json',
-        'Authorization': f'Bearer {auth_header}'
-    }
-
+    """Call the Demeterics Council API for voting evaluation.
+
+    One request evaluates all the personas: the fan-out to the personas
+    and the vote counting happen on the server, next to the models. It can
+    be tempting to send num_personas separate requests in parallel and
+    count the votes here instead, but that would pay a round-trip (and
+    rate-limit budget) per persona, and lose what only the server has:
+    the distinct personas, the consensus stats and the written summary.
+    To evaluate several questions, call this function for each one, for
+    example from a concurrent.futures.ThreadPoolExecutor (see
+    05_safety_check.py for that pattern).
+    """
+    # Compact JSON (no spaces after , and :) is a little smaller to send
     body = json.dumps({
         'question': question,
         'content': content,
         'num_personas': num_personas
-    })
-
-    conn.request('POST', '/council/v1/evaluate', body, headers)
-    response = conn.getresponse()
-    data = response.read().decode('utf-8')
-    conn.close()
-
+    }, separators=(',', ':'))
+
+    response = send_request('api.demeterics.com', '/council/v1/evaluate',
+                            body, HEADERS)
+
+    # Reading the whole body frees the connection for the next call.
+    # Parsing the body while it downloads, to print the first votes early,
+    # would not show anything sooner: the server only answers once every
+    # persona has voted (it needs all votes for the stats and the summary),
+    # and the finished answer then arrives in a fraction of a second.
+    data = response.read()
+
+    # Every persona's written reason adds up to a lot of text, which
+    # shrinks to a fraction of its size when compressed. We said we accept
+    # gzip, so the server may have compressed its answer; if so, unpack it
+    if response.getheader('Content-Encoding') == 'gzip':
+        data = gzip.decompress(data)
+
+    # json.loads() accepts the raw UTF-8 bytes, so there is no .decode() copy
+    # (the result lists every persona's answer, so it can be long)
     return json.loads(data)
 
 
@@ -91,7 +162,8 @@ def display_results(result):
     # Vote breakdown
     print('Vote Breakdown:')
     vote_breakdown = stats.get('vote_breakdown', {})
-    for option, count in sorted(vote_breakdown.items(), key=lambda x: -x[1]):
+    # most_common() lists the options from most to fewest votes
+    for option, count in collections.Counter(vote_breakdown).most_common():
         bar = '*' * count
         print(f"  {option}: {bar} ({count} votes)")
     print()
@@ -109,10 +181,11 @@ def display_results(result):
         vote = persona.get('vote', 'N/A')
         reason = persona.get('vote_reason', 'No reason given')
         level = persona.get('interested_level', 0)
-        print(f"  {name}: {vote}")
-        print(f"    Reason: {reason}")
-        print(f"    Interest: {level}/100")
-        print()
+        # One print() per persona: the three lines (and the blank line
+        # after them) are formatted together, instead of four print() calls
+        print(f"  {name}: {vote}\n"
+              f"    Reason: {reason}\n"
+              f"    Interest: {level}/100\n")
 
     # Summary
     print('=' * 60)
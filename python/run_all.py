@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Run the Python Examples Together (Concurrently, but Politely)
+
+WHAT THIS DEMONSTRATES:
+    - Running many independent programs at the same time with asyncio
+    - Capping how many run at once with asyncio.Semaphore
+    - Showing live progress with asyncio.as_completed()
+    - Retrying rate-limited runs with exponential backoff
+      (the examples share one API key, so they share its rate limit)
+
+WHAT YOU'LL LEARN:
+    - Why "fire everything at once" gets you HTTP 429 (Too Many Requests)
+    - How a semaphore turns 14 jobs into "at most 5 at a time"
+    - The difference between finishing order and display order
+
+PREREQUISITES:
+    - Python 3.7 or higher (for asyncio.run)
+    - The API keys the selected examples need (DEMETERICS_API_KEY, ...)
+
+EXPECTED OUTPUT:
+    - One progress line per example as soon as it finishes
+    - Every example's full output, in numeric order
+    - Total wall-clock time vs. the time a one-by-one run would take
+
+Run with: python3 run_all.py                          (all main examples)
+     or:  python3 run_all.py 01_basic_chat.py 04_vision.py
+     or:  python3 run_all.py 02_system_prompt.py "03_prompt_template.py History Rome"
+          (quote an example together with its own arguments)
+
+The default run leaves out the slow or paid examples: 15_text_to_speech.py
+(12 OpenAI TTS calls), 16_podcast.py and 17_council_voting.py. Name them on
+the command line to include them.
+"""
+
+import asyncio      # For running several examples at the same time
+import glob         # For finding the example files
+import os           # For paths
+import re           # For spotting the main examples by file name
+import shlex        # For splitting "script.py arg1 arg2" into its parts
+import sys          # For the command line and the Python interpreter path
+import time         # For measuring durations
+
+# ==============================================================================
+# Step 1: Settings
+# ==============================================================================
+
+# At most this many examples talk to the APIs at the same time. Groq's free
+# tier allows a limited number of requests per minute; 5 in flight keeps a
+# full run comfortably below that.
+MAX_CONCURRENT = 5
+
+# A run that failed because of rate limiting is run again, up to
+# MAX_ATTEMPTS runs in total: with 3, it waits 1s, then 2s
+MAX_ATTEMPTS = 3
+
+# Give up on an example that takes longer than this (seconds)
+TIMEOUT = 300
+
+# Text in an example's output that shows it hit a rate limit (HTTP 429)
+# rather than a real bug. These come from the APIs' error messages.
+RATE_LIMIT_MARKERS = ("rate_limit_exceeded", "Rate limit reached", "Too Many Requests")
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# ==============================================================================
+# Step 2: Choose which examples to run
+# ==============================================================================
+
+# By default: the main numbered examples (01_basic_chat.py, 02_...).
+# Provider variants like 01_basic_chat_OPENAI.py need other API keys, and
+# the examples in NOT_BY_DEFAULT take minutes or cost real money, so they
+# only run when you name them on the command line.
+NOT_BY_DEFAULT = {"15_text_to_speech.py", "16_podcast.py", "17_council_voting.py"}
+
+# Each name may carry its own arguments, e.g. "03_prompt_template.py History
+# Rome", so one template can be rendered for several topics at the same time.
+if len(sys.argv) > 1:
+    scripts = sys.argv[1:]
+else:
+    scripts = sorted(
+        os.path.basename(path)
+        for path in glob.glob(os.path.join(SCRIPT_DIR, "[0-9][0-9]_*.py"))
+        if not re.search(r'_[A-Z]+\.py$', path)
+        and os.path.basename(path) not in NOT_BY_DEFAULT
+    )
+
+missing = [name for name in scripts
+           if not os.path.exists(os.path.join(SCRIPT_DIR, shlex.split(name)[0]))]
+if missing:
+    print(f"Error: example(s) not found: {', '.join(missing)}", file=sys.stderr)
+    sys.exit(1)
+
+# ==============================================================================
+# Step 3: Run one example (with retries on rate limits)
+# ==============================================================================
+
+
+async def run_example(name):
+    """Run one example script and return (name, exit_code, output, seconds).
+
+    The example runs as its own Python process, from this folder, so its
+    relative paths (like ../test_image.jpg) keep working. name is the
+    script file, optionally followed by its arguments.
+    """
+    start = time.perf_counter()
+    for attempt in range(MAX_ATTEMPTS):
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, *shlex.split(name),
+            cwd=SCRIPT_DIR,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT
+        )
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(), TIMEOUT)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            return name, -1, f"Timed out after {TIMEOUT}s", time.perf_counter() - start
+
+        output = stdout.decode('utf-8', errors='replace')
+        rate_limited = any(marker in output for marker in RATE_LIMIT_MARKERS)
+
+        if not rate_limited or attempt == MAX_ATTEMPTS - 1:
+            break
+
+        # Exponential backoff: wait 1s, then 2s (each wait twice as long)
+        await asyncio.sleep(2 ** attempt)
+
+    return name, process.returncode, output, time.perf_counter() - start
+
+
+# ==============================================================================
+# Step 4: Run them all, at most MAX_CONCURRENT at a time
+# ==============================================================================
+
+
+async def run_all(names):
+    """Run every example and print a progress line as each one finishes.
+
+    Returns one (exit_code, output, seconds) per name, in the same order.
+    Results are kept by position, not by name, so naming the same example
+    twice keeps both runs.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT)
+
+    async def limited(index, name):
+        # Only MAX_CONCURRENT tasks can be inside this block at once;
+        # the rest wait here until a slot frees up
+        async with semaphore:
+            return (index, *await run_example(name))
+
+    tasks = [limited(index, name) for index, name in enumerate(names)]
+    results = [None] * len(names)
+
+    # as_completed() hands us each task as soon as it is done, in FINISHING
+    # order, so the progress lines appear live
+    for done, task in enumerate(asyncio.as_completed(tasks), start=1):
+        index, name, code, output, seconds = await task
+        results[index] = (code, output, seconds)
+        status = "ok" if code == 0 else f"FAILED (exit {code})"
+        print(f"[{done}/{len(names)}] {name}: {status} in {seconds:.1f}s", flush=True)
+
+    return results
+
+
+print(f"Running {len(scripts)} example(s), up to {MAX_CONCURRENT} at a time...\n")
+wall_start = time.perf_counter()
+results = asyncio.run(run_all(scripts))
+wall_time = time.perf_counter() - wall_start
+
+# ==============================================================================
+# Step 5: Show every output in numeric order
+# ==============================================================================
+
+for name, (code, output, seconds) in zip(scripts, results):
+    print("\n" + "=" * 70)
+    print(f"{name} (exit {code}, {seconds:.1f}s)")
+    print("=" * 70)
+    print(output.rstrip())
+
+failed = [name for name, (code, _, _) in zip(scripts, results) if code != 0]
+sequential_time = sum(seconds for _, _, seconds in results)
+
+print("\n" + "=" * 70)
+print(f"Finished: {len(scripts) - len(failed)} ok, {len(failed)} failed")
+if failed:
+    print(f"Failed: {', '.join(failed)}")
+print(f"Wall-clock time: {wall_time:.1f}s (one by one: about {sequential_time:.1f}s)")
+
+# Python concepts explained:
+#
+# asyncio.create_subprocess_exec(program, arg, ...)
+#   Starts another program without waiting for it to finish.
+#   await process.communicate() then collects its output.
+#
+# asyncio.Semaphore(n) + "async with semaphore:"
+#   At most n tasks can be inside the block at the same time.
+#
+# asyncio.as_completed(tasks)
+#   Yields tasks in the order they FINISH (fastest first).
+#
+# asyncio.wait_for(awaitable, seconds)
+#   Raises asyncio.TimeoutError if the awaitable takes too long.
+#
+# 2 ** attempt
+#   "2 to the power of attempt": 1, 2, 4, 8, ... (exponential backoff;
+#   with MAX_ATTEMPTS = 3, only the first two waits are used)
+#
+# shlex.split('03_prompt_template.py History "Ancient Rome"')
+#   Splits text like a shell does: ['03_prompt_template.py', 'History',
+#   'Ancient Rome'] (quotes keep words together)